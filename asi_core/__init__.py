@@ -7,6 +7,8 @@ from .blockchain import (
     create_dummy_embedding
 )
 
+from .tx_tracker import TransactionTracker
+
 from .agent_manager import (
     ASIAgentManager,
     AgentProfile,
@@ -22,6 +24,7 @@ __all__ = [
     'ASIBlockchainError',
     'create_blockchain_client_from_config',
     'create_dummy_embedding',
+    'TransactionTracker',
     
     # Agent Management
     'ASIAgentManager',
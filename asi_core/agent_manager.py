@@ -1,18 +1,45 @@
 """ASI Agent Manager - Autonome Agent-Verwaltung"""
 import os
+import sys
 import json
 import logging
+import itertools
+import threading
+import time
 import uuid
-from typing import Dict, List, Optional, Any
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Any, Set, Union
 from datetime import datetime, timezone
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from .agent_store import AgentStore
 from .blockchain import ASIBlockchainClient, ASIBlockchainError, create_dummy_embedding
+from .collaboration import CollaborationManager
+from .merkle_batch import MerkleBatcher
 
-@dataclass
+# Slots erst ab Python 3.10 über dataclass verfügbar
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+ACTIVE_WINDOW_SECONDS = 24 * 3600
+
+
+def _to_epoch(value: Union[str, float, int, None]) -> Optional[float]:
+    """Wandelt Zeitstempel (Epoch oder ISO-String älterer Daten) in Epoch-Sekunden um."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (ValueError, AttributeError):
+        # Fehlerhafte Zeitstempel gelten als uralt
+        return 0.0
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class AgentProfile:
-    """Agent-Profil für autonome KI-Agenten"""
+    """Agent-Profil für autonome KI-Agenten (Zeitstempel in Epoch-Sekunden)"""
     agent_id: str
     name: str
     version: str
@@ -20,16 +47,83 @@ class AgentProfile:
     learning_goals: List[str]
     collaboration_preferences: Dict[str, Any]
     blockchain_address: Optional[str] = None
-    created_at: str = ""
-    last_active: str = ""
+    created_at: float = 0.0
+    last_active: float = 0.0
     total_actions: int = 0
     avg_confidence: float = 0.0
     
     def __post_init__(self):
-        if not self.created_at:
-            self.created_at = datetime.now(timezone.utc).isoformat()
-        if not self.last_active:
-            self.last_active = self.created_at
+        created_at = _to_epoch(self.created_at or None)
+        self.created_at = created_at if created_at is not None else time.time()
+        last_active = _to_epoch(self.last_active or None)
+        self.last_active = last_active if last_active is not None else self.created_at
+
+
+class AgentAggregates:
+    """
+    Laufende Aggregate über alle Agenten.
+    
+    Wird bei jeder Registrierung, Aktion und Entfernung aktualisiert, sodass
+    Statistiken ohne Durchlauf über alle Profile abgefragt werden können.
+    Aktivität wird in Zeit-Buckets gezählt; "aktiv in 24h" ist damit auf
+    ``bucket_seconds`` genau.
+    """
+    
+    def __init__(self, bucket_seconds: int = 300):
+        self.bucket_seconds = bucket_seconds
+        self.total_agents = 0
+        self.total_actions = 0
+        self.confidence_sum = 0.0
+        self.capabilities: Counter = Counter()
+        self._activity: Counter = Counter()
+    
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+    
+    def add(self, profile: AgentProfile) -> None:
+        """Nimmt ein Profil in die Aggregate auf."""
+        self.total_agents += 1
+        self.total_actions += profile.total_actions
+        self.confidence_sum += profile.avg_confidence * profile.total_actions
+        self.capabilities.update(profile.capabilities)
+        self._activity[self._bucket(profile.last_active)] += 1
+    
+    def remove(self, profile: AgentProfile) -> None:
+        """Entfernt ein Profil aus den Aggregaten."""
+        self.total_agents -= 1
+        self.total_actions -= profile.total_actions
+        self.confidence_sum -= profile.avg_confidence * profile.total_actions
+        self.capabilities.subtract(profile.capabilities)
+        self.capabilities += Counter()  # Einträge mit Zählerstand 0 entfernen
+        self.move_activity(profile.last_active, None)
+    
+    def record_action(self, confidence: float) -> None:
+        """Verbucht eine Aktion."""
+        self.total_actions += 1
+        self.confidence_sum += confidence
+    
+    def move_activity(self, old: float, new: Optional[float]) -> None:
+        """Verschiebt einen Agenten vom Aktivitäts-Bucket ``old`` nach ``new``."""
+        old_bucket = self._bucket(old)
+        if self._activity.get(old_bucket, 0) > 0:
+            self._activity[old_bucket] -= 1
+            if not self._activity[old_bucket]:
+                del self._activity[old_bucket]
+        if new is not None:
+            self._activity[self._bucket(new)] += 1
+    
+    def active_since(self, cutoff: float) -> int:
+        """Anzahl Agenten mit letzter Aktivität nach ``cutoff`` (Bucket-genau)."""
+        first_bucket = self._bucket(cutoff)
+        now_bucket = self._bucket(time.time())
+        window = now_bucket - first_bucket + 1
+        
+        # Veraltete Buckets gelegentlich verwerfen, damit der Zähler klein bleibt
+        if len(self._activity) > 2 * window:
+            for bucket in [b for b in self._activity if b < first_bucket]:
+                del self._activity[bucket]
+        
+        return sum(self._activity.get(bucket, 0) for bucket in range(first_bucket, now_bucket + 1))
 
 class ASIAgentManager:
     """
@@ -38,20 +132,50 @@ class ASIAgentManager:
     Verwaltet Agent-Profile, Aktionen und Kollaborationen.
     """
     
-    def __init__(self, data_dir: str = "data/agents", blockchain_client: Optional[ASIBlockchainClient] = None):
+    def __init__(self, data_dir: str = "data/agents", blockchain_client: Optional[ASIBlockchainClient] = None,
+                 batch_window: Optional[float] = None, max_batch_size: int = 256,
+                 snapshot_interval: int = 1000, collaboration_workers: int = 8):
         """
         Initialisiert den Agent-Manager.
         
         Args:
             data_dir (str): Verzeichnis für Agent-Daten.
             blockchain_client (Optional[ASIBlockchainClient]): Blockchain-Client für On-Chain-Operationen.
+            batch_window (Optional[float]): Wenn gesetzt, werden Aktionen, Lernprozesse und
+                Kollaborationen für so viele Sekunden gesammelt und nur als Merkle-Wurzel
+                registriert, statt einzeln.
+            max_batch_size (int): Maximale Anzahl Einträge pro Merkle-Batch.
+            snapshot_interval (int): Anzahl gespeicherter Änderungen, nach der
+                ``agents.json`` neu geschrieben wird (dazwischen nur Append-Log).
+            collaboration_workers (int): Maximale Anzahl parallel arbeitender
+                Agenten in Kollaborationen.
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
         self.blockchain_client = blockchain_client
+        self.batcher: Optional[MerkleBatcher] = None
+        if batch_window is not None:
+            self.batcher = MerkleBatcher(
+                blockchain_client=blockchain_client,
+                window_seconds=batch_window,
+                max_batch_size=max_batch_size,
+                batch_dir=str(self.data_dir / "batches"),
+            )
+        self.store = AgentStore(str(self.data_dir), snapshot_interval=snapshot_interval)
         self.agents: Dict[str, AgentProfile] = {}
-        self.active_collaborations: Dict[str, Dict] = {}
+        self.aggregates = AgentAggregates()
+        # Fähigkeit -> Agent-IDs und Agent-IDs nach letzter Aktivität (älteste zuerst)
+        self._capability_index: Dict[str, Set[str]] = {}
+        self._recency: "OrderedDict[str, None]" = OrderedDict()
+        # Schützt Profile, Indizes und Aggregate; Kollaborations-Arbeit ruft
+        # den Manager aus mehreren Threads auf. Reihenfolge: erst dieser
+        # Lock, dann der des Stores.
+        self._lock = threading.RLock()
+        self.collaborations = CollaborationManager(
+            state_file=str(self.data_dir / "collaborations.jsonl"),
+            max_workers=collaboration_workers,
+        )
         
         # Setup logging
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
@@ -60,39 +184,95 @@ class ASIAgentManager:
         self._load_agents()
     
     def _load_agents(self) -> None:
-        """Lädt alle gespeicherten Agent-Profile."""
-        agents_file = self.data_dir / "agents.json"
-        
-        if agents_file.exists():
-            try:
-                with open(agents_file, 'r', encoding='utf-8') as f:
-                    agents_data = json.load(f)
-                    
-                for agent_id, agent_data in agents_data.items():
-                    self.agents[agent_id] = AgentProfile(**agent_data)
-                    
-                self.logger.info(f"Geladen: {len(self.agents)} Agent-Profile")
-                
-            except Exception as e:
-                self.logger.error(f"Fehler beim Laden der Agent-Profile: {e}")
-    
-    def _save_agents(self) -> None:
-        """Speichert alle Agent-Profile."""
-        agents_file = self.data_dir / "agents.json"
-        
+        """Lädt alle gespeicherten Agent-Profile (Snapshot plus Änderungs-Log)."""
         try:
-            agents_data = {
-                agent_id: asdict(profile) 
-                for agent_id, profile in self.agents.items()
-            }
+            agents_data = self.store.load(self._agents_snapshot)
             
-            with open(agents_file, 'w', encoding='utf-8') as f:
-                json.dump(agents_data, f, indent=2, ensure_ascii=False)
-                
-            self.logger.debug(f"Gespeichert: {len(self.agents)} Agent-Profile")
+            for agent_id, agent_data in agents_data.items():
+                profile = AgentProfile(**agent_data)
+                self.agents[agent_id] = profile
+                self.aggregates.add(profile)
+                for capability in profile.capabilities:
+                    self._capability_index.setdefault(capability, set()).add(agent_id)
+            
+            self._rebuild_recency()
+            
+            self.logger.info(f"Geladen: {len(self.agents)} Agent-Profile")
             
         except Exception as e:
-            self.logger.error(f"Fehler beim Speichern der Agent-Profile: {e}")
+            self.logger.error(f"Fehler beim Laden der Agent-Profile: {e}")
+    
+    def _rebuild_recency(self) -> None:
+        """Sortiert die Aktivitätsreihenfolge vollständig neu."""
+        self._recency = OrderedDict.fromkeys(
+            sorted(self.agents, key=lambda agent_id: self.agents[agent_id].last_active)
+        )
+    
+    def _index_agent(self, profile: AgentProfile) -> None:
+        """Nimmt ein Profil in Aggregate, Fähigkeits-Index und Aktivitätsreihenfolge auf."""
+        self.aggregates.add(profile)
+        for capability in profile.capabilities:
+            self._capability_index.setdefault(capability, set()).add(profile.agent_id)
+        self._place_recent(profile)
+    
+    def _unindex_agent(self, profile: AgentProfile) -> None:
+        """Entfernt ein Profil aus Aggregaten, Fähigkeits-Index und Aktivitätsreihenfolge."""
+        self.aggregates.remove(profile)
+        for capability in profile.capabilities:
+            agent_ids = self._capability_index.get(capability)
+            if agent_ids is not None:
+                agent_ids.discard(profile.agent_id)
+                if not agent_ids:
+                    del self._capability_index[capability]
+        self._recency.pop(profile.agent_id, None)
+    
+    def _place_recent(self, profile: AgentProfile) -> None:
+        """
+        Ordnet einen Agenten in die Aktivitätsreihenfolge ein.
+        
+        Neue Aktivität ist fast immer die jüngste und wird in O(1) ans Ende
+        verschoben; nur bei älteren Zeitstempeln wird neu sortiert.
+        """
+        self._recency.pop(profile.agent_id, None)
+        if self._recency:
+            newest_id = next(reversed(self._recency))
+            if self.agents[newest_id].last_active > profile.last_active:
+                self._recency[profile.agent_id] = None
+                self._rebuild_recency()
+                return
+        self._recency[profile.agent_id] = None
+    
+    def _set_last_active(self, profile: AgentProfile, timestamp: float) -> None:
+        """Setzt die letzte Aktivität und hält Aggregate und Reihenfolge aktuell."""
+        self.aggregates.move_activity(profile.last_active, timestamp)
+        profile.last_active = timestamp
+        self._place_recent(profile)
+    
+    def _agents_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Aktueller Zustand aller Agent-Profile für den Snapshot."""
+        with self._lock:
+            return {
+                agent_id: asdict(profile)
+                for agent_id, profile in self.agents.items()
+            }
+    
+    def save(self) -> None:
+        """Schreibt sofort einen vollständigen Snapshot aller Agent-Profile."""
+        with self._lock:
+            self.store.snapshot()
+    
+    @property
+    def active_collaborations(self) -> Dict[str, Dict]:
+        """Alle noch laufenden Kollaborationen."""
+        return self.collaborations.active
+    
+    def close(self) -> None:
+        """Schließt den offenen Merkle-Batch, den Agent-Store und den Kollaborations-Pool."""
+        if self.batcher:
+            self.batcher.close()
+        with self._lock:
+            self.store.close()
+        self.collaborations.close()
     
     def register_agent(self, name: str, capabilities: List[str], learning_goals: List[str] = None, **kwargs) -> str:
         """
@@ -119,8 +299,10 @@ class ASIAgentManager:
             blockchain_address=kwargs.get('blockchain_address')
         )
         
-        self.agents[agent_id] = profile
-        self._save_agents()
+        with self._lock:
+            self.agents[agent_id] = profile
+            self._index_agent(profile)
+            self.store.put(asdict(profile))
         
         self.logger.info(f"Agent registriert: {name} (ID: {agent_id})")
         
@@ -161,27 +343,45 @@ class ASIAgentManager:
         Returns:
             Optional[AgentProfile]: Das Agent-Profil oder None.
         """
-        return self.agents.get(agent_id)
+        with self._lock:
+            return self.agents.get(agent_id)
     
-    def list_agents(self, capabilities_filter: List[str] = None) -> List[AgentProfile]:
+    def list_agents(self, capabilities_filter: List[str] = None, limit: Optional[int] = None,
+                    offset: int = 0) -> List[AgentProfile]:
         """
-        Listet alle Agenten auf, optional gefiltert nach Fähigkeiten.
+        Listet Agenten nach letzter Aktivität (neueste zuerst), optional gefiltert nach Fähigkeiten.
         
         Args:
-            capabilities_filter (List[str], optional): Filter nach Fähigkeiten.
+            capabilities_filter (List[str], optional): Agenten mit mindestens einer dieser Fähigkeiten.
+            limit (Optional[int]): Maximale Anzahl Ergebnisse (None = alle).
+            offset (int): Anzahl zu überspringender Ergebnisse (Paginierung).
         
         Returns:
             List[AgentProfile]: Liste der Agent-Profile.
         """
-        agents = list(self.agents.values())
-        
-        if capabilities_filter:
-            agents = [
-                agent for agent in agents 
-                if any(cap in agent.capabilities for cap in capabilities_filter)
-            ]
-        
-        return sorted(agents, key=lambda x: x.last_active, reverse=True)
+        with self._lock:
+            return self._list_agents(capabilities_filter, offset, None if limit is None else offset + limit)
+    
+    def _list_agents(self, capabilities_filter: Optional[List[str]], offset: int,
+                     end: Optional[int]) -> List[AgentProfile]:
+        """Implementierung von ``list_agents`` (unter ``_lock``)."""
+        if not capabilities_filter:
+            ordered = reversed(self._recency)
+            return [self.agents[agent_id] for agent_id in itertools.islice(ordered, offset, end)]
+        
+        candidates: Set[str] = set()
+        for capability in capabilities_filter:
+            candidates |= self._capability_index.get(capability, set())
+        
+        if end is not None and len(candidates) * 4 > len(self._recency):
+            # Häufige Fähigkeit: in Aktivitätsreihenfolge laufen und früh abbrechen
+            matching = (agent_id for agent_id in reversed(self._recency) if agent_id in candidates)
+            return [self.agents[agent_id] for agent_id in itertools.islice(matching, offset, end)]
+        
+        # Seltene Fähigkeit: nur die Kandidaten sortieren
+        agents = sorted((self.agents[agent_id] for agent_id in candidates),
+                        key=lambda agent: agent.last_active, reverse=True)
+        return agents[offset:end]
     
     def record_agent_action(self, agent_id: str, action_type: str, result_data: Dict, confidence: float = 0.8) -> Optional[str]:
         """
@@ -194,26 +394,40 @@ class ASIAgentManager:
             confidence (float): Vertrauenswert der Aktion.
         
         Returns:
-            Optional[str]: Blockchain-Transaction-Hash oder None.
+            Optional[str]: Blockchain-Transaction-Hash oder None. Im Batch-Modus die
+            Eintrags-ID, über die ``get_entry_proof`` den Merkle-Beweis liefert.
         """
-        if agent_id not in self.agents:
-            self.logger.error(f"Unbekannte Agent-ID: {agent_id}")
-            return None
-        
-        # Agent-Profil aktualisieren
-        agent = self.agents[agent_id]
-        agent.last_active = datetime.now(timezone.utc).isoformat()
-        agent.total_actions += 1
-        agent.avg_confidence = (agent.avg_confidence * (agent.total_actions - 1) + confidence) / agent.total_actions
-        
-        self._save_agents()
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent is None:
+                self.logger.error(f"Unbekannte Agent-ID: {agent_id}")
+                return None
+            
+            # Agent-Profil aktualisieren; gespeichert wird nur das Delta
+            self._set_last_active(agent, time.time())
+            agent.total_actions += 1
+            agent.avg_confidence = (agent.avg_confidence * (agent.total_actions - 1) + confidence) / agent.total_actions
+            last_active = agent.last_active
+            
+            self.aggregates.record_action(confidence)
+            self.store.record_action(agent_id, last_active, confidence)
         
+        result_cid = f"action_{agent_id}_{action_type}_{int(datetime.now().timestamp())}"
+
+        if self.batcher:
+            return self.batcher.add_entry({
+                "kind": "agent_action",
+                "agent_id": agent_id,
+                "action_type": action_type,
+                "result_cid": result_cid,
+                "confidence": confidence,
+                "timestamp": datetime.fromtimestamp(last_active, timezone.utc).isoformat()
+            })
+
         # Blockchain-Registrierung
         tx_hash = None
         if self.blockchain_client and self.blockchain_client.is_connected():
             try:
-                result_cid = f"action_{agent_id}_{action_type}_{int(datetime.now().timestamp())}"
-                
                 tx_hash = self.blockchain_client.register_agent_action(
                     agent_id=agent_id,
                     action_type=action_type,
@@ -239,7 +453,8 @@ class ASIAgentManager:
             learning_data (Dict): Detaillierte Lerndaten.
         
         Returns:
-            Optional[str]: Blockchain-Transaction-Hash oder None.
+            Optional[str]: Blockchain-Transaction-Hash oder None. Im Batch-Modus die
+            Eintrags-ID des Merkle-Batches.
         """
         if agent_id not in self.agents:
             self.logger.error(f"Unbekannte Agent-ID: {agent_id}")
@@ -256,6 +471,14 @@ class ASIAgentManager:
             "timestamp": datetime.now(timezone.utc).isoformat(),
             **learning_data
         }
+
+        if self.batcher:
+            return self.batcher.add_entry({
+                "kind": "agent_learning",
+                "agent_id": agent_id,
+                "embedding": embedding.hex(),
+                **structured_learning_data
+            })
         
         # Blockchain-Registrierung
         tx_hash = None
@@ -290,42 +513,101 @@ class ASIAgentManager:
             raise ValueError("Kollaboration benötigt mindestens 2 Agenten.")
         
         # Validierung: Alle Agenten müssen existieren
-        missing_agents = [aid for aid in agent_ids if aid not in self.agents]
+        with self._lock:
+            missing_agents = [aid for aid in agent_ids if aid not in self.agents]
         if missing_agents:
             raise ValueError(f"Unbekannte Agent-IDs: {missing_agents}")
         
-        collab_id = str(uuid.uuid4())[:12]
+        collaboration = self.collaborations.create(agent_ids, collaboration_type, goals)
+        collab_id = collaboration["id"]
+
+        if self.batcher:
+            batch_entry_id = self.batcher.add_entry({
+                "kind": "agent_collaboration",
+                "collaboration_id": collab_id,
+                "agents": agent_ids,
+                "collaboration_type": collaboration_type,
+                "timestamp": collaboration["created_at"]
+            })
+            self.collaborations.update(collab_id, batch_entry_id=batch_entry_id)
+            return collab_id
+        
+        # Blockchain-Registrierung im Hintergrund, der Aufruf kehrt sofort zurück
+        if self.blockchain_client and self.blockchain_client.is_connected():
+            self.collaborations.submit(
+                self._register_collaboration_on_chain, collab_id, agent_ids, collaboration_type
+            )
         
-        collaboration = {
-            "id": collab_id,
-            "agents": agent_ids,
-            "type": collaboration_type,
-            "goals": goals,
-            "status": "active",
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "actions": []
-        }
+        return collab_id
+    
+    def _register_collaboration_on_chain(self, collab_id: str, agent_ids: List[str],
+                                         collaboration_type: str) -> Optional[str]:
+        """Registriert eine Kollaboration auf der Blockchain und speichert den TX-Hash."""
+        try:
+            result_cid = f"collaboration_{collab_id}_{int(datetime.now().timestamp())}"
+            
+            tx_hash = self.blockchain_client.register_agent_collaboration(
+                agents=agent_ids,
+                collaboration_type=collaboration_type,
+                result_cid=result_cid
+            )
+            
+            self.collaborations.update(collab_id, blockchain_tx=tx_hash)
+            self.logger.info(f"Kollaboration gestartet: {collab_id} mit {len(agent_ids)} Agenten (TX: {tx_hash})")
+            return tx_hash
+            
+        except ASIBlockchainError as e:
+            self.logger.warning(f"Blockchain-Registrierung der Kollaboration fehlgeschlagen: {e}")
+            return None
+    
+    def run_collaboration(self, collab_id: str, work: Callable[[AgentProfile], Any],
+                          timeout: Optional[float] = None,
+                          on_result: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """
+        Führt die Arbeit aller beteiligten Agenten parallel aus.
         
-        self.active_collaborations[collab_id] = collaboration
+        Args:
+            collab_id (str): Kollaborations-ID.
+            work (Callable[[AgentProfile], Any]): Arbeit eines einzelnen Agenten.
+            timeout (Optional[float]): Zeitlimit in Sekunden; danach wird mit
+                Teilergebnissen abgeschlossen.
+            on_result (Optional[Callable]): Wird pro eintreffendem Ergebnis mit
+                ``(agent_id, result)`` aufgerufen.
         
-        # Blockchain-Registrierung
-        if self.blockchain_client and self.blockchain_client.is_connected():
-            try:
-                result_cid = f"collaboration_{collab_id}_{int(datetime.now().timestamp())}"
-                
-                tx_hash = self.blockchain_client.register_agent_collaboration(
-                    agents=agent_ids,
-                    collaboration_type=collaboration_type,
-                    result_cid=result_cid
-                )
-                
-                collaboration["blockchain_tx"] = tx_hash
-                self.logger.info(f"Kollaboration gestartet: {collab_id} mit {len(agent_ids)} Agenten (TX: {tx_hash})")
-                
-            except ASIBlockchainError as e:
-                self.logger.warning(f"Blockchain-Registrierung der Kollaboration fehlgeschlagen: {e}")
+        Returns:
+            Dict[str, Any]: Zusammengeführte Ergebnisse (siehe ``CollaborationManager.run``).
+        """
+        return self.collaborations.run(
+            collab_id,
+            lambda agent_id: work(self.get_agent(agent_id)),
+            timeout=timeout,
+            on_result=on_result,
+        )
+    
+    def get_entry_proof(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Ruft den Merkle-Inklusionsbeweis eines gebündelten Eintrags ab.
         
-        return collab_id
+        Args:
+            entry_id (str): Eintrags-ID aus dem Batch-Modus.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Beweis oder None (kein Batch-Modus oder Batch noch offen).
+        """
+        if not self.batcher:
+            return None
+        return self.batcher.get_proof(entry_id)
+    
+    def flush_batch(self) -> Optional[Dict[str, Any]]:
+        """
+        Schließt den offenen Merkle-Batch sofort ab.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Batch-Zusammenfassung oder None.
+        """
+        if not self.batcher:
+            return None
+        return self.batcher.flush()
     
     def get_agent_statistics(self) -> Dict[str, Any]:
         """
@@ -334,54 +616,18 @@ class ASIAgentManager:
         Returns:
             Dict[str, Any]: Agent-Statistiken.
         """
-        if not self.agents:
-            return {
-                "total_agents": 0,
-                "active_agents": 0,
-                "total_actions": 0,
-                "avg_confidence": 0.0,
-                "most_common_capabilities": [],
-                "active_collaborations": 0
+        stats = self.aggregates
+        
+        with self._lock:
+            result = {
+                "total_agents": stats.total_agents,
+                "active_agents": stats.active_since(time.time() - ACTIVE_WINDOW_SECONDS),
+                "total_actions": stats.total_actions,
+                "avg_confidence": round(stats.confidence_sum / max(stats.total_actions, 1), 3),
+                "most_common_capabilities": stats.capabilities.most_common(5),
             }
-        
-        total_actions = sum(agent.total_actions for agent in self.agents.values())
-        total_confidence = sum(agent.avg_confidence * agent.total_actions for agent in self.agents.values())
-        avg_confidence = total_confidence / max(total_actions, 1)
-        
-        # Häufigste Fähigkeiten
-        all_capabilities = []
-        for agent in self.agents.values():
-            all_capabilities.extend(agent.capabilities)
-        
-        capability_counts = {}
-        for cap in all_capabilities:
-            capability_counts[cap] = capability_counts.get(cap, 0) + 1
-        
-        most_common_capabilities = sorted(
-            capability_counts.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:5]
-        
-        # Aktive Agenten (letzte 24h)
-        now = datetime.now(timezone.utc)
-        active_agents = 0
-        for agent in self.agents.values():
-            try:
-                last_active = datetime.fromisoformat(agent.last_active.replace('Z', '+00:00'))
-                if (now - last_active).total_seconds() < 24 * 3600:
-                    active_agents += 1
-            except:
-                pass
-        
-        return {
-            "total_agents": len(self.agents),
-            "active_agents": active_agents,
-            "total_actions": total_actions,
-            "avg_confidence": round(avg_confidence, 3),
-            "most_common_capabilities": most_common_capabilities,
-            "active_collaborations": len(self.active_collaborations)
-        }
+        result["active_collaborations"] = len(self.active_collaborations)
+        return result
     
     def get_blockchain_network_stats(self) -> Dict[str, Any]:
         """
@@ -409,24 +655,20 @@ class ASIAgentManager:
         Returns:
             int: Anzahl der entfernten Agenten.
         """
-        now = datetime.now(timezone.utc)
-        inactive_agents = []
-        
-        for agent_id, agent in self.agents.items():
-            try:
-                last_active = datetime.fromisoformat(agent.last_active.replace('Z', '+00:00'))
-                if (now - last_active).total_seconds() > days_threshold * 24 * 3600:
-                    inactive_agents.append(agent_id)
-            except:
-                # Fehlerhafte Zeitstempel als inaktiv behandeln
+        cutoff = time.time() - days_threshold * 24 * 3600
+        
+        with self._lock:
+            # Die Aktivitätsreihenfolge beginnt mit den ältesten Agenten
+            inactive_agents = []
+            for agent_id in self._recency:
+                if self.agents[agent_id].last_active >= cutoff:
+                    break
                 inactive_agents.append(agent_id)
-        
-        for agent_id in inactive_agents:
-            del self.agents[agent_id]
-            self.logger.info(f"Inaktiver Agent entfernt: {agent_id}")
-        
-        if inactive_agents:
-            self._save_agents()
+            
+            for agent_id in inactive_agents:
+                self._unindex_agent(self.agents.pop(agent_id))
+                self.store.delete(agent_id)
+                self.logger.info(f"Inaktiver Agent entfernt: {agent_id}")
         
         return len(inactive_agents)
 
@@ -441,8 +683,10 @@ def create_agent_manager_from_config(blockchain_client: Optional[ASIBlockchainCl
         ASIAgentManager: Konfigurierter Agent-Manager.
     """
     data_dir = os.getenv("AGENTS_DATA_DIR", "data/agents")
+    batch_window = os.getenv("AGENTS_BATCH_WINDOW")
     
     return ASIAgentManager(
         data_dir=data_dir,
-        blockchain_client=blockchain_client
+        blockchain_client=blockchain_client,
+        batch_window=float(batch_window) if batch_window else None
     )
@@ -0,0 +1,258 @@
+"""
+ASI Core - Agent Store
+Append-only Ereignis-Log mit periodischen Snapshots für Agent-Profile
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def apply_action(agent: Dict[str, Any], last_active: Any, confidence: float) -> None:
+    """Aktualisiert Aktionszähler und Durchschnitts-Confidence eines Profils in-place."""
+    agent["last_active"] = last_active
+    agent["total_actions"] = agent.get("total_actions", 0) + 1
+    agent["avg_confidence"] = (
+        agent.get("avg_confidence", 0.0) * (agent["total_actions"] - 1) + confidence
+    ) / agent["total_actions"]
+
+
+class AgentStore:
+    """
+    Persistenz für Agent-Profile.
+
+    Jede Änderung wird als kleines Ereignis an ``agents.json.log``
+    angehängt (``put``, ``action``, ``delete``); eine Aktion schreibt nur
+    ihren Zähler-Delta statt der gesamten Flotte. Nach
+    ``snapshot_interval`` Ereignissen wird ``agents.json`` atomar als
+    kompakter Snapshot neu geschrieben und das Log geleert. Der Snapshot
+    behält das bisherige Format (Agent-ID -> Profil).
+    """
+
+    def __init__(
+        self,
+        data_dir: str = "data/agents",
+        snapshot_interval: int = 1000,
+        fsync_batch_size: int = 64,
+        fsync_interval: float = 1.0,
+    ):
+        """
+        Initialisiert den Store.
+
+        Args:
+            data_dir: Verzeichnis für Snapshot und Log.
+            snapshot_interval: Anzahl Log-Ereignisse bis zum nächsten Snapshot.
+            fsync_batch_size: Maximale Anzahl Ereignisse zwischen zwei fsync-Aufrufen.
+            fsync_interval: Maximale Sekunden zwischen zwei fsync-Aufrufen.
+        """
+        self.snapshot_file = Path(data_dir) / "agents.json"
+        self.log_file = Path(data_dir) / "agents.json.log"
+        self.snapshot_interval = snapshot_interval
+        self.fsync_batch_size = fsync_batch_size
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.RLock()
+        self._log_handle = None
+        self._log_entries = 0
+        self._unsynced_entries = 0
+        self._last_fsync = time.monotonic()
+        self._snapshot_source: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None
+
+    def load(self, snapshot_source: Callable[[], Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Lädt Snapshot und Log.
+
+        Args:
+            snapshot_source: Liefert beim nächsten Snapshot den aktuellen
+                Zustand aller Profile als Dicts.
+
+        Returns:
+            Dict[str, Dict]: Agent-ID -> Profil-Daten.
+        """
+        self._snapshot_source = snapshot_source
+        agents, self._log_entries = self._read()
+        if self._log_entries:
+            logger.info(f"{self._log_entries} Agent-Ereignisse aus dem Log eingespielt")
+        return agents
+
+    def read(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Liest den aktuellen Stand (Snapshot plus Log), ohne den Store zu übernehmen.
+
+        Für Leser außerhalb des schreibenden Prozesses (z.B. Admin-API):
+        ``agents.json`` allein ist nach einem Snapshot bis zu
+        ``snapshot_interval`` Ereignisse alt.
+
+        Returns:
+            Dict[str, Dict]: Agent-ID -> Profil-Daten.
+        """
+        agents, _ = self._read()
+        return agents
+
+    def _read(self):
+        """Lädt Snapshot und spielt das Log ein; liefert Profile und Anzahl Ereignisse."""
+        agents: Dict[str, Dict[str, Any]] = {}
+
+        if self.snapshot_file.exists():
+            try:
+                with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                    agents = json.load(f)
+            except Exception as e:
+                logger.error(f"Fehler beim Laden des Agent-Snapshots: {e}")
+
+        return agents, self._replay_log(agents)
+
+    def _replay_log(self, agents: Dict[str, Dict[str, Any]]) -> int:
+        """Wendet die Ereignisse des Logs auf die Profile an."""
+        if not self.log_file.exists():
+            return 0
+
+        replayed = 0
+        with open(self.log_file, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                    op = event["op"]
+                    if op == "put":
+                        agents[event["agent"]["agent_id"]] = event["agent"]
+                    elif op == "action" and event["agent_id"] in agents:
+                        apply_action(agents[event["agent_id"]], event["last_active"], event["confidence"])
+                    elif op == "delete":
+                        agents.pop(event["agent_id"], None)
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Ungültiges Agent-Ereignis in Zeile {line_number} ignoriert: {e}")
+                    continue
+                replayed += 1
+
+        return replayed
+
+    # ------------------------------------------------------------------
+    # Ereignisse
+    # ------------------------------------------------------------------
+
+    def put(self, agent: Dict[str, Any]) -> None:
+        """Speichert ein vollständiges Profil (Registrierung oder Änderung)."""
+        self._append({"op": "put", "agent": agent})
+
+    def record_action(self, agent_id: str, last_active: Any, confidence: float) -> None:
+        """Speichert nur das Delta einer Aktion."""
+        self._append({
+            "op": "action",
+            "agent_id": agent_id,
+            "last_active": last_active,
+            "confidence": confidence,
+        })
+
+    def delete(self, agent_id: str) -> None:
+        """Entfernt ein Profil."""
+        self._append({"op": "delete", "agent_id": agent_id})
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        """Hängt ein Ereignis an; fsync und Snapshots werden gebündelt."""
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+        with self._lock:
+            try:
+                handle = self._open_log()
+                handle.write(line)
+                self._log_entries += 1
+                self._unsynced_entries += 1
+
+                if (self._unsynced_entries >= self.fsync_batch_size
+                        or time.monotonic() - self._last_fsync >= self.fsync_interval):
+                    self._sync_log()
+                else:
+                    handle.flush()
+            except Exception as e:
+                logger.error(f"Fehler beim Schreiben des Agent-Logs: {e}")
+                return
+
+            if self._log_entries >= self.snapshot_interval:
+                self.snapshot()
+
+    # ------------------------------------------------------------------
+    # Log und Snapshot
+    # ------------------------------------------------------------------
+
+    def _open_log(self):
+        """Öffnet das Log im Append-Modus (lazy)."""
+        if self._log_handle is None:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            self._log_handle = open(self.log_file, "a", encoding="utf-8")
+            # Abgeschnittene letzte Zeile abschließen, damit neue Ereignisse lesbar bleiben
+            if self._log_handle.tell() > 0:
+                with open(self.log_file, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._log_handle.write("\n")
+        return self._log_handle
+
+    def _sync_log(self) -> None:
+        """Schreibt gepufferte Ereignisse per fsync auf die Festplatte."""
+        if self._log_handle is None:
+            return
+        self._log_handle.flush()
+        if self._unsynced_entries:
+            os.fsync(self._log_handle.fileno())
+        self._unsynced_entries = 0
+        self._last_fsync = time.monotonic()
+
+    def _close_log(self) -> None:
+        """Synchronisiert und schließt das Log."""
+        if self._log_handle is not None:
+            self._sync_log()
+            self._log_handle.close()
+            self._log_handle = None
+
+    def snapshot(self) -> None:
+        """Schreibt einen kompakten Snapshot und leert das Log."""
+        if self._snapshot_source is None:
+            return
+
+        with self._lock:
+            try:
+                agents = self._snapshot_source()
+                self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+
+                # Atomar ersetzen, damit ein Absturz nie einen halben Snapshot hinterlässt
+                tmp_file = self.snapshot_file.with_name(self.snapshot_file.name + ".tmp")
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(agents, f, ensure_ascii=False, separators=(",", ":"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.snapshot_file)
+
+                # Log erst nach erfolgreichem Snapshot verwerfen
+                self._close_log()
+                with open(self.log_file, "w", encoding="utf-8"):
+                    pass
+                self._log_entries = 0
+
+                logger.debug(f"Agent-Snapshot mit {len(agents)} Profilen geschrieben")
+            except Exception as e:
+                logger.error(f"Fehler beim Schreiben des Agent-Snapshots: {e}")
+
+    @property
+    def log_entries(self) -> int:
+        """Anzahl Ereignisse seit dem letzten Snapshot."""
+        return self._log_entries
+
+    def flush(self) -> None:
+        """Erzwingt fsync aller gepufferten Ereignisse."""
+        with self._lock:
+            self._sync_log()
+
+    def close(self) -> None:
+        """Schreibt einen abschließenden Snapshot und schließt das Log."""
+        with self._lock:
+            if self._log_entries:
+                self.snapshot()
+            self._close_log()
@@ -2,10 +2,18 @@
 import os
 import json
 import logging
+import time
+from concurrent.futures import Future
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime, timezone
 
+from .chain_indexer import ChainEventIndexer
+from .rpc_cache import ChainReadCache
+from .tx_queue import TransactionQueue
+from .tx_tracker import TransactionTracker
+
 try:
     from web3 import Web3
     from web3.exceptions import Web3Exception, TransactionNotFound
@@ -20,8 +28,19 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 class ASIBlockchainError(Exception):
     pass
 
+
+@lru_cache(maxsize=None)
+def _read_abi_file(abi_path: str) -> List[Dict]:
+    """Liest eine ABI-Datei einmalig pro Prozess (ABIs sind unveränderlich)."""
+    with open(abi_path, 'r') as f:
+        contract_data = json.load(f)
+        return contract_data.get('abi', [])
+
 class ASIBlockchainClient:
-    def __init__(self, rpc_url: str, private_key: str, contract_address: str):
+    def __init__(self, rpc_url: str, private_key: str, contract_address: str,
+                 async_submission: bool = False, tx_state_file: Optional[str] = None,
+                 connection_check_ttl: float = 5.0, index_db_path: Optional[str] = None,
+                 index_start_block: int = 0, index_poll_interval: float = 5.0):
         """
         Initialisiert den ASI Blockchain Client.
 
@@ -29,6 +48,17 @@ class ASIBlockchainClient:
             rpc_url (str): Die URL des Blockchain RPC-Endpunkts.
             private_key (str): Der private Schlüssel für Transaktionen.
             contract_address (str): Die Adresse des ASI Smart Contracts.
+            async_submission (bool): Wenn True, geben Schreiboperationen den
+                Transaktions-Hash sofort zurück; Bestätigungen werden im
+                Hintergrund verfolgt.
+            tx_state_file (Optional[str]): JSON-Lines-Datei für den Status
+                verfolgter Transaktionen (default: data/blockchain/transactions.jsonl).
+            connection_check_ttl (float): Sekunden, die ein Ergebnis von
+                ``is_connected`` zwischengespeichert wird.
+            index_db_path (Optional[str]): SQLite-Datei des lokalen Event-Index
+                (default: data/blockchain/chain_index.db).
+            index_start_block (int): Erster indizierter Block (Deployment-Block).
+            index_poll_interval (float): Sekunden zwischen zwei Index-Syncs.
         
         Raises:
             ASIBlockchainError: Wenn Web3 nicht verfügbar ist oder die Initialisierung fehlschlägt.
@@ -42,9 +72,86 @@ class ASIBlockchainClient:
         self.web3 = None
         self.contract = None
         self.account = None
+        self.chain_id: Optional[int] = None
+        self.read_cache: Optional[ChainReadCache] = None
+        self.connection_check_ttl = connection_check_ttl
+        self._connection_checked_at = float('-inf')
+        self._connection_ok = False
         self.abi = self._load_contract_abi()
         self.connected = self._connect()
 
+        self.async_submission = async_submission
+        self.tx_state_file = tx_state_file or "data/blockchain/transactions.jsonl"
+        self._tx_tracker: Optional[TransactionTracker] = None
+        self._tx_queue: Optional[TransactionQueue] = None
+        # Offene Transaktionen eines früheren Laufs sofort wieder verfolgen
+        if self._has_pending_transactions():
+            self._tx_tracker = TransactionTracker(self.web3, state_file=self.tx_state_file)
+
+        self.index_db_path = index_db_path or "data/blockchain/chain_index.db"
+        self.index_start_block = index_start_block
+        self.index_poll_interval = index_poll_interval
+        self._indexer: Optional[ChainEventIndexer] = None
+
+    def _has_pending_transactions(self) -> bool:
+        """Prüft, ob die Statusdatei noch unbestätigte Transaktionen enthält."""
+        statuses: Dict[str, Any] = {}
+        try:
+            with open(self.tx_state_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        statuses[record["tx_hash"]] = record.get("status")
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            return False
+        return "pending" in statuses.values()
+
+    @property
+    def tx_tracker(self) -> TransactionTracker:
+        """Hintergrund-Tracker für gesendete Transaktionen (lazy erstellt)."""
+        if self._tx_tracker is None:
+            self._tx_tracker = TransactionTracker(self.web3, state_file=self.tx_state_file)
+        return self._tx_tracker
+
+    @property
+    def tx_queue(self) -> TransactionQueue:
+        """Gepipelinete Sende-Queue mit lokaler Nonce-Vergabe (lazy erstellt)."""
+        if self._tx_queue is None:
+            self._tx_queue = TransactionQueue(
+                self.web3, self.private_key, tracker=self.tx_tracker, chain_id=self.chain_id
+            )
+        return self._tx_queue
+
+    @property
+    def indexer(self) -> Optional[ChainEventIndexer]:
+        """
+        Lokaler Event-Index für Abfragen (lazy erstellt).
+
+        Beim ersten Zugriff mit aktiver Verbindung wird der Index im
+        Hintergrund fortlaufend nachgezogen; Abfragen lesen nur aus SQLite.
+        """
+        if self._indexer is None and self.contract is not None:
+            self._indexer = ChainEventIndexer(
+                self.web3,
+                self.contract,
+                db_path=self.index_db_path,
+                start_block=self.index_start_block,
+            )
+            if self.is_connected():
+                self._indexer.start(self.index_poll_interval)
+        return self._indexer
+
+    def close(self) -> None:
+        """Beendet Sende-Queue, Hintergrund-Tracker und Event-Index."""
+        if self._indexer is not None:
+            self._indexer.stop()
+        if self._tx_queue is not None:
+            self._tx_queue.stop()
+        if self._tx_tracker is not None:
+            self._tx_tracker.stop()
+
     def _load_contract_abi(self) -> List[Dict]:
         """
         Lädt die ABI des ASI Smart Contracts aus der JSON-Datei.
@@ -78,9 +185,7 @@ class ASIBlockchainClient:
                     }
                 ]
             
-            with open(abi_path, 'r') as f:
-                contract_data = json.load(f)
-                return contract_data.get('abi', [])
+            return _read_abi_file(str(abi_path))
                 
         except Exception as e:
             logging.error(f"Fehler beim Laden der Contract-ABI: {e}")
@@ -98,9 +203,10 @@ class ASIBlockchainClient:
             
             # Web3-Instanz erstellen
             self.web3 = Web3(Web3.HTTPProvider(self.rpc_url))
+            self.read_cache = ChainReadCache(self.web3)
             
             # Verbindung testen
-            if not self.web3.is_connected():
+            if not self.is_connected():
                 logging.error("Verbindung zum RPC-Endpunkt fehlgeschlagen.")
                 return False
             
@@ -114,8 +220,8 @@ class ASIBlockchainClient:
                 abi=self.abi
             )
             
-            # Chain-ID für Polygon Mumbai
-            chain_id = self.web3.eth.chain_id
+            # Chain-ID für Polygon Mumbai (unveränderlich, nur einmal abfragen)
+            chain_id = self.chain_id = self.read_cache.chain_id
             logging.info(f"Verbunden mit Chain ID: {chain_id}")
             
             if chain_id != 80001:  # Mumbai Testnet Chain ID
@@ -141,19 +247,30 @@ class ASIBlockchainClient:
         """
         Prüft, ob die Verbindung zum RPC-Endpunkt aktiv ist.
 
+        Das Ergebnis wird ``connection_check_ttl`` Sekunden zwischengespeichert,
+        damit nicht jede Operation einen eigenen RPC-Round-Trip auslöst.
+
         Returns:
             bool: True, wenn eine Verbindung besteht, sonst False.
         """
         if not self.web3:
             return False
+
+        now = time.monotonic()
+        if now - self._connection_checked_at < self.connection_check_ttl:
+            return self._connection_ok
         
         try:
-            return self.web3.is_connected()
+            self._connection_ok = bool(self.web3.is_connected())
         except Exception as e:
             logging.error(f"Fehler bei der Verbindungsprüfung: {e}")
-            return False
+            self._connection_ok = False
+        self._connection_checked_at = now
+        return self._connection_ok
 
-    def register_entry_on_chain(self, cid: str, tags: List[str], embedding: bytes, timestamp: int) -> str:
+    def register_entry_on_chain(self, cid: str, tags: List[str], embedding: bytes, timestamp: int,
+                                wait_for_receipt: Optional[bool] = None,
+                                callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
         """
         Registriert einen neuen Eintrag auf der Blockchain.
 
@@ -162,13 +279,75 @@ class ASIBlockchainClient:
             tags (List[str]): Eine Liste von Tags für den Eintrag (max. 10).
             embedding (bytes): Das Vektor-Embedding des Eintrags (128 bytes).
             timestamp (int): Der Zeitstempel des Eintrags.
+            wait_for_receipt (Optional[bool]): Auf die Bestätigung warten.
+                None übernimmt die Einstellung ``async_submission`` des Clients.
+            callback (Optional[Callable]): Wird im asynchronen Modus mit dem
+                finalen Status-Record aufgerufen.
 
         Returns:
-            str: Der Transaktions-Hash des erfolgreichen Eintrags.
+            str: Der Transaktions-Hash des Eintrags.
 
         Raises:
             ASIBlockchainError: Wenn keine Verbindung zur Blockchain besteht oder die Transaktion fehlschlägt.
         """
+        if wait_for_receipt is None:
+            wait_for_receipt = not self.async_submission
+
+        tx_hash_hex = self._send_register_entry(cid, tags, embedding, timestamp)
+
+        if not wait_for_receipt:
+            self.tx_tracker.track(tx_hash_hex, metadata={"cid": cid, "tags": tags}, callback=callback)
+            logging.info(f"Eintrag gesendet, Bestätigung wird im Hintergrund verfolgt. Hash: {tx_hash_hex}")
+            return tx_hash_hex
+
+        try:
+            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash_hex, timeout=120)
+            if receipt.status == 1:
+                logging.info(f"Transaktion erfolgreich bestätigt in Block {receipt.blockNumber}")
+            else:
+                logging.error(f"Transaktion fehlgeschlagen. Receipt: {receipt}")
+                raise ASIBlockchainError("Transaktion auf der Blockchain fehlgeschlagen.")
+        except ASIBlockchainError:
+            raise
+        except Exception as e:
+            logging.warning(f"Fehler beim Warten auf Bestätigung: {e}. Transaktion wurde gesendet.")
+
+        logging.info(f"Eintrag erfolgreich registriert. Transaktions-Hash: {tx_hash_hex}")
+        return tx_hash_hex
+
+    def submit_entry(self, cid: str, tags: List[str], embedding: bytes, timestamp: int,
+                     callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Future:
+        """
+        Sendet einen Eintrag ohne zu blockieren.
+
+        Args:
+            cid (str): Die Content ID des Eintrags.
+            tags (List[str]): Eine Liste von Tags für den Eintrag (max. 10).
+            embedding (bytes): Das Vektor-Embedding des Eintrags (128 bytes).
+            timestamp (int): Der Zeitstempel des Eintrags.
+            callback (Optional[Callable]): Wird mit dem finalen Status-Record aufgerufen.
+
+        Returns:
+            Future: Wird mit dem Status-Record (``tx_hash``, ``status``,
+            ``block_number``, ...) aufgelöst, sobald die Transaktion bestätigt,
+            fehlgeschlagen oder abgelaufen ist.
+
+        Raises:
+            ASIBlockchainError: Wenn die Transaktion nicht gesendet werden kann.
+        """
+        tx_hash_hex = self._send_register_entry(cid, tags, embedding, timestamp)
+        return self.tx_tracker.track(tx_hash_hex, metadata={"cid": cid, "tags": tags}, callback=callback)
+
+    def _send_register_entry(self, cid: str, tags: List[str], embedding: bytes, timestamp: int) -> str:
+        """
+        Baut, signiert und sendet eine registerEntry-Transaktion.
+
+        Returns:
+            str: Der Transaktions-Hash als Hex-String.
+
+        Raises:
+            ASIBlockchainError: Bei ungültigen Parametern oder Sendefehlern.
+        """
         if not self.is_connected():
             raise ASIBlockchainError("Keine Verbindung zur Blockchain. Transaktion kann nicht gesendet werden.")
 
@@ -182,12 +361,6 @@ class ASIBlockchainClient:
         try:
             logging.info(f"Registriere Eintrag für CID {cid[:10]}... auf der Blockchain.")
             
-            # Gas-Preis und Nonce abrufen
-            gas_price = self.web3.eth.gas_price
-            nonce = self.web3.eth.get_transaction_count(self.account.address)
-            
-            logging.info(f"Gas-Preis: {gas_price}, Nonce: {nonce}")
-            
             # Contract-Funktion aufrufen
             function = self.contract.functions.registerEntry(cid, tags, embedding, timestamp)
             
@@ -199,38 +372,19 @@ class ASIBlockchainClient:
                 logging.warning(f"Gas-Schätzung fehlgeschlagen: {e}. Verwende Standard-Limit.")
                 gas_limit = 500000
             
-            # Transaktion erstellen
+            # Transaktion ohne Nonce erstellen; Nonce, Chain-ID und Gaspreis
+            # vergibt die Sende-Queue lokal statt per RPC
             transaction = function.build_transaction({
-                'chainId': self.web3.eth.chain_id,
+                'chainId': self.tx_queue.chain_id,
                 'gas': gas_limit,
-                'gasPrice': gas_price,
-                'nonce': nonce,
+                'gasPrice': self.tx_queue.gas_price(),
                 'from': self.account.address
             })
             
-            logging.info(f"Transaktion erstellt: {transaction}")
-            
-            # Transaktion signieren
-            signed_txn = self.web3.eth.account.sign_transaction(transaction, self.private_key)
-            
-            # Transaktion senden
-            tx_hash = self.web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_hash_hex = self.web3.to_hex(tx_hash)
+            # Signieren und Senden über die Queue (wartet nur auf das Senden)
+            tx_hash_hex = self.tx_queue.send(transaction)
             
             logging.info(f"Transaktion gesendet. Hash: {tx_hash_hex}")
-            
-            # Auf Bestätigung warten (optional, kann für bessere Performance entfernt werden)
-            try:
-                receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-                if receipt.status == 1:
-                    logging.info(f"Transaktion erfolgreich bestätigt in Block {receipt.blockNumber}")
-                else:
-                    logging.error(f"Transaktion fehlgeschlagen. Receipt: {receipt}")
-                    raise ASIBlockchainError("Transaktion auf der Blockchain fehlgeschlagen.")
-            except Exception as e:
-                logging.warning(f"Fehler beim Warten auf Bestätigung: {e}. Transaktion wurde gesendet.")
-            
-            logging.info(f"Eintrag erfolgreich registriert. Transaktions-Hash: {tx_hash_hex}")
             return tx_hash_hex
             
         except ASIBlockchainError:
@@ -239,7 +393,8 @@ class ASIBlockchainClient:
             logging.error(f"Unerwarteter Fehler bei der Registrierung des Eintrags für CID {cid[:10]}: {e}")
             raise ASIBlockchainError(f"Transaktion fehlgeschlagen: {e}") from e
 
-    def register_hybrid_entry_on_chain(self, cid: str, tags: List[str], embedding: bytes, state_value: int, timestamp: int) -> str:
+    def register_hybrid_entry_on_chain(self, cid: str, tags: List[str], embedding: bytes, state_value: int, timestamp: int,
+                                       callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
         """
         Registriert einen hybriden Eintrag (On-Chain-Daten und Off-Chain-State).
 
@@ -249,13 +404,15 @@ class ASIBlockchainClient:
             embedding (bytes): Das Vektor-Embedding des Eintrags.
             state_value (int): Der Zustandswert, der mit dem Eintrag verknüpft ist.
             timestamp (int): Der Zeitstempel des Eintrags.
+            callback (Optional[Callable]): Wird im asynchronen Modus mit dem
+                finalen Status-Record aufgerufen.
 
         Returns:
             str: Der Transaktions-Hash des erfolgreichen Eintrags.
         """
         # Diese Methode ruft die Hauptregistrierungsmethode auf.
         # In einer echten Implementierung könnte hier eine andere Smart-Contract-Funktion aufgerufen werden.
-        return self.register_entry_on_chain(cid, tags, embedding, timestamp)
+        return self.register_entry_on_chain(cid, tags, embedding, timestamp, callback=callback)
 
     def get_transaction_status(self, tx_hash: str) -> str:
         """
@@ -267,9 +424,15 @@ class ASIBlockchainClient:
         Returns:
             str: Der Status der Transaktion ('pending', 'success', 'failed').
         """
+        # Bereits vom Hintergrund-Tracker aufgelöste Transaktionen ohne RPC beantworten
+        tracked_status = self._tx_tracker.get_status(tx_hash) if self._tx_tracker is not None else None
+        if tracked_status in ("success", "failed"):
+            return tracked_status
+
         if not self.is_connected():
             logging.warning("Keine Verbindung zur Blockchain. Kann Transaktionsstatus nicht abrufen.")
-            return "failed"
+            # Eine verfolgte, noch offene Transaktion ist nicht fehlgeschlagen
+            return "pending" if tracked_status == "pending" else "failed"
 
         try:
             logging.info(f"Frage Status für Transaktion {tx_hash[:10]}... ab.")
@@ -296,7 +459,9 @@ class ASIBlockchainClient:
 
     def get_entries_by_state(self, state_value: int) -> List[Dict]:
         """
-        Ruft alle Einträge mit einem bestimmten Zustandswert von der Blockchain ab.
+        Ruft alle Einträge mit einem bestimmten Zustandswert ab.
+
+        Die Abfrage wird aus dem lokalen Event-Index beantwortet.
 
         Args:
             state_value (int): Der abzufragende Zustandswert.
@@ -305,24 +470,24 @@ class ASIBlockchainClient:
             List[Dict]: Eine Liste von Einträgen, die dem Zustand entsprechen.
         """
         logging.info(f"Suche nach Einträgen mit Zustand {state_value}.")
-        # Mock-Implementierung, gibt immer eine leere Liste zurück.
-        return []
+        if self.indexer is None:
+            return []
+        return self.indexer.get_entries_by_state(state_value)
 
     def get_state_statistics(self) -> Dict:
         """
-        Ruft aggregierte Statistiken über die Zustände auf der Blockchain ab.
+        Ruft aggregierte Statistiken über die Zustände ab.
 
         Returns:
             Dict: Ein Dictionary mit Statistiken, einschließlich 'total_entries',
                   'unique_states' und 'last_update_timestamp'.
         """
         logging.info("Rufe Zustandsstatistiken ab.")
-        # Mock-Implementierung
-        return {
-            "total_entries": 0,
-            "unique_states": 0,
-            "last_update_timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        stats = {"total_entries": 0, "unique_states": 0}
+        if self.indexer is not None:
+            stats.update(self.indexer.get_state_statistics())
+        stats["last_update_timestamp"] = datetime.now(timezone.utc).isoformat()
+        return stats
 
     # =============================================================================
     # Agent-spezifische Methoden für autonome KI-Agenten
@@ -390,7 +555,7 @@ class ASIBlockchainClient:
 
     def get_agent_actions(self, agent_id: str) -> List[Dict]:
         """
-        Ruft alle Aktionen eines spezifischen Agenten von der Blockchain ab.
+        Ruft alle Aktionen eines spezifischen Agenten aus dem lokalen Event-Index ab.
 
         Args:
             agent_id (str): Die Agent-ID zum Filtern.
@@ -398,16 +563,13 @@ class ASIBlockchainClient:
         Returns:
             List[Dict]: Liste aller Aktionen des Agenten.
         """
-        if not self.is_connected():
-            logging.warning("Keine Blockchain-Verbindung für Agent-Abfrage.")
+        if self.indexer is None:
+            logging.warning("Kein Event-Index für Agent-Abfrage verfügbar.")
             return []
 
         try:
             logging.info(f"Suche Aktionen für Agent: {agent_id}")
-            
-            # In einer echten Implementierung würde hier ein Smart-Contract-Call erfolgen
-            # Für Mock-Zwecke geben wir eine leere Liste zurück
-            return []
+            return self.indexer.get_agent_actions(agent_id)
             
         except Exception as e:
             logging.error(f"Fehler beim Abrufen der Agent-Aktionen für {agent_id}: {e}")
@@ -446,7 +608,7 @@ class ASIBlockchainClient:
         Returns:
             Dict: Netzwerk-Statistiken aller Agenten.
         """
-        if not self.is_connected():
+        if self.indexer is None:
             return {
                 "total_agents": 0,
                 "total_actions": 0,
@@ -456,13 +618,8 @@ class ASIBlockchainClient:
 
         try:
             logging.info("Rufe Agent-Netzwerk-Statistiken ab...")
-            
-            # Mock-Implementierung für Demo
             return {
-                "total_agents": 0,
-                "total_actions": 0,
-                "active_agents_24h": 0,
-                "average_confidence": 0.0,
+                **self.indexer.get_agent_network_stats(),
                 "last_update": datetime.now(timezone.utc).isoformat()
             }
             
@@ -512,9 +669,13 @@ def create_blockchain_client_from_config() -> Optional[ASIBlockchainClient]:
     rpc_url = os.getenv("MUMBAI_RPC_URL")
     private_key = os.getenv("PRIVATE_KEY")
     contract_address = os.getenv("ASI_CONTRACT_ADDRESS")
+    async_submission = os.getenv("ASI_ASYNC_TX", "false").lower() in ("1", "true", "yes")
+    index_start_block = int(os.getenv("ASI_CONTRACT_START_BLOCK", "0"))
     
     if all([rpc_url, private_key, contract_address]):
-        return ASIBlockchainClient(rpc_url, private_key, contract_address)
+        return ASIBlockchainClient(rpc_url, private_key, contract_address,
+                                   async_submission=async_submission,
+                                   index_start_block=index_start_block)
     return None
 
 def create_dummy_embedding(text: str, size: int = 128) -> bytes:
@@ -0,0 +1,391 @@
+"""
+ASI Core - Chain Event Indexer
+Lokaler SQLite-Index der EntryRegistered-Events des ASI-Contracts
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Anzahl Blöcke, deren Hash für die Reorg-Erkennung aufbewahrt wird
+REORG_WINDOW = 256
+
+
+def _to_hex(value: Any) -> str:
+    """Normalisiert Hashes (bytes/HexBytes/str) auf '0x'-Hex in Kleinbuchstaben."""
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    text = str(value).lower()
+    return text if text.startswith("0x") else "0x" + text
+
+
+def _tag_value(tags: List[str], name: str) -> Optional[str]:
+    """Gibt den Wert des ersten Tags ``name:<wert>`` zurück."""
+    prefix = f"{name}:"
+    for tag in tags:
+        if tag.startswith(prefix):
+            return tag[len(prefix):]
+    return None
+
+
+class ChainEventIndexer:
+    """
+    Folgt den Contract-Logs seitenweise ab einem Startblock und speichert
+    die dekodierten ``registerEntry``-Einträge in SQLite.
+
+    Tags und Zeitstempel stehen nicht im Event, sondern in den Eingabedaten
+    der auslösenden Transaktion; sie werden einmal pro Transaktion dekodiert.
+    Für die Reorg-Erkennung werden die Hashes der zuletzt indizierten Blöcke
+    gespeichert und vor jedem Sync mit der Chain verglichen. Abweichende
+    Blöcke werden samt ihrer Einträge verworfen und neu indiziert.
+    """
+
+    def __init__(
+        self,
+        web3: Any,
+        contract: Any,
+        db_path: str = "data/blockchain/chain_index.db",
+        start_block: int = 0,
+        page_size: int = 2000,
+        confirmations: int = 0,
+    ):
+        """
+        Initialisiert den Indexer.
+
+        Args:
+            web3: Web3-Instanz.
+            contract: Contract-Instanz mit der ASI-ABI.
+            db_path: Pfad der SQLite-Datenbank.
+            start_block: Erster zu indizierender Block (Deployment-Block).
+            page_size: Maximale Blockspanne pro ``eth_getLogs``-Abfrage.
+            confirmations: Anzahl Blöcke Abstand zur Chain-Spitze.
+        """
+        self.web3 = web3
+        self.contract = contract
+        self.db_path = db_path
+        self.start_block = start_block
+        self.page_size = max(1, page_size)
+        self.confirmations = confirmations
+
+        self._event = contract.events.EntryRegistered()
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_database()
+
+    def _init_database(self) -> None:
+        """Legt Tabellen und Indizes an."""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    tx_hash TEXT NOT NULL,
+                    log_index INTEGER NOT NULL,
+                    entry_id TEXT NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    block_hash TEXT NOT NULL,
+                    owner TEXT,
+                    cid TEXT NOT NULL,
+                    state_value INTEGER NOT NULL,
+                    timestamp INTEGER,
+                    agent_id TEXT,
+                    action_type TEXT,
+                    confidence REAL,
+                    PRIMARY KEY (tx_hash, log_index)
+                )
+            """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entry_tags (
+                    tx_hash TEXT NOT NULL,
+                    log_index INTEGER NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    tag TEXT NOT NULL
+                )
+            """
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, hash TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_state ON entries (state_value)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_agent ON entries (agent_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_block ON entries (block_number)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entry_tags_tag ON entry_tags (tag)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entry_tags_block ON entry_tags (block_number)")
+
+    # ------------------------------------------------------------------
+    # Synchronisation
+    # ------------------------------------------------------------------
+
+    @property
+    def last_block(self) -> int:
+        """Zuletzt vollständig indizierter Block."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'last_block'").fetchone()
+        return int(row["value"]) if row else self.start_block - 1
+
+    def sync(self) -> int:
+        """
+        Indiziert alle neuen Blöcke bis zur (bestätigten) Chain-Spitze.
+
+        Returns:
+            int: Anzahl neu indizierter Einträge.
+        """
+        self._handle_reorg()
+
+        head = int(self.web3.eth.block_number) - self.confirmations
+        from_block = self.last_block + 1
+        indexed = 0
+
+        while from_block <= head:
+            to_block = min(from_block + self.page_size - 1, head)
+            try:
+                logs = self.web3.eth.get_logs({
+                    "address": self.contract.address,
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                    "topics": [self._event.topic],
+                })
+            except Exception as e:
+                if to_block == from_block:
+                    raise
+                # Provider-Limit überschritten: Seite verkleinern
+                self.page_size = max(1, (to_block - from_block + 1) // 2)
+                logger.debug(f"eth_getLogs für {from_block}-{to_block} fehlgeschlagen ({e}), Seitengröße {self.page_size}")
+                continue
+
+            indexed += self._store_page(logs, to_block, head)
+            from_block = to_block + 1
+
+        if indexed:
+            logger.info(f"{indexed} Chain-Einträge indiziert (bis Block {self.last_block})")
+        return indexed
+
+    def _store_page(self, logs: List[Any], to_block: int, head: int) -> int:
+        """Dekodiert und speichert die Logs einer Seite in einer Transaktion."""
+        rows = []
+        decoded_inputs: Dict[str, Tuple[List[str], Optional[int]]] = {}
+        blocks = {}
+        if to_block > head - REORG_WINDOW:
+            # Nur Blöcke nahe der Spitze können noch reorganisiert werden
+            blocks[to_block] = _to_hex(self.web3.eth.get_block(to_block)["hash"])
+
+        for log in logs:
+            event = self._event.process_log(log)
+            tx_hash = _to_hex(event["transactionHash"])
+            if tx_hash not in decoded_inputs:
+                decoded_inputs[tx_hash] = self._decode_input(tx_hash)
+            tags, timestamp = decoded_inputs[tx_hash]
+            blocks[event["blockNumber"]] = _to_hex(event["blockHash"])
+            rows.append((event, tx_hash, tags, timestamp))
+
+        with self._lock, self._conn:
+            for event, tx_hash, tags, timestamp in rows:
+                args = event["args"]
+                confidence = _tag_value(tags, "confidence")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        tx_hash,
+                        event["logIndex"],
+                        _to_hex(args["entryId"]),
+                        event["blockNumber"],
+                        _to_hex(event["blockHash"]),
+                        args["owner"],
+                        args["cid"],
+                        int(args["stateValue"]),
+                        timestamp,
+                        _tag_value(tags, "agent"),
+                        _tag_value(tags, "action"),
+                        float(confidence) if confidence is not None else None,
+                    ),
+                )
+                self._conn.execute(
+                    "DELETE FROM entry_tags WHERE tx_hash = ? AND log_index = ?",
+                    (tx_hash, event["logIndex"]),
+                )
+                self._conn.executemany(
+                    "INSERT INTO entry_tags VALUES (?, ?, ?, ?)",
+                    [(tx_hash, event["logIndex"], event["blockNumber"], tag) for tag in tags],
+                )
+
+            self._conn.executemany("INSERT OR REPLACE INTO blocks VALUES (?, ?)", blocks.items())
+            self._conn.execute("DELETE FROM blocks WHERE number < ?", (head - REORG_WINDOW,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('last_block', ?)", (str(to_block),)
+            )
+
+        return len(rows)
+
+    def _decode_input(self, tx_hash: str) -> Tuple[List[str], Optional[int]]:
+        """Liest Tags und Zeitstempel aus den Eingabedaten der Transaktion."""
+        try:
+            transaction = self.web3.eth.get_transaction(tx_hash)
+            _, params = self.contract.decode_function_input(transaction["input"])
+            return list(params.get("tags", [])), int(params["timestamp"])
+        except Exception as e:
+            logger.debug(f"Eingabedaten von {tx_hash[:10]} nicht dekodierbar: {e}")
+            return [], None
+
+    def _handle_reorg(self) -> None:
+        """Verwirft Blöcke, deren Hash nicht mehr zur kanonischen Chain passt."""
+        with self._lock:
+            known = self._conn.execute("SELECT number, hash FROM blocks ORDER BY number DESC").fetchall()
+
+        if not known:
+            return
+
+        ancestor = None
+        for row in known:
+            if _to_hex(self.web3.eth.get_block(row["number"])["hash"]) == row["hash"]:
+                ancestor = row["number"]
+                break
+
+        if ancestor == known[0]["number"]:
+            return
+
+        if ancestor is None:
+            ancestor = max(known[-1]["number"] - 1, self.start_block - 1)
+
+        logger.warning(f"Chain-Reorg erkannt, verwerfe Index ab Block {ancestor + 1}")
+        with self._lock, self._conn:
+            for table, column in (("entries", "block_number"), ("entry_tags", "block_number"), ("blocks", "number")):
+                self._conn.execute(f"DELETE FROM {table} WHERE {column} > ?", (ancestor,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('last_block', ?)", (str(ancestor),)
+            )
+
+    def start(self, interval: float = 5.0) -> None:
+        """Startet das fortlaufende Nachziehen neuer Blöcke im Hintergrund."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.sync()
+                except Exception as e:
+                    logger.warning(f"Chain-Index-Sync fehlgeschlagen: {e}")
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="asi-chain-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Beendet den Hintergrund-Sync und schließt die Datenbank."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Abfragen
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _entries_with_tags(self, rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        """Ergänzt Einträge um ihre Tags."""
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            entry["tags"] = [
+                tag["tag"]
+                for tag in self._query(
+                    "SELECT tag FROM entry_tags WHERE tx_hash = ? AND log_index = ? ORDER BY rowid",
+                    (row["tx_hash"], row["log_index"]),
+                )
+            ]
+            entries.append(entry)
+        return entries
+
+    def get_entries_by_state(self, state_value: int) -> List[Dict[str, Any]]:
+        """Alle Einträge mit dem angegebenen Zustandswert (älteste zuerst)."""
+        rows = self._query(
+            "SELECT * FROM entries WHERE state_value = ? ORDER BY block_number, log_index",
+            (state_value,),
+        )
+        return self._entries_with_tags(rows)
+
+    def get_entries_by_tag(self, tag: str) -> List[Dict[str, Any]]:
+        """Alle Einträge mit einem bestimmten Tag (älteste zuerst)."""
+        rows = self._query(
+            """
+            SELECT e.* FROM entry_tags t
+            JOIN entries e ON e.tx_hash = t.tx_hash AND e.log_index = t.log_index
+            WHERE t.tag = ?
+            ORDER BY e.block_number, e.log_index
+            """,
+            (tag,),
+        )
+        return self._entries_with_tags(rows)
+
+    def get_agent_actions(self, agent_id: str) -> List[Dict[str, Any]]:
+        """Alle Einträge, an denen ein Agent beteiligt ist."""
+        return self.get_entries_by_tag(f"agent:{agent_id}")
+
+    def get_state_statistics(self) -> Dict[str, Any]:
+        """Aggregierte Zustandsstatistiken des Index."""
+        by_state = {
+            row["state_value"]: row["count"]
+            for row in self._query(
+                "SELECT state_value, COUNT(*) AS count FROM entries GROUP BY state_value"
+            )
+        }
+        last_timestamp = self._query("SELECT MAX(timestamp) AS ts FROM entries")[0]["ts"]
+        return {
+            "total_entries": sum(by_state.values()),
+            "unique_states": len(by_state),
+            "entries_by_state": by_state,
+            "last_entry_timestamp": last_timestamp,
+            "last_indexed_block": self.last_block,
+        }
+
+    def get_agent_network_stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Aggregierte Statistiken über alle indizierten Agent-Einträge."""
+        since = int((now if now is not None else time.time()) - 86400)
+        totals = self._query(
+            """
+            SELECT COUNT(*) AS actions, AVG(confidence) AS confidence
+            FROM entries WHERE action_type IS NOT NULL
+            """
+        )[0]
+        agents = self._query(
+            "SELECT COUNT(DISTINCT tag) AS count FROM entry_tags WHERE tag LIKE 'agent:%'"
+        )[0]["count"]
+        active = self._query(
+            """
+            SELECT COUNT(DISTINCT t.tag) AS count FROM entry_tags t
+            JOIN entries e ON e.tx_hash = t.tx_hash AND e.log_index = t.log_index
+            WHERE t.tag LIKE 'agent:%' AND e.timestamp >= ?
+            """,
+            (since,),
+        )[0]["count"]
+        return {
+            "total_agents": agents,
+            "total_actions": totals["actions"],
+            "active_agents_24h": active,
+            "average_confidence": round(totals["confidence"] or 0.0, 4),
+            "last_indexed_block": self.last_block,
+        }
@@ -0,0 +1,320 @@
+"""
+ASI Core - Collaboration Manager
+Persistente Kollaborationen mit paralleler Ausführung pro Agent
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Endzustände einer Kollaboration
+FINAL_STATUSES = ("completed", "partial", "failed")
+
+
+class CollaborationManager:
+    """
+    Verwaltet Kollaborationen zwischen Agenten.
+
+    Kollaborationen, Statuswechsel und jede Agent-Aktion werden als
+    JSON-Zeilen an ``state_file`` angehängt und beim Start wieder
+    eingelesen. ``run`` verteilt die Arbeit pro Agent auf einen
+    Thread-Pool; Ergebnisse werden beim Eintreffen protokolliert und
+    zusammengeführt, sodass eine Kollaboration so lange dauert wie der
+    langsamste Agent statt der Summe aller Agenten. Nach ``timeout``
+    Sekunden wird mit den bis dahin vorliegenden Teilergebnissen
+    abgeschlossen; noch wartende Arbeit wird abgebrochen. Hängen Agenten
+    darüber hinaus, wird der Pool ersetzt, damit sie keine Worker für
+    spätere Kollaborationen blockieren. Hintergrundarbeit wie die
+    On-Chain-Registrierung läuft in einem eigenen Pool.
+    """
+
+    def __init__(
+        self,
+        state_file: Optional[str] = None,
+        max_workers: int = 8,
+        default_timeout: float = 30.0,
+        background_workers: int = 2,
+    ):
+        """
+        Initialisiert den Manager.
+
+        Args:
+            state_file: JSON-Lines-Datei für Kollaborationen (None = nur im Speicher).
+            max_workers: Maximale Anzahl parallel arbeitender Agenten.
+            default_timeout: Standard-Zeitlimit einer Kollaboration in Sekunden.
+            background_workers: Threads für Hintergrundarbeit (``submit``).
+        """
+        self.state_file = Path(state_file) if state_file else None
+        self.default_timeout = default_timeout
+
+        self.max_workers = max_workers
+
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asi-collab")
+        self._background = ThreadPoolExecutor(
+            max_workers=background_workers, thread_name_prefix="asi-collab-bg"
+        )
+        self._collaborations: Dict[str, Dict[str, Any]] = {}
+
+        self._load_state()
+
+    # ------------------------------------------------------------------
+    # Persistenz
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> None:
+        """Spielt alle gespeicherten Ereignisse ein."""
+        if not self.state_file or not self.state_file.exists():
+            return
+
+        lines = 0
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    lines += 1
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except Exception as e:
+            logger.warning(f"Fehler beim Laden der Kollaborationen: {e}")
+            return
+
+        # Datei kompaktieren, wenn sie überwiegend Einzelereignisse enthält
+        if lines > 2 * max(len(self._collaborations), 1):
+            self._rewrite_state()
+
+        active = len(self.active)
+        if active:
+            logger.info(f"{active} aktive Kollaborationen geladen")
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        """Wendet ein Ereignis auf den Speicherzustand an."""
+        op = event["op"]
+        if op == "create":
+            collaboration = event["collaboration"]
+            self._collaborations[collaboration["id"]] = collaboration
+        elif op == "update":
+            self._collaborations[event["id"]].update(event["fields"])
+        elif op == "action":
+            self._collaborations[event["id"]]["actions"].append(event["action"])
+
+    def _rewrite_state(self) -> None:
+        """Schreibt die Datei mit genau einer Zeile pro Kollaboration neu."""
+        try:
+            tmp_file = self.state_file.with_name(self.state_file.name + ".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for collaboration in self._collaborations.values():
+                    f.write(json.dumps({"op": "create", "collaboration": collaboration}, ensure_ascii=False) + "\n")
+            tmp_file.replace(self.state_file)
+        except Exception as e:
+            logger.warning(f"Fehler beim Kompaktieren der Kollaborationen: {e}")
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        """Wendet ein Ereignis an und hängt es an die Datei an."""
+        with self._lock:
+            self._apply(event)
+            if not self.state_file:
+                return
+            try:
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.state_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+            except Exception as e:
+                logger.warning(f"Fehler beim Speichern der Kollaboration: {e}")
+
+    # ------------------------------------------------------------------
+    # Verwaltung
+    # ------------------------------------------------------------------
+
+    def create(self, agent_ids: List[str], collaboration_type: str, goals: List[str]) -> Dict[str, Any]:
+        """
+        Legt eine neue aktive Kollaboration an.
+
+        Returns:
+            Dict[str, Any]: Die gespeicherte Kollaboration.
+        """
+        collaboration = {
+            "id": str(uuid.uuid4())[:12],
+            "agents": list(agent_ids),
+            "type": collaboration_type,
+            "goals": list(goals),
+            "status": "active",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "actions": [],
+        }
+        self._record({"op": "create", "collaboration": collaboration})
+        return self.get(collaboration["id"])
+
+    def update(self, collab_id: str, **fields: Any) -> None:
+        """Ändert Felder einer Kollaboration (z.B. Status oder TX-Hash)."""
+        self._record({"op": "update", "id": collab_id, "fields": fields})
+
+    def record_action(self, collab_id: str, agent_id: str, action_type: str, data: Any = None) -> None:
+        """Protokolliert eine Agent-Aktion innerhalb einer Kollaboration."""
+        self._record({
+            "op": "action",
+            "id": collab_id,
+            "action": {
+                "agent_id": agent_id,
+                "type": action_type,
+                "data": data,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            },
+        })
+
+    def get(self, collab_id: str) -> Optional[Dict[str, Any]]:
+        """Gibt eine Kollaboration zurück (Live-Objekt, nicht verändern)."""
+        with self._lock:
+            return self._collaborations.get(collab_id)
+
+    @property
+    def active(self) -> Dict[str, Dict[str, Any]]:
+        """Alle noch nicht abgeschlossenen Kollaborationen."""
+        with self._lock:
+            return {
+                collab_id: collaboration
+                for collab_id, collaboration in self._collaborations.items()
+                if collaboration["status"] not in FINAL_STATUSES
+            }
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Führt Hintergrundarbeit (z.B. On-Chain-Registrierung) im eigenen Pool aus."""
+        return self._background.submit(fn, *args, **kwargs)
+
+    def _retire_executor(self, executor: ThreadPoolExecutor) -> None:
+        """Ersetzt einen Pool, dessen Worker von hängenden Agenten belegt sind."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asi-collab")
+        # Bereits eingereihte Arbeit läuft im alten Pool weiter, seine Threads enden danach
+        executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Ausführung
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        collab_id: str,
+        work: Callable[[str], Any],
+        timeout: Optional[float] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Führt ``work(agent_id)`` für alle Agenten parallel aus.
+
+        Jedes Ergebnis wird beim Eintreffen als Aktion protokolliert und an
+        ``on_result`` gemeldet. Nach ``timeout`` Sekunden wird mit den
+        vorliegenden Ergebnissen abgeschlossen: noch nicht gestartete
+        Arbeit wird abgebrochen, laufende wird nicht mehr abgewartet.
+        Später eintreffende Ergebnisse werden noch protokolliert
+        (``late``), zählen aber nicht mehr zum Resultat.
+
+        Args:
+            collab_id: ID der Kollaboration.
+            work: Arbeit eines Agenten; erhält die Agent-ID.
+            timeout: Zeitlimit in Sekunden (default: ``default_timeout``).
+            on_result: Callback ``(agent_id, result)`` pro eingetroffenem Ergebnis.
+
+        Returns:
+            Dict[str, Any]: ``status`` ('completed', 'partial', 'failed'),
+            ``results`` und ``errors`` pro Agent, ``missing`` (Zeitlimit
+            überschritten) und ``duration`` in Sekunden.
+
+        Raises:
+            KeyError: Wenn die Kollaboration unbekannt ist.
+        """
+        collaboration = self.get(collab_id)
+        if collaboration is None:
+            raise KeyError(f"Unbekannte Kollaboration: {collab_id}")
+
+        timeout = self.default_timeout if timeout is None else timeout
+        started = time.monotonic()
+        finished = threading.Event()
+
+        def agent_done(agent_id: str, future: Future) -> None:
+            late = finished.is_set()
+            if future.cancelled():
+                self.record_action(collab_id, agent_id, "cancelled", {"late": late})
+                return
+            try:
+                result = future.result()
+                self.record_action(collab_id, agent_id, "result", {"result": result, "late": late})
+                if on_result and not late:
+                    on_result(agent_id, result)
+            except Exception as e:
+                self.record_action(collab_id, agent_id, "error", {"error": str(e), "late": late})
+
+        with self._lock:
+            executor = self._executor
+
+        futures: Dict[Future, str] = {}
+        for agent_id in collaboration["agents"]:
+            future = executor.submit(work, agent_id)
+            future.add_done_callback(lambda f, agent_id=agent_id: agent_done(agent_id, f))
+            futures[future] = agent_id
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        pending = set(futures)
+        deadline = started + timeout
+
+        # Ergebnisse in Eintreffensreihenfolge einsammeln
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                agent_id = futures[future]
+                try:
+                    results[agent_id] = future.result()
+                except Exception as e:
+                    errors[agent_id] = str(e)
+        finished.set()
+
+        missing = [futures[future] for future in pending]
+        # Wartende Arbeit abbrechen; laufende Agenten lassen sich nicht unterbrechen
+        running = [future for future in pending if not future.cancel() and not future.done()]
+        if running:
+            self._retire_executor(executor)
+        if not results:
+            status = "failed"
+        elif errors or missing:
+            status = "partial"
+        else:
+            status = "completed"
+
+        duration = round(time.monotonic() - started, 3)
+        self.update(collab_id, status=status, completed_at=datetime.now(timezone.utc).isoformat(),
+                    duration=duration, missing=missing)
+
+        if missing:
+            logger.warning(f"Kollaboration {collab_id}: Zeitlimit überschritten für {len(missing)} Agenten")
+
+        return {
+            "id": collab_id,
+            "status": status,
+            "results": results,
+            "errors": errors,
+            "missing": missing,
+            "duration": duration,
+        }
+
+    def close(self) -> None:
+        """Beendet die Thread-Pools, ohne auf hängende Agenten zu warten."""
+        with self._lock:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._background.shutdown(wait=False)
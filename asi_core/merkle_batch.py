@@ -0,0 +1,379 @@
+"""
+ASI Core - Merkle Batching
+Bündelt viele Einträge zu einer einzigen On-Chain-Transaktion über eine Merkle-Wurzel
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Domain-Separation zwischen Blättern und inneren Knoten (verhindert Second-Preimage-Angriffe)
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def hash_entry(entry: Dict[str, Any]) -> bytes:
+    """
+    Berechnet den Blatt-Hash eines Eintrags.
+
+    Args:
+        entry: Eintragsdaten (JSON-serialisierbar).
+
+    Returns:
+        bytes: SHA-256 über die kanonische JSON-Darstellung.
+    """
+    canonical = json.dumps(entry, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(LEAF_PREFIX + canonical.encode("utf-8")).digest()
+
+
+def _hash_pair(left: bytes, right: bytes) -> bytes:
+    """Hash eines inneren Knotens."""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def build_merkle_levels(leaves: List[bytes]) -> List[List[bytes]]:
+    """
+    Baut alle Ebenen eines Merkle-Baums, von den Blättern bis zur Wurzel.
+
+    Ein Knoten ohne Partner wird unverändert in die nächste Ebene übernommen.
+
+    Args:
+        leaves: Blatt-Hashes.
+
+    Returns:
+        List[List[bytes]]: Ebenen; die letzte enthält genau die Wurzel.
+    """
+    if not leaves:
+        raise ValueError("Merkle-Baum benötigt mindestens ein Blatt")
+
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        current = levels[-1]
+        next_level = [
+            _hash_pair(current[i], current[i + 1]) if i + 1 < len(current) else current[i]
+            for i in range(0, len(current), 2)
+        ]
+        levels.append(next_level)
+    return levels
+
+
+def merkle_path(levels: List[List[bytes]], index: int) -> List[Dict[str, str]]:
+    """
+    Erstellt den Inklusionspfad für ein Blatt.
+
+    Args:
+        levels: Ebenen aus ``build_merkle_levels``.
+        index: Position des Blatts.
+
+    Returns:
+        List[Dict[str, str]]: Geschwister-Hashes mit Position ('left'/'right').
+    """
+    path = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append({
+                "position": "left" if sibling < index else "right",
+                "hash": level[sibling].hex(),
+            })
+        index //= 2
+    return path
+
+
+def verify_merkle_path(leaf: bytes, path: List[Dict[str, str]], root: bytes) -> bool:
+    """
+    Prüft, ob ein Blatt über den Pfad zur Wurzel führt.
+
+    Args:
+        leaf: Blatt-Hash.
+        path: Inklusionspfad aus ``merkle_path``.
+        root: Erwartete Merkle-Wurzel.
+
+    Returns:
+        bool: True wenn der Pfad gültig ist.
+    """
+    current = leaf
+    for step in path:
+        sibling = bytes.fromhex(step["hash"])
+        if step["position"] == "left":
+            current = _hash_pair(sibling, current)
+        else:
+            current = _hash_pair(current, sibling)
+    return current == root
+
+
+class MerkleBatcher:
+    """
+    Sammelt Einträge für ein Zeitfenster und registriert nur deren
+    Merkle-Wurzel auf der Blockchain.
+
+    Jeder Eintrag erhält einen lokalen Inklusionsbeweis, der zusammen mit
+    der Batch-Datei in ``batch_dir`` gespeichert wird. Ein Batch wird
+    abgeschlossen, sobald ``window_seconds`` seit dem ersten Eintrag
+    vergangen sind oder ``max_batch_size`` Einträge vorliegen.
+
+    Offene Einträge werden vor der Rückgabe ihrer ID in ``pending.jsonl``
+    festgeschrieben und nach einem Neustart in den nächsten Batch übernommen.
+    """
+
+    def __init__(
+        self,
+        blockchain_client: Optional[Any] = None,
+        window_seconds: float = 10.0,
+        max_batch_size: int = 256,
+        batch_dir: str = "data/blockchain/batches",
+    ):
+        """
+        Initialisiert den Batcher.
+
+        Args:
+            blockchain_client: ASIBlockchainClient für die Wurzel-Registrierung.
+            window_seconds: Maximale Wartezeit eines Eintrags bis zum Batch-Abschluss.
+            max_batch_size: Maximale Anzahl Einträge pro Batch.
+            batch_dir: Verzeichnis für Batch-Dateien mit Beweisen.
+        """
+        self.blockchain_client = blockchain_client
+        self.window_seconds = window_seconds
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_dir = Path(batch_dir)
+
+        self._lock = threading.RLock()
+        self._pending: List[Dict[str, Any]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._proofs: Dict[str, Dict[str, Any]] = {}
+        self._pending_file = self.batch_dir / "pending.jsonl"
+
+        self._load_batches()
+        self._load_pending()
+
+    def _load_batches(self) -> None:
+        """Lädt die Beweise aller abgeschlossenen Batches."""
+        if not self.batch_dir.exists():
+            return
+
+        for batch_file in sorted(self.batch_dir.glob("*.json")):
+            try:
+                with open(batch_file, "r", encoding="utf-8") as f:
+                    batch = json.load(f)
+                for item in batch.get("entries", []):
+                    self._proofs[item["entry_id"]] = self._make_proof(batch, item)
+            except Exception as e:
+                logger.warning(f"Batch-Datei {batch_file} konnte nicht geladen werden: {e}")
+
+    def _load_pending(self) -> None:
+        """Übernimmt offene Einträge eines vorherigen Laufs."""
+        if not self._pending_file.exists():
+            return
+
+        with open(self._pending_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    # Abgebrochene letzte Zeile: Eintrag wurde nie bestätigt
+                    continue
+                # Bereits in einem gespeicherten Batch enthalten (Absturz vor dem Kürzen)
+                if item["entry_id"] not in self._proofs:
+                    self._pending.append(item)
+
+        if self._pending:
+            logger.info(f"{len(self._pending)} offene Merkle-Einträge wiederhergestellt")
+            self._start_timer()
+
+    def _append_pending(self, item: Dict[str, Any]) -> None:
+        """Schreibt einen offenen Eintrag dauerhaft ins Journal."""
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._pending_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_pending(self) -> None:
+        """Kürzt das Journal auf die noch offenen Einträge (unter ``_lock``)."""
+        tmp_file = self._pending_file.with_suffix(".jsonl.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            for item in self._pending:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self._pending_file)
+
+    def _start_timer(self) -> None:
+        """Startet den Timer für den Batch-Abschluss (unter ``_lock``)."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.window_seconds, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @staticmethod
+    def _make_proof(batch: Dict[str, Any], item: Dict[str, Any]) -> Dict[str, Any]:
+        """Erstellt die öffentliche Proof-Struktur für einen Eintrag."""
+        return {
+            "entry_hash": item["entry_id"],
+            "merkle_root": batch["merkle_root"],
+            "path": item["path"],
+            "batch_size": batch["size"],
+            "tx_hash": batch.get("tx_hash"),
+            "timestamp": batch["created_at"],
+            "algorithm": "SHA256-Merkle",
+        }
+
+    def add_entry(self, entry: Dict[str, Any]) -> str:
+        """
+        Fügt einen Eintrag zum aktuellen Batch hinzu.
+
+        Args:
+            entry: Eintragsdaten (JSON-serialisierbar).
+
+        Returns:
+            str: Eintrags-ID (Hex des Blatt-Hashes), mit der später der
+            Beweis abgerufen werden kann. Der Eintrag ist dann bereits im
+            Journal gespeichert.
+        """
+        entry_id = hash_entry(entry).hex()
+        item = {"entry_id": entry_id, "entry": entry}
+
+        with self._lock:
+            self._append_pending(item)
+            self._pending.append(item)
+
+            if len(self._pending) >= self.max_batch_size:
+                self.flush()
+            else:
+                self._start_timer()
+
+        return entry_id
+
+    @property
+    def pending_count(self) -> int:
+        """Anzahl der Einträge im noch offenen Batch."""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """
+        Schließt den aktuellen Batch ab und registriert die Wurzel on-chain.
+
+        Returns:
+            Optional[Dict]: Zusammenfassung des Batches oder None wenn leer.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            items, self._pending = self._pending, []
+
+        if not items:
+            return None
+
+        levels = build_merkle_levels([bytes.fromhex(item["entry_id"]) for item in items])
+        root = levels[-1][0]
+
+        batch = {
+            "merkle_root": root.hex(),
+            "size": len(items),
+            "created_at": time.time(),
+            "tx_hash": self._register_root(root, len(items)),
+            "entries": [
+                {
+                    "entry_id": item["entry_id"],
+                    "entry": item["entry"],
+                    "path": merkle_path(levels, index),
+                }
+                for index, item in enumerate(items)
+            ],
+        }
+
+        saved = self._save_batch(batch)
+
+        with self._lock:
+            for item in batch["entries"]:
+                self._proofs[item["entry_id"]] = self._make_proof(batch, item)
+            if saved:
+                # Erst nach dem Speichern des Batches aus dem Journal entfernen
+                try:
+                    self._rewrite_pending()
+                except OSError as e:
+                    logger.error(f"Fehler beim Kürzen des Merkle-Journals: {e}")
+
+        logger.info(
+            f"Merkle-Batch mit {batch['size']} Einträgen abgeschlossen "
+            f"(Root: {batch['merkle_root'][:16]}..., TX: {batch['tx_hash']})"
+        )
+        return {key: batch[key] for key in ("merkle_root", "size", "tx_hash", "created_at")}
+
+    def _register_root(self, root: bytes, size: int) -> Optional[str]:
+        """Registriert die Merkle-Wurzel mit einer einzigen Transaktion."""
+        client = self.blockchain_client
+        if client is None or not client.is_connected():
+            return None
+
+        try:
+            return client.register_entry_on_chain(
+                cid=f"merkle:{root.hex()}",
+                tags=["type:merkle_batch", f"entries:{size}"],
+                embedding=(root * 4)[:128],
+                timestamp=int(time.time()),
+            )
+        except Exception as e:
+            logger.warning(f"Registrierung der Merkle-Wurzel fehlgeschlagen: {e}")
+            return None
+
+    def _save_batch(self, batch: Dict[str, Any]) -> bool:
+        """Speichert einen Batch inklusive aller Beweise."""
+        try:
+            self.batch_dir.mkdir(parents=True, exist_ok=True)
+            batch_file = self.batch_dir / f"{int(batch['created_at'] * 1000)}_{batch['merkle_root'][:16]}.json"
+            with open(batch_file, "w", encoding="utf-8") as f:
+                json.dump(batch, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern des Merkle-Batches: {e}")
+            return False
+
+    def get_proof(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Gibt den Inklusionsbeweis eines Eintrags zurück.
+
+        Args:
+            entry_id: Eintrags-ID aus ``add_entry``.
+
+        Returns:
+            Optional[Dict]: Beweis oder None, solange der Batch offen ist.
+        """
+        with self._lock:
+            proof = self._proofs.get(entry_id)
+            return dict(proof) if proof else None
+
+    def verify_reflection_proof(self, reflection_data: Dict[str, Any], proof: Dict[str, Any]) -> bool:
+        """
+        Verifiziert einen Inklusionsbeweis (Signatur wie
+        ``ASISmartContract.verify_reflection_proof``).
+
+        Args:
+            reflection_data: Ursprüngliche Eintragsdaten.
+            proof: Beweis aus ``get_proof``.
+
+        Returns:
+            bool: True wenn der Eintrag in der angegebenen Wurzel enthalten ist.
+        """
+        try:
+            leaf = hash_entry(reflection_data)
+            if leaf.hex() != proof["entry_hash"]:
+                return False
+            return verify_merkle_path(leaf, proof["path"], bytes.fromhex(proof["merkle_root"]))
+        except (KeyError, ValueError, TypeError):
+            return False
+
+    def close(self) -> None:
+        """Schließt den offenen Batch ab."""
+        self.flush()
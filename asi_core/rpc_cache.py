@@ -0,0 +1,166 @@
+"""
+ASI Core - RPC Read Cache
+Gebündelte und zwischengespeicherte Lesezugriffe auf die Blockchain
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ChainReadCache:
+    """
+    Lese-Schicht für Contract-Abfragen.
+
+    - Unveränderliche Werte (Chain-ID, Decimals, ...) werden einmalig
+      abgefragt und dauerhaft gehalten.
+    - Veränderliche Werte (Balances, Supply, ...) gelten pro Blocknummer.
+      Die Blocknummer selbst wird höchstens alle ``block_ttl`` Sekunden
+      neu gelesen.
+    - Fehlende Werte werden in einem einzigen JSON-RPC-Batch abgefragt
+      (``web3.batch_requests``, web3 >= 7), zusammen mit der Blocknummer.
+      Ohne Batch-Unterstützung wird sequenziell abgefragt.
+    """
+
+    def __init__(self, web3: Any, block_ttl: float = 2.0):
+        """
+        Initialisiert den Cache.
+
+        Args:
+            web3: Web3-Instanz.
+            block_ttl: Sekunden, die eine gelesene Blocknummer als aktuell gilt
+                (ungefähr die Blockzeit der Chain).
+        """
+        self.web3 = web3
+        self.block_ttl = block_ttl
+
+        self._lock = threading.Lock()
+        self._immutable: Dict[str, Any] = {}
+        self._per_block: Dict[str, Tuple[int, Any]] = {}
+        self._block_number: Optional[int] = None
+        self._block_read_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Unveränderliche Werte
+    # ------------------------------------------------------------------
+
+    def immutable(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Gibt einen unveränderlichen Wert zurück und lädt ihn nur beim ersten Zugriff.
+
+        Args:
+            key: Cache-Schlüssel.
+            loader: Funktion, die den Wert per RPC lädt.
+
+        Returns:
+            Any: Der (zwischengespeicherte) Wert.
+        """
+        with self._lock:
+            if key in self._immutable:
+                return self._immutable[key]
+
+        value = loader()
+        with self._lock:
+            self._immutable.setdefault(key, value)
+            return self._immutable[key]
+
+    @property
+    def chain_id(self) -> int:
+        """Chain-ID (dauerhaft zwischengespeichert)."""
+        return self.immutable("chain_id", lambda: int(self.web3.eth.chain_id))
+
+    # ------------------------------------------------------------------
+    # Blockabhängige Werte
+    # ------------------------------------------------------------------
+
+    def _fresh_block_number(self) -> Optional[int]:
+        """Blocknummer, falls sie jünger als ``block_ttl`` ist."""
+        with self._lock:
+            if self._block_number is not None and time.monotonic() - self._block_read_at < self.block_ttl:
+                return self._block_number
+        return None
+
+    def _set_block_number(self, block_number: int) -> None:
+        with self._lock:
+            self._block_number = int(block_number)
+            self._block_read_at = time.monotonic()
+
+    def block_number(self) -> int:
+        """Aktuelle Blocknummer (höchstens ``block_ttl`` Sekunden alt)."""
+        block = self._fresh_block_number()
+        if block is None:
+            block = int(self.web3.eth.block_number)
+            self._set_block_number(block)
+        return block
+
+    def read(self, calls: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Liest mehrere Contract-Funktionen mit höchstens einem Round-Trip.
+
+        Args:
+            calls: Name -> vorbereitete Contract-Funktion (ohne ``.call()``),
+                z.B. ``contract.functions.totalSupply()``.
+
+        Returns:
+            Dict[str, Any]: Name -> Rückgabewert für den aktuellen Block.
+        """
+        block = self._fresh_block_number()
+        results: Dict[str, Any] = {}
+        missing: Dict[str, Any] = {}
+
+        with self._lock:
+            for name, function in calls.items():
+                cached = self._per_block.get(name)
+                if block is not None and cached is not None and cached[0] == block:
+                    results[name] = cached[1]
+                else:
+                    missing[name] = function
+
+        if not missing:
+            return results
+
+        fetched, block = self._fetch(missing, block)
+
+        with self._lock:
+            for name, value in fetched.items():
+                self._per_block[name] = (block, value)
+        results.update(fetched)
+        return results
+
+    def invalidate(self, *keys: str) -> None:
+        """Verwirft blockabhängige Werte (z.B. nach einer eigenen Transaktion)."""
+        with self._lock:
+            if not keys:
+                self._per_block.clear()
+            for key in keys:
+                self._per_block.pop(key, None)
+
+    def _fetch(self, calls: Dict[str, Any], block: Optional[int]) -> Tuple[Dict[str, Any], int]:
+        """Fragt Werte (und ggf. die Blocknummer) gebündelt ab."""
+        if hasattr(self.web3, "batch_requests"):
+            try:
+                return self._fetch_batch(calls, block)
+            except Exception as e:
+                logger.debug(f"JSON-RPC-Batch fehlgeschlagen, frage sequenziell ab: {e}")
+
+        if block is None:
+            block = self.block_number()
+        return {name: function.call() for name, function in calls.items()}, block
+
+    def _fetch_batch(self, calls: Dict[str, Any], block: Optional[int]) -> Tuple[Dict[str, Any], int]:
+        """Ein einziger JSON-RPC-Batch für alle Werte plus Blocknummer."""
+        names = list(calls)
+        with self.web3.batch_requests() as batch:
+            if block is None:
+                batch.add(self.web3.eth.get_block_number())
+            for name in names:
+                batch.add(calls[name])
+            responses = list(batch.execute())
+
+        if block is None:
+            block = int(responses.pop(0))
+            self._set_block_number(block)
+        return dict(zip(names, responses)), block
@@ -6,12 +6,12 @@ Implementierung von Vektor-Embeddings und semantischer Suche für das ASI-System
 import json
 import logging
 import pickle
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 # Logger konfigurieren
 logger = logging.getLogger(__name__)
@@ -20,31 +20,83 @@ logger = logging.getLogger(__name__)
 EMBEDDING_CACHE = {}
 EMBEDDING_METADATA = {}
 
+# Geladene Modelle pro Name; sentence-transformers wird erst beim ersten Bedarf importiert
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def load_model(model_name: str):
+    """
+    Lädt ein sentence-transformers Modell genau einmal pro Prozess
+
+    Args:
+        model_name: Name des vortrainierten Modells
+
+    Returns:
+        SentenceTransformer: Geladenes Modell
+    """
+    model = _MODELS.get(model_name)
+    if model is not None:
+        return model
+
+    with _MODELS_LOCK:
+        if model_name not in _MODELS:
+            from sentence_transformers import SentenceTransformer
+
+            logger.info(f"Lade sentence-transformers Modell: {model_name}")
+            _MODELS[model_name] = SentenceTransformer(model_name)
+            logger.info("Modell erfolgreich geladen")
+        return _MODELS[model_name]
+
 
 class ASIEmbeddingGenerator:
     """Generator für semantische Embeddings mit sentence-transformers"""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", lazy: bool = True):
         """
         Initialisiert den Embedding-Generator
 
         Args:
             model_name: Name des vortrainierten sentence-transformers Modells
+            lazy: Modell erst beim ersten Embedding laden (False = sofort)
         """
         self.model_name = model_name
         self.model = None
-        self._load_model()
+        self._embedding_layout = None
+        if not lazy:
+            self._load_model()
 
     def _load_model(self):
         """Lädt das sentence-transformers Modell"""
         try:
-            logger.info(f"Lade sentence-transformers Modell: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
-            logger.info("Modell erfolgreich geladen")
+            self.model = load_model(self.model_name)
         except Exception as e:
             logger.error(f"Fehler beim Laden des Modells: {e}")
             raise
 
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Lädt das Modell vorab, optional in einem Hintergrund-Thread
+
+        Returns:
+            Optional[threading.Thread]: Thread beim Laden im Hintergrund
+        """
+        if self.model is not None:
+            return None
+        if not background:
+            self._load_model()
+            return None
+
+        def run():
+            try:
+                self._load_model()
+            except Exception:
+                pass  # bereits geloggt; der nächste Zugriff versucht es erneut
+
+        thread = threading.Thread(target=run, name="asi-model-warmup", daemon=True)
+        thread.start()
+        return thread
+
     def generate_embedding(self, text: str) -> bytes:
         """
         Generiert ein Embedding für den gegebenen Text
@@ -108,14 +160,13 @@ class ASIEmbeddingGenerator:
             np.ndarray: Embedding als numpy array
         """
         try:
-            # Dimensionen des Modells abrufen
-            if not self.model:
-                self._load_model()
-
-            # Beispiel-Embedding generieren um Dimensionen zu ermitteln
-            sample_embedding = self.model.encode("test", convert_to_numpy=True)
-            expected_shape = sample_embedding.shape
-            expected_dtype = sample_embedding.dtype
+            # Dimensionen des Modells einmalig über ein Beispiel-Embedding ermitteln
+            if self._embedding_layout is None:
+                if not self.model:
+                    self._load_model()
+                sample_embedding = self.model.encode("test", convert_to_numpy=True)
+                self._embedding_layout = (sample_embedding.shape, sample_embedding.dtype)
+            expected_shape, expected_dtype = self._embedding_layout
 
             # Bytes zu numpy array konvertieren
             embedding = np.frombuffer(embedding_bytes, dtype=expected_dtype)
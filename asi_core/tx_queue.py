@@ -0,0 +1,442 @@
+"""
+ASI Core - Nonce Manager und Transaktions-Queue
+Lokale Nonce-Vergabe und gepipelinetes Senden von Transaktionen
+"""
+
+import heapq
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Geteilte Nonce-Manager pro (Chain-ID, Adresse) innerhalb des Prozesses
+_nonce_managers: Dict[Tuple[int, str], "NonceManager"] = {}
+_nonce_managers_lock = threading.Lock()
+
+
+def get_nonce_manager(web3: Any, address: str, chain_id: Optional[int] = None) -> "NonceManager":
+    """
+    Gibt den prozessweit geteilten Nonce-Manager für eine Adresse zurück.
+
+    Alle Clients, die mit demselben Account auf derselben Chain senden,
+    müssen sich einen Manager teilen, sonst vergeben sie dieselben Nonces.
+
+    Args:
+        web3: Web3-Instanz der Chain.
+        address: Absender-Adresse.
+        chain_id: Bereits bekannte Chain-ID (spart einen RPC-Aufruf).
+
+    Returns:
+        NonceManager: Der geteilte Manager.
+    """
+    key = (int(chain_id if chain_id is not None else web3.eth.chain_id), address.lower())
+    with _nonce_managers_lock:
+        manager = _nonce_managers.get(key)
+        if manager is None:
+            manager = NonceManager(web3, address)
+            _nonce_managers[key] = manager
+        return manager
+
+
+class NonceManager:
+    """
+    Vergibt Nonces lokal statt pro Transaktion ``get_transaction_count``
+    abzufragen.
+
+    Der Startwert wird einmalig von der Chain (``pending``) gelesen. Nonces
+    von Transaktionen, die nie gesendet wurden, werden mit ``release``
+    zurückgegeben und bevorzugt wiederverwendet, damit keine Lücken entstehen.
+    """
+
+    def __init__(self, web3: Any, address: str):
+        """
+        Initialisiert den Nonce-Manager.
+
+        Args:
+            web3: Web3-Instanz der Chain.
+            address: Absender-Adresse.
+        """
+        self.web3 = web3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce: Optional[int] = None
+        self._released: List[int] = []
+
+    def allocate(self) -> int:
+        """
+        Reserviert die nächste freie Nonce.
+
+        Returns:
+            int: Die reservierte Nonce.
+        """
+        with self._lock:
+            if self._released:
+                return heapq.heappop(self._released)
+            if self._next_nonce is None:
+                self._next_nonce = self.web3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def release(self, nonce: int) -> None:
+        """
+        Gibt eine nicht gesendete Nonce zurück.
+
+        Args:
+            nonce: Die zurückzugebende Nonce.
+        """
+        with self._lock:
+            if self._next_nonce is not None and nonce == self._next_nonce - 1:
+                self._next_nonce -= 1
+            elif nonce not in self._released:
+                heapq.heappush(self._released, nonce)
+
+    def resync(self) -> int:
+        """
+        Gleicht den lokalen Zähler mit der Chain ab (z.B. nach "nonce too low").
+
+        Returns:
+            int: Die nächste Nonce nach dem Abgleich.
+        """
+        with self._lock:
+            chain_nonce = self.web3.eth.get_transaction_count(self.address, "pending")
+            self._next_nonce = max(chain_nonce, self._next_nonce or 0)
+            self._released = [n for n in self._released if n >= chain_nonce]
+            heapq.heapify(self._released)
+            return self._next_nonce
+
+    def confirmed_nonce(self) -> int:
+        """Gibt die Anzahl bestätigter Transaktionen (``latest``) zurück."""
+        return self.web3.eth.get_transaction_count(self.address, "latest")
+
+    def find_gaps(self, confirmed_nonce: int, in_flight: Any) -> List[int]:
+        """
+        Ermittelt Nonces, die vergeben, aber nie gesendet wurden.
+
+        Solche Lücken blockieren alle höheren Transaktionen im Mempool.
+
+        Args:
+            confirmed_nonce: Aktuelle bestätigte Nonce der Chain.
+            in_flight: Menge der Nonces, die gesendet und unbestätigt sind.
+
+        Returns:
+            List[int]: Lückennonces unterhalb der höchsten offenen Nonce.
+        """
+        if not in_flight:
+            return []
+        highest = max(in_flight)
+        with self._lock:
+            released = set(self._released)
+        return [
+            nonce for nonce in range(confirmed_nonce, highest)
+            if nonce not in in_flight and nonce in released
+        ]
+
+    def claim(self, nonce: int) -> bool:
+        """
+        Entfernt eine zurückgegebene Nonce gezielt aus dem Pool.
+
+        Returns:
+            bool: True wenn die Nonce frei war und jetzt reserviert ist.
+        """
+        with self._lock:
+            if nonce not in self._released:
+                return False
+            self._released.remove(nonce)
+            heapq.heapify(self._released)
+            return True
+
+
+@dataclass
+class _InFlightTransaction:
+    """Gesendete, noch unbestätigte Transaktion"""
+    nonce: int
+    transaction: Dict[str, Any]
+    tx_hash: str
+    sent_at: float
+
+
+class TransactionQueue:
+    """
+    Gepipelinete Sende-Queue für signierte Transaktionen.
+
+    Aufrufer übergeben fertig gebaute Transaktionen ohne Nonce. Ein
+    Worker-Thread vergibt Nonces über den geteilten ``NonceManager``, setzt
+    zwischengespeicherten Gaspreis und Chain-ID, signiert und sendet, ohne
+    auf Bestätigungen zu warten. Bis zu ``max_in_flight`` Transaktionen
+    können gleichzeitig offen sein. Ein periodischer Abgleich entfernt
+    bestätigte Transaktionen, füllt Nonce-Lücken mit Null-Transfers und
+    ersetzt hängende Transaktionen mit erhöhtem Gaspreis.
+    """
+
+    def __init__(
+        self,
+        web3: Any,
+        private_key: str,
+        nonce_manager: Optional[NonceManager] = None,
+        max_in_flight: int = 64,
+        stuck_timeout: float = 180.0,
+        gas_bump: float = 1.125,
+        gas_price_ttl: float = 15.0,
+        monitor_interval: float = 5.0,
+        tracker: Optional[Any] = None,
+        chain_id: Optional[int] = None,
+    ):
+        """
+        Initialisiert die Transaktions-Queue.
+
+        Args:
+            web3: Web3-Instanz der Chain.
+            private_key: Privater Schlüssel des Absenders.
+            nonce_manager: Nonce-Manager (default: geteilter Manager der Adresse).
+            max_in_flight: Maximale Anzahl gleichzeitig offener Transaktionen.
+            stuck_timeout: Sekunden, nach denen eine blockierende Transaktion ersetzt wird.
+            gas_bump: Faktor für den Gaspreis von Ersatz-Transaktionen (>= 1.1).
+            gas_price_ttl: Sekunden, die ein abgefragter Gaspreis gültig bleibt.
+            monitor_interval: Sekunden zwischen zwei Abgleichen mit der Chain.
+            tracker: Optionaler TransactionTracker, der über Ersetzungen informiert wird.
+            chain_id: Bereits bekannte Chain-ID (sonst einmalig abgefragt).
+        """
+        self.web3 = web3
+        self.private_key = private_key
+        self.address = web3.eth.account.from_key(private_key).address
+        self.nonce_manager = nonce_manager or get_nonce_manager(web3, self.address, chain_id)
+        self.max_in_flight = max_in_flight
+        self.stuck_timeout = stuck_timeout
+        self.gas_bump = gas_bump
+        self.gas_price_ttl = gas_price_ttl
+        self.monitor_interval = monitor_interval
+        self.tracker = tracker
+
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], Future]]" = queue.Queue()
+        self._in_flight: Dict[int, _InFlightTransaction] = {}
+        self._in_flight_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self._chain_id: Optional[int] = chain_id
+        self._gas_price: Optional[int] = None
+        self._gas_price_at = 0.0
+        self._last_monitor = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Zwischengespeicherte Chain-Werte
+    # ------------------------------------------------------------------
+
+    @property
+    def chain_id(self) -> int:
+        """Chain-ID (einmalig abgefragt, unveränderlich)."""
+        if self._chain_id is None:
+            self._chain_id = int(self.web3.eth.chain_id)
+        return self._chain_id
+
+    def gas_price(self) -> int:
+        """Aktueller Gaspreis, höchstens ``gas_price_ttl`` Sekunden alt."""
+        now = time.monotonic()
+        if self._gas_price is None or now - self._gas_price_at > self.gas_price_ttl:
+            self._gas_price = int(self.web3.eth.gas_price)
+            self._gas_price_at = now
+        return self._gas_price
+
+    # ------------------------------------------------------------------
+    # Öffentliche API
+    # ------------------------------------------------------------------
+
+    def submit(self, transaction: Dict[str, Any]) -> Future:
+        """
+        Reiht eine Transaktion zum Senden ein.
+
+        Args:
+            transaction: Gebaute Transaktion; ``nonce`` wird überschrieben,
+                ``chainId`` und ``gasPrice`` werden bei Bedarf ergänzt.
+
+        Returns:
+            Future: Wird mit dem Transaktions-Hash aufgelöst, sobald gesendet.
+        """
+        future: Future = Future()
+        self._queue.put((dict(transaction), future))
+        self._ensure_running()
+        return future
+
+    def send(self, transaction: Dict[str, Any], timeout: Optional[float] = 60.0) -> str:
+        """
+        Sendet eine Transaktion über die Queue und wartet nur auf das Senden.
+
+        Returns:
+            str: Der Transaktions-Hash.
+        """
+        return self.submit(transaction).result(timeout)
+
+    @property
+    def in_flight_count(self) -> int:
+        """Anzahl gesendeter, noch unbestätigter Transaktionen."""
+        with self._in_flight_lock:
+            return len(self._in_flight)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Beendet den Worker-Thread."""
+        self._stopped.set()
+        if self._thread is not None:
+            # Wartenden Worker sofort aufwecken
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_running(self) -> None:
+        """Startet den Worker-Thread bei Bedarf."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="asi-tx-queue", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Hauptschleife: sendet eingereihte Transaktionen und gleicht ab."""
+        while not self._stopped.is_set():
+            try:
+                item = self._queue.get(timeout=self.monitor_interval)
+            except queue.Empty:
+                item = None
+            if item is None and self._stopped.is_set():
+                break
+            transaction, future = item or (None, None)
+
+            try:
+                if future is not None:
+                    while self.in_flight_count >= self.max_in_flight and not self._stopped.is_set():
+                        self.monitor()
+                        if self.in_flight_count >= self.max_in_flight:
+                            time.sleep(min(self.monitor_interval, 1.0))
+                    self._send(transaction, future)
+
+                if time.monotonic() - self._last_monitor >= self.monitor_interval:
+                    self.monitor()
+            except Exception as e:
+                logger.error(f"Fehler in der Transaktions-Queue: {e}")
+                if future is not None and not future.done():
+                    future.set_exception(e)
+
+    def _send(self, transaction: Dict[str, Any], future: Future) -> None:
+        """Vergibt eine Nonce, signiert und sendet eine Transaktion."""
+        transaction.setdefault("chainId", self.chain_id)
+        transaction.setdefault("gasPrice", self.gas_price())
+
+        for attempt in range(2):
+            nonce = self.nonce_manager.allocate()
+            transaction["nonce"] = nonce
+            try:
+                tx_hash = self._sign_and_send(transaction)
+            except Exception as e:
+                if attempt == 0 and "nonce too low" in str(e).lower():
+                    # Andere Prozesse haben gesendet - Zähler neu abgleichen
+                    logger.warning("Nonce zu niedrig, gleiche mit der Chain ab")
+                    self.nonce_manager.resync()
+                    continue
+                self.nonce_manager.release(nonce)
+                future.set_exception(e)
+                return
+
+            with self._in_flight_lock:
+                self._in_flight[nonce] = _InFlightTransaction(
+                    nonce=nonce,
+                    transaction=dict(transaction),
+                    tx_hash=tx_hash,
+                    sent_at=time.monotonic(),
+                )
+            logger.debug(f"Transaktion {tx_hash[:10]}... mit Nonce {nonce} gesendet")
+            future.set_result(tx_hash)
+            return
+
+    def _sign_and_send(self, transaction: Dict[str, Any]) -> str:
+        """Signiert und sendet eine Transaktion, gibt den Hex-Hash zurück."""
+        signed = self.web3.eth.account.sign_transaction(transaction, self.private_key)
+        # web3 >= 7 heißt das Attribut raw_transaction
+        raw = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+        tx_hash = self.web3.eth.send_raw_transaction(raw)
+        return self.web3.to_hex(tx_hash)
+
+    def monitor(self) -> None:
+        """
+        Gleicht offene Transaktionen mit der Chain ab.
+
+        Entfernt bestätigte Transaktionen, füllt Nonce-Lücken und ersetzt
+        die niedrigste offene Transaktion, wenn sie länger als
+        ``stuck_timeout`` hängt.
+        """
+        self._last_monitor = time.monotonic()
+        with self._in_flight_lock:
+            if not self._in_flight:
+                return
+
+        confirmed = self.nonce_manager.confirmed_nonce()
+
+        with self._in_flight_lock:
+            for nonce in [n for n in self._in_flight if n < confirmed]:
+                del self._in_flight[nonce]
+            in_flight = set(self._in_flight)
+            blocking = self._in_flight.get(confirmed)
+
+        for nonce in self.nonce_manager.find_gaps(confirmed, in_flight):
+            if self.nonce_manager.claim(nonce):
+                self._fill_gap(nonce)
+
+        if blocking and time.monotonic() - blocking.sent_at > self.stuck_timeout:
+            self._replace(blocking)
+
+    def _fill_gap(self, nonce: int) -> None:
+        """Belegt eine Nonce-Lücke mit einem Null-Transfer an sich selbst."""
+        transaction = {
+            "from": self.address,
+            "to": self.address,
+            "value": 0,
+            "gas": 21000,
+            "gasPrice": int(self.gas_price() * self.gas_bump),
+            "chainId": self.chain_id,
+            "nonce": nonce,
+        }
+        try:
+            tx_hash = self._sign_and_send(transaction)
+        except Exception as e:
+            logger.error(f"Nonce-Lücke {nonce} konnte nicht gefüllt werden: {e}")
+            self.nonce_manager.release(nonce)
+            return
+
+        logger.warning(f"Nonce-Lücke {nonce} mit Null-Transfer {tx_hash[:10]}... gefüllt")
+        with self._in_flight_lock:
+            self._in_flight[nonce] = _InFlightTransaction(nonce, transaction, tx_hash, time.monotonic())
+
+    def _replace(self, entry: _InFlightTransaction) -> None:
+        """Sendet eine hängende Transaktion mit erhöhtem Gaspreis erneut."""
+        transaction = dict(entry.transaction)
+        bumped = int(transaction.get("gasPrice", 0) * self.gas_bump) + 1
+        transaction["gasPrice"] = max(bumped, self.gas_price())
+
+        try:
+            tx_hash = self._sign_and_send(transaction)
+        except Exception as e:
+            logger.error(f"Ersetzen der Transaktion mit Nonce {entry.nonce} fehlgeschlagen: {e}")
+            return
+
+        logger.warning(
+            f"Hängende Transaktion {entry.tx_hash[:10]}... durch {tx_hash[:10]}... ersetzt "
+            f"(Gaspreis {transaction['gasPrice']})"
+        )
+        with self._in_flight_lock:
+            self._in_flight[entry.nonce] = _InFlightTransaction(
+                entry.nonce, transaction, tx_hash, time.monotonic()
+            )
+        if self.tracker is not None:
+            self.tracker.replace(entry.tx_hash, tx_hash)
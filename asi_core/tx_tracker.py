@@ -0,0 +1,335 @@
+"""
+ASI Core - Transaction Tracker
+Verfolgt gesendete Transaktionen im Hintergrund bis zur Bestätigung
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Endzustände einer verfolgten Transaktion
+FINAL_STATUSES = ("success", "failed", "timeout", "replaced")
+
+
+class TransactionTracker:
+    """
+    Hintergrund-Tracker für Transaktions-Receipts.
+
+    Gesendete Transaktionen werden mit ``track`` registriert. Ein Daemon-Thread
+    fragt in festen Abständen die Receipts aller offenen Transaktionen ab,
+    löst die zugehörigen Futures/Callbacks auf und schreibt jeden
+    Statuswechsel als JSON-Zeile in ``state_file``. Beim Start werden noch
+    offene Transaktionen aus dieser Datei wieder aufgenommen.
+    """
+
+    def __init__(
+        self,
+        web3: Any,
+        state_file: Optional[str] = None,
+        poll_interval: float = 2.0,
+        timeout: float = 600.0,
+    ):
+        """
+        Initialisiert den Tracker.
+
+        Args:
+            web3: Web3-Instanz für Receipt-Abfragen.
+            state_file: JSON-Lines-Datei für Statuspersistenz (None = nur im Speicher).
+            poll_interval: Sekunden zwischen zwei Receipt-Abfragen.
+            timeout: Sekunden, nach denen eine unbestätigte Transaktion aufgegeben wird.
+        """
+        self.web3 = web3
+        self.state_file = Path(state_file) if state_file else None
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, float] = {}
+        self._futures: Dict[str, List[Future]] = {}
+        self._callbacks: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+
+        self._load_state()
+
+    # ------------------------------------------------------------------
+    # Persistenz
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> None:
+        """Lädt bekannte Transaktionen und nimmt offene wieder auf."""
+        if not self.state_file or not self.state_file.exists():
+            return
+
+        lines = 0
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                        self._records[record["tx_hash"]] = record
+                    except (ValueError, KeyError):
+                        continue
+        except Exception as e:
+            logger.warning(f"Fehler beim Laden des Transaktionsstatus: {e}")
+            return
+
+        now = time.time()
+        for tx_hash, record in self._records.items():
+            if record.get("status") == "pending":
+                self._pending[tx_hash] = record.get("submitted_at", now)
+
+        # Datei kompaktieren, wenn sie überwiegend veraltete Zeilen enthält
+        if lines > 2 * max(len(self._records), 1):
+            self._rewrite_state()
+
+        if self._pending:
+            logger.info(f"{len(self._pending)} offene Transaktionen wieder aufgenommen")
+            self._ensure_running()
+
+    def _rewrite_state(self) -> None:
+        """Schreibt die Statusdatei mit genau einer Zeile pro Transaktion neu."""
+        try:
+            tmp_file = self.state_file.with_name(self.state_file.name + ".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for record in self._records.values():
+                    f.write(json.dumps(record) + "\n")
+            tmp_file.replace(self.state_file)
+        except Exception as e:
+            logger.warning(f"Fehler beim Kompaktieren des Transaktionsstatus: {e}")
+
+    def _persist(self, record: Dict[str, Any]) -> None:
+        """Hängt einen Statuswechsel an die Statusdatei an."""
+        if not self.state_file:
+            return
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logger.warning(f"Fehler beim Speichern des Transaktionsstatus: {e}")
+
+    # ------------------------------------------------------------------
+    # Öffentliche API
+    # ------------------------------------------------------------------
+
+    def track(
+        self,
+        tx_hash: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Future:
+        """
+        Registriert eine gesendete Transaktion zur Überwachung.
+
+        Args:
+            tx_hash: Hex-Hash der Transaktion.
+            metadata: Zusätzliche Angaben, die mit dem Status gespeichert werden.
+            callback: Wird mit dem finalen Status-Record aufgerufen.
+
+        Returns:
+            Future, das mit dem finalen Status-Record aufgelöst wird.
+        """
+        future: Future = Future()
+
+        with self._lock:
+            record = self._records.get(tx_hash)
+            if record and record.get("status") in FINAL_STATUSES:
+                # Bereits abgeschlossen - sofort auflösen
+                resolved = dict(record)
+            else:
+                resolved = None
+                if record is None:
+                    record = {
+                        "tx_hash": tx_hash,
+                        "status": "pending",
+                        "submitted_at": time.time(),
+                        "metadata": metadata or {},
+                    }
+                    self._records[tx_hash] = record
+                    self._persist(record)
+                self._pending.setdefault(tx_hash, record["submitted_at"])
+                self._futures.setdefault(tx_hash, []).append(future)
+                if callback:
+                    self._callbacks.setdefault(tx_hash, []).append(callback)
+
+        if resolved is not None:
+            future.set_result(resolved)
+            if callback:
+                self._run_callback(callback, resolved)
+        else:
+            self._ensure_running()
+            self._wakeup.set()
+
+        return future
+
+    def replace(self, old_hash: str, new_hash: str) -> None:
+        """
+        Überträgt die Verfolgung auf eine Ersatz-Transaktion (gleiche Nonce).
+
+        Futures und Callbacks der alten Transaktion werden mit dem Ergebnis
+        der neuen aufgelöst; die alte erhält den Status 'replaced'.
+
+        Args:
+            old_hash: Hash der ersetzten Transaktion.
+            new_hash: Hash der Ersatz-Transaktion.
+        """
+        with self._lock:
+            old_record = self._records.get(old_hash)
+            if old_record is None or old_record.get("status") in FINAL_STATUSES:
+                return
+
+            new_record = dict(old_record, tx_hash=new_hash, replaces=old_hash)
+            self._records[new_hash] = new_record
+            self._pending[new_hash] = self._pending.pop(old_hash, new_record["submitted_at"])
+            self._futures[new_hash] = self._futures.pop(old_hash, [])
+            self._callbacks[new_hash] = self._callbacks.pop(old_hash, [])
+
+            old_record = dict(old_record, status="replaced", replaced_by=new_hash)
+            self._records[old_hash] = old_record
+            self._persist(old_record)
+            self._persist(new_record)
+
+    def get_status(self, tx_hash: str) -> Optional[str]:
+        """
+        Gibt den zuletzt bekannten Status einer Transaktion zurück.
+
+        Returns:
+            'pending', 'success', 'failed', 'timeout', 'replaced' oder None wenn unbekannt.
+        """
+        with self._lock:
+            record = self._records.get(tx_hash)
+            return record.get("status") if record else None
+
+    def get_record(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Gibt eine Kopie des Status-Records einer Transaktion zurück."""
+        with self._lock:
+            record = self._records.get(tx_hash)
+            return dict(record) if record else None
+
+    @property
+    def pending_count(self) -> int:
+        """Anzahl der noch unbestätigten Transaktionen."""
+        with self._lock:
+            return len(self._pending)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Beendet den Hintergrund-Thread."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Hintergrund-Verarbeitung
+    # ------------------------------------------------------------------
+
+    def _ensure_running(self) -> None:
+        """Startet den Hintergrund-Thread bei Bedarf."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="asi-tx-tracker", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Hauptschleife: prüft offene Transaktionen bis zum Stopp."""
+        while not self._stopped.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Fehler im Transaktions-Tracker: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def poll_once(self) -> int:
+        """
+        Fragt einmalig die Receipts aller offenen Transaktionen ab.
+
+        Returns:
+            Anzahl der in diesem Durchlauf abgeschlossenen Transaktionen.
+        """
+        with self._lock:
+            pending = list(self._pending.items())
+
+        resolved = 0
+        now = time.time()
+        for tx_hash, submitted_at in pending:
+            receipt = self._fetch_receipt(tx_hash)
+
+            if receipt is not None:
+                status = "success" if receipt["status"] == 1 else "failed"
+                self._resolve(
+                    tx_hash,
+                    status,
+                    block_number=receipt.get("blockNumber"),
+                    gas_used=receipt.get("gasUsed"),
+                )
+                resolved += 1
+            elif now - submitted_at > self.timeout:
+                logger.warning(f"Transaktion {tx_hash[:10]}... nach {self.timeout}s nicht bestätigt")
+                self._resolve(tx_hash, "timeout")
+                resolved += 1
+
+        return resolved
+
+    def _fetch_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Holt ein Receipt; None solange die Transaktion nicht gemined ist."""
+        try:
+            receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+        except Exception as e:
+            # TransactionNotFound bedeutet "noch im Mempool"
+            if type(e).__name__ != "TransactionNotFound":
+                logger.debug(f"Receipt-Abfrage für {tx_hash[:10]}... fehlgeschlagen: {e}")
+            return None
+        if receipt is None:
+            return None
+        return dict(receipt)
+
+    def _resolve(self, tx_hash: str, status: str, **details: Any) -> None:
+        """Setzt den Endstatus und benachrichtigt Futures und Callbacks."""
+        with self._lock:
+            if tx_hash not in self._pending:
+                # Bereits von einem parallelen Durchlauf aufgelöst
+                return
+            record = dict(self._records.get(tx_hash, {"tx_hash": tx_hash}))
+            record.update(status=status, resolved_at=time.time())
+            record.update({k: v for k, v in details.items() if v is not None})
+            self._records[tx_hash] = record
+            self._pending.pop(tx_hash, None)
+            futures = self._futures.pop(tx_hash, [])
+            callbacks = self._callbacks.pop(tx_hash, [])
+            self._persist(record)
+
+        if status == "success":
+            logger.info(f"Transaktion {tx_hash[:10]}... bestätigt in Block {record.get('block_number')}")
+
+        for future in futures:
+            if not future.done():
+                future.set_result(dict(record))
+        for callback in callbacks:
+            self._run_callback(callback, dict(record))
+
+    @staticmethod
+    def _run_callback(callback: Callable[[Dict[str, Any]], None], record: Dict[str, Any]) -> None:
+        """Führt einen Callback aus, ohne den Tracker zu gefährden."""
+        try:
+            callback(record)
+        except Exception as e:
+            logger.error(f"Fehler im Transaktions-Callback: {e}")
@@ -1,13 +1,25 @@
-import os, time, pathlib, tempfile, subprocess, binascii
+import os, time, json, select, ctypes, ctypes.util, pathlib, binascii
+import requests
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 
 ENC_KEY_HEX = os.getenv("ENC_KEY_HEX","").strip()
 IPNS_KEY = os.getenv("IPNS_KEY","self")
+IPFS_API = os.getenv("IPFS_API","http://127.0.0.1:5001/api/v0").rstrip("/")
 EVENT_LOG = pathlib.Path(os.path.expanduser(os.getenv("EVENT_LOG","~/.adult_replica/events.jsonl")))
-assert ENC_KEY_HEX, "ENC_KEY_HEX not set"
-KEY = binascii.unhexlify(ENC_KEY_HEX)
-assert len(KEY) in (16,24,32), "ENC_KEY_HEX must be 16/24/32 bytes (hex)"
+STATE_FILE = pathlib.Path(os.path.expanduser(os.getenv("STATE_FILE", str(EVENT_LOG) + ".ipfs_tip.json")))
+POLL_SECONDS = float(os.getenv("POLL_SECONDS","5"))
+DEBOUNCE_SECONDS = float(os.getenv("DEBOUNCE_SECONDS","1"))
+MAX_INDEX_CHUNKS = int(os.getenv("MAX_INDEX_CHUNKS","1024"))
+KEY = b""  # wird in main() aus ENC_KEY_HEX gesetzt
+
+session = requests.Session()
+
+def load_key() -> bytes:
+    assert ENC_KEY_HEX, "ENC_KEY_HEX not set"
+    key = binascii.unhexlify(ENC_KEY_HEX)
+    assert len(key) in (16,24,32), "ENC_KEY_HEX must be 16/24/32 bytes (hex)"
+    return key
 
 def encrypt(data: bytes) -> bytes:
     iv = get_random_bytes(12)
@@ -16,26 +28,119 @@ def encrypt(data: bytes) -> bytes:
     return b"v1"+iv+tag+ct
 
 def ipfs_add_bytes(payload: bytes) -> str:
-    with tempfile.NamedTemporaryFile(delete=False) as f:
-        f.write(payload); f.flush()
-        cid = subprocess.check_output(["ipfs","add","-Q",f.name]).decode().strip()
-    return cid
+    # Direkt über die HTTP API, ohne Temp-Datei und Subprozess
+    r = session.post(f"{IPFS_API}/add", params={"pin":"true","quieter":"true"},
+                     files={"file": ("chunk", payload)}, timeout=60)
+    r.raise_for_status()
+    return r.json()["Hash"]
 
 def ipns_publish(cid: str):
-    subprocess.check_call(["ipfs","name","publish",f"/ipfs/{cid}","--key",IPNS_KEY,"--lifetime","8760h"])
+    r = session.post(f"{IPFS_API}/name/publish", timeout=120,
+                     params={"arg": f"/ipfs/{cid}", "key": IPNS_KEY, "lifetime": "8760h"})
+    r.raise_for_status()
+
+# --- Zustand: bereits veröffentlichte Bytes und Chunk-Index -------------------
+
+def load_state() -> dict:
+    try:
+        return json.loads(STATE_FILE.read_text())
+    except (OSError, ValueError):
+        return {"offset": 0, "chunks": [], "prev": None}
+
+def save_state(state: dict):
+    tmp = STATE_FILE.with_name(STATE_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, STATE_FILE)
+
+def read_appended(offset: int, size: int) -> bytes:
+    """Liest nur den neu angehängten Bereich, bis zur letzten vollständigen Zeile."""
+    with open(EVENT_LOG, "rb") as f:
+        f.seek(offset)
+        data = f.read(size - offset)
+    end = data.rfind(b"\n")
+    return data[:end+1] if end >= 0 else b""
+
+def publish_index(state: dict) -> str:
+    """Index = Liste der Chunks (verschlüsselt); ältere Chunks hängen an 'prev'."""
+    if len(state["chunks"]) > MAX_INDEX_CHUNKS:
+        full = {"v": 1, "prev": state["prev"], "chunks": state["chunks"]}
+        state["prev"] = ipfs_add_bytes(encrypt(json.dumps(full).encode()))
+        state["chunks"] = []
+    index = {"v": 1, "prev": state["prev"], "chunks": state["chunks"], "size": state["offset"]}
+    return ipfs_add_bytes(encrypt(json.dumps(index).encode()))
+
+def publish_new_data(state: dict) -> bool:
+    if not EVENT_LOG.exists():
+        return False
+    size = EVENT_LOG.stat().st_size
+    # Auf einer Kopie arbeiten, damit ein Fehler den Bereich beim nächsten Mal erneut versucht
+    new = dict(state, chunks=list(state["chunks"]))
+    if size < new["offset"]:
+        # Log wurde rotiert/gekürzt: neue Kette beginnen
+        print("[warn] event log shrank, starting new chunk chain", flush=True)
+        new.update(offset=0, chunks=[], prev=None)
+    if size == new["offset"]:
+        return False
+
+    data = read_appended(new["offset"], size)
+    if not data:
+        return False
+    cid = ipfs_add_bytes(encrypt(data))
+    new["chunks"].append({"cid": cid, "offset": new["offset"], "length": len(data)})
+    new["offset"] += len(data)
+
+    index_cid = publish_index(new)
+    ipns_publish(index_cid)
+    save_state(new)
+    state.update(new)
+    print(f"[ok] published {len(data)} new bytes as {cid}, index {index_cid}", flush=True)
+    return True
+
+# --- Änderungserkennung: inotify unter Linux, sonst stat-Polling -------------
+
+IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x2, 0x8, 0x80, 0x100
+
+def inotify_watch(directory: pathlib.Path):
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, str(directory).encode(), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+def wait_for_change(fd, timeout: float):
+    """Blockiert bis zu einer Änderung im Log-Verzeichnis (oder bis timeout)."""
+    if fd is None:
+        time.sleep(timeout)
+        return
+    if select.select([fd], [], [], timeout)[0]:
+        # Schreib-Bursts zusammenfassen, dann alle Ereignisse verwerfen
+        time.sleep(DEBOUNCE_SECONDS)
+        while select.select([fd], [], [], 0)[0]:
+            os.read(fd, 65536)
 
 def main():
-    last = -1
+    global KEY
+    KEY = load_key()
     EVENT_LOG.parent.mkdir(parents=True, exist_ok=True)
+    state = load_state()
+    fd = inotify_watch(EVENT_LOG.parent)
+    # Mit inotify dient der Timeout nur als Sicherheitsnetz
+    timeout = POLL_SECONDS * 60 if fd is not None else POLL_SECONDS
     while True:
-        if EVENT_LOG.exists():
-            data = EVENT_LOG.read_bytes()
-            if len(data) != last and len(data) > 0:
-                cid = ipfs_add_bytes(encrypt(data))
-                ipns_publish(cid)
-                print(f"[ok] published CID {cid}", flush=True)
-                last = len(data)
-        time.sleep(5)
+        try:
+            publish_new_data(state)
+        except (requests.RequestException, OSError, ValueError, KeyError) as e:
+            # ValueError/KeyError: unerwartete Antwort der IPFS-API (kein JSON, kein "Hash")
+            print(f"[err] publish failed: {e}", flush=True)
+            time.sleep(POLL_SECONDS)
+        wait_for_change(fd, timeout)
 
 if __name__ == "__main__":
     main()
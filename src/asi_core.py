@@ -4,9 +4,11 @@ ASI-Core: Artificial Self-Intelligence System
 Erweiterte Version mit Hybrid-Modell, State Management und Agent-Integration
 """
 
+import atexit
 import json
 import os
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -51,8 +53,9 @@ class ASICore:
         self.agent_manager = None
         self._initialize_agent_system()
 
-        # Reflexionshistorie
+        # Reflexionshistorie; Blockchain-Callbacks schreiben aus dem Tracker-Thread
         self.reflections = []
+        self._reflections_lock = threading.Lock()
 
     def load_config(self, config_path):
         """Lädt die Konfiguration"""
@@ -89,10 +92,14 @@ class ASICore:
                 key in self.config
                 for key in ["rpc_url", "private_key", "contract_address"]
             ):
+                # Reflexionen und Agent-Aktionen sollen nie auf Blockzeiten warten
                 self.blockchain_client = ASIBlockchainClient(
                     rpc_url=self.config["rpc_url"],
                     private_key=self.config["private_key"],
                     contract_address=self.config["contract_address"],
+                    async_submission=self.config.get(
+                        "blockchain_async_submission", True
+                    ),
                 )
                 print("🔗 Blockchain-Verbindung hergestellt")
             else:
@@ -105,10 +112,14 @@ class ASICore:
     def _initialize_agent_system(self):
         """Initialisiert das Agent-System mit Blockchain-Integration"""
         try:
+            # Optional: Agent-Einträge bündeln und nur als Merkle-Wurzel registrieren
             self.agent_manager = ASIAgentManager(
                 data_dir="data/agents",
-                blockchain_client=self.blockchain_client
+                blockchain_client=self.blockchain_client,
+                batch_window=self.config.get("agent_batch_window")
             )
+            # Offenen Batch und Agent-Store auch bei normalem Programmende abschließen
+            atexit.register(self.close)
             
             # Haupt-ASI-Agent registrieren falls noch nicht vorhanden
             asi_agents = [agent for agent in self.agent_manager.list_agents() if agent.name == "ASI-Core"]
@@ -212,6 +223,10 @@ class ASICore:
             and self.blockchain_client.is_connected()
             and state_value >= 70  # Nur wichtige Reflexionen on-chain
         ):
+            def update_status(record):
+                with self._reflections_lock:
+                    reflection["blockchain_status"] = record["status"]
+
             try:
                 tx_hash = self.blockchain_client.register_hybrid_entry_on_chain(
                     cid=f"state_reflection_{reflection_id}",
@@ -219,9 +234,15 @@ class ASICore:
                     embedding=embedding_bytes,
                     state_value=state_value,
                     timestamp=int(datetime.now().timestamp()),
+                    callback=update_status,
                 )
                 print(f"🔗 Blockchain-Eintrag erstellt: {tx_hash}")
-                reflection["blockchain_tx"] = tx_hash
+                with self._reflections_lock:
+                    reflection["blockchain_tx"] = tx_hash
+                    # Nur im asynchronen Modus löst ein Callback den Status später auf;
+                    # ein bereits gelaufener Callback wird nicht überschrieben
+                    if self.blockchain_client.async_submission:
+                        reflection.setdefault("blockchain_status", "pending")
                 
             except ASIBlockchainError as e:
                 print(f"⚠️ Blockchain-Registrierung fehlgeschlagen: {e}")
@@ -336,6 +357,13 @@ class ASICore:
     # Agent-spezifische Methoden
     # =============================================================================
 
+    def close(self):
+        """Schließt offene Merkle-Batches, speichert den Agent-Zustand (idempotent)"""
+        agent_manager, self.agent_manager = self.agent_manager, None
+        if agent_manager:
+            agent_manager.close()
+            atexit.unregister(self.close)
+
     def get_agent_stats(self) -> Dict:
         """Ruft Statistiken über das Agent-System ab."""
         if not self.agent_manager:
@@ -352,7 +380,8 @@ class ASICore:
             learning_data (Dict, optional): Zusätzliche Lerndaten.
         
         Returns:
-            Optional[str]: Blockchain-Transaction-Hash oder None.
+            Optional[str]: Blockchain-Transaction-Hash, bei aktivem Batching
+            (``agent_batch_window``) die Eintrags-ID im Merkle-Batch, sonst None.
         """
         if not self.agent_manager or not self.main_agent_id:
             print("⚠️ Agent-System nicht verfügbar")
@@ -480,6 +509,7 @@ def main():
 
     print(f"📊 System-Info: {asi.config}")
     print("🎯 ASI-Core läuft erfolgreich!")
+    asi.close()
 
 
 if __name__ == "__main__":
@@ -7,9 +7,12 @@ Deterministisches Embedding System für ASI Memory Retrieval
 import hashlib
 import json
 import logging
+import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -77,15 +80,31 @@ class ASISemanticSearch:
     """
     Semantic Search System für ASI Memory.
     Speichert und durchsucht Embeddings mit lokaler Cache-Funktionalität.
+
+    Persistenz erfolgt über einen Snapshot (``embedding_cache.json``) plus
+    ein Write-Ahead-Log (``embedding_cache.json.log``, JSON Lines). Neue
+    Einträge werden nur an das Log angehängt; erst wenn das Log
+    ``snapshot_interval`` Einträge erreicht, wird ein neuer Snapshot
+    geschrieben und das Log geleert.
     """
     
-    def __init__(self, embedding_generator: Optional[ASIEmbeddingGenerator] = None, cache_file: Optional[str] = None):
+    def __init__(
+        self,
+        embedding_generator: Optional[ASIEmbeddingGenerator] = None,
+        cache_file: Optional[str] = None,
+        snapshot_interval: int = 1000,
+        fsync_batch_size: int = 64,
+        fsync_interval: float = 1.0,
+    ):
         """
         Initialisiert das Semantic Search System.
         
         Args:
             embedding_generator: ASI Embedding Generator (wird automatisch erstellt wenn None)
             cache_file: Pfad zur Cache-Datei (default: data/search/embedding_cache.json)
+            snapshot_interval: Log-Einträge, nach denen ein Snapshot geschrieben wird
+            fsync_batch_size: Anzahl Log-Einträge, nach denen spätestens fsync erfolgt
+            fsync_interval: Maximale Sekunden zwischen zwei fsync-Aufrufen
         """
         self.embedding_generator = embedding_generator or ASIEmbeddingGenerator()
         
@@ -96,44 +115,181 @@ class ASISemanticSearch:
             self.cache_file = cache_dir / 'embedding_cache.json'
         else:
             self.cache_file = Path(cache_file)
+        self.log_file = self.cache_file.with_name(self.cache_file.name + '.log')
+
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.fsync_batch_size = max(1, fsync_batch_size)
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.RLock()
+        self._log_handle = None
+        self._log_entries = 0
+        self._unsynced_entries = 0
+        self._last_fsync = time.monotonic()
             
         # Lade bestehenden Cache
         self._load_cache()
         
     def _load_cache(self):
-        """Lädt den Embedding Cache von der Festplatte."""
+        """Lädt Snapshot und spielt anschließend das Write-Ahead-Log ein."""
+        self.cache = {}
+        self.metadata = {}
+
         try:
             if self.cache_file.exists():
                 with open(self.cache_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     self.cache = data.get('embeddings', {})
                     self.metadata = data.get('metadata', {})
-            else:
-                self.cache = {}
-                self.metadata = {}
+                    self.metadata.setdefault('last_updated', data.get('last_updated'))
                 
         except Exception as e:
             logger.warning(f"Fehler beim Laden des Caches: {e}")
             self.cache = {}
             self.metadata = {}
-            
-    def _save_cache(self):
-        """Speichert den Embedding Cache auf die Festplatte."""
+
+        self._log_entries = self._replay_log()
+
+    def _replay_log(self) -> int:
+        """
+        Wendet die Einträge des Write-Ahead-Logs auf den Cache an.
+
+        Eine abgeschnittene letzte Zeile (z.B. nach einem Absturz mitten im
+        Schreiben) wird ignoriert und beim nächsten Snapshot verworfen.
+
+        Returns:
+            Anzahl erfolgreich eingespielter Log-Einträge
+        """
+        if not self.log_file.exists():
+            return 0
+
+        replayed = 0
         try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            cache_data = {
-                'embeddings': self.cache,
-                'metadata': self.metadata,
-                'last_updated': datetime.now().isoformat(),
-                'version': '1.0'
-            }
-            
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-                
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        self.cache[record['cid']] = record['entry']
+                    except (ValueError, KeyError) as e:
+                        logger.warning(
+                            f"Ungültiger Log-Eintrag in Zeile {line_number} "
+                            f"ignoriert: {e}"
+                        )
+                        continue
+                    self.metadata['last_added'] = record['cid']
+                    replayed += 1
         except Exception as e:
-            logger.error(f"Fehler beim Speichern des Caches: {e}")
+            logger.warning(f"Fehler beim Einspielen des Write-Ahead-Logs: {e}")
+
+        if replayed:
+            self.metadata['total_embeddings'] = len(self.cache)
+        return replayed
+
+    def _save_cache(self):
+        """Schreibt einen vollständigen Snapshot und leert das Write-Ahead-Log."""
+        with self._lock:
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+                self.metadata['last_updated'] = datetime.now().isoformat()
+                cache_data = {
+                    'embeddings': self.cache,
+                    'metadata': self.metadata,
+                    'last_updated': self.metadata['last_updated'],
+                    'version': '1.1'
+                }
+
+                # Atomar ersetzen: ein Absturz hinterlässt nie einen halben Snapshot
+                tmp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(cache_data, f, ensure_ascii=False, separators=(',', ':'))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.cache_file)
+
+                # Log erst nach erfolgreichem Snapshot verwerfen
+                self._close_log()
+                with open(self.log_file, 'w', encoding='utf-8'):
+                    pass
+                self._log_entries = 0
+
+            except Exception as e:
+                logger.error(f"Fehler beim Speichern des Caches: {e}")
+
+    def _open_log(self):
+        """Öffnet das Write-Ahead-Log im Append-Modus (lazy)."""
+        if self._log_handle is None:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            self._log_handle = open(self.log_file, 'a', encoding='utf-8')
+            # Abgeschnittene letzte Zeile abschließen, neue Einträge bleiben lesbar
+            if self._log_handle.tell() > 0:
+                with open(self.log_file, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        self._log_handle.write('\n')
+        return self._log_handle
+
+    def _close_log(self):
+        """Synchronisiert und schließt das Write-Ahead-Log."""
+        if self._log_handle is not None:
+            self._sync_log()
+            self._log_handle.close()
+            self._log_handle = None
+
+    def _sync_log(self):
+        """Schreibt gepufferte Log-Einträge per fsync auf die Festplatte."""
+        if self._log_handle is None:
+            return
+        self._log_handle.flush()
+        if self._unsynced_entries:
+            os.fsync(self._log_handle.fileno())
+        self._unsynced_entries = 0
+        self._last_fsync = time.monotonic()
+
+    def _append_to_log(self, records: List[Tuple[str, Dict]]):
+        """
+        Hängt Einträge an das Write-Ahead-Log an.
+
+        fsync wird gebündelt: spätestens nach ``fsync_batch_size`` Einträgen
+        oder ``fsync_interval`` Sekunden. Erreicht das Log
+        ``snapshot_interval`` Einträge, wird ein neuer Snapshot geschrieben.
+        """
+        lines = ''.join(
+            json.dumps(
+                {'cid': cid, 'entry': entry}, ensure_ascii=False, separators=(',', ':')
+            )
+            + '\n'
+            for cid, entry in records
+        )
+
+        handle = self._open_log()
+        handle.write(lines)
+        self._log_entries += len(records)
+        self._unsynced_entries += len(records)
+
+        if (self._unsynced_entries >= self.fsync_batch_size
+                or time.monotonic() - self._last_fsync >= self.fsync_interval):
+            self._sync_log()
+        else:
+            handle.flush()
+
+        if self._log_entries >= self.snapshot_interval:
+            self._save_cache()
+
+    def _build_entry(self, embedding: bytes, text_preview: str) -> Dict:
+        """Validiert ein Embedding und erzeugt den Cache-Eintrag."""
+        if len(embedding) != 128:
+            raise ValueError("Embedding muss genau 128 bytes haben")
+
+        return {
+            # Konvertiere bytes zu hex string für JSON Serialisierung
+            'embedding': embedding.hex(),
+            'text_preview': text_preview[:200],  # Begrenze Preview
+            'created_at': datetime.now().isoformat(),
+            'size_bytes': len(embedding)
+        }
     
     def store_embedding(self, cid: str, embedding: bytes, text_preview: str):
         """
@@ -144,25 +300,61 @@ class ASISemanticSearch:
             embedding: Das 128-byte Embedding
             text_preview: Kurzer Textvorschau für Debugging
         """
-        if len(embedding) != 128:
-            raise ValueError("Embedding muss genau 128 bytes haben")
-            
-        # Konvertiere bytes zu hex string für JSON Serialisierung
-        embedding_hex = embedding.hex()
-        
-        self.cache[cid] = {
-            'embedding': embedding_hex,
-            'text_preview': text_preview[:200],  # Begrenze Preview
-            'created_at': datetime.now().isoformat(),
-            'size_bytes': len(embedding)
-        }
-        
-        # Aktualisiere Metadaten
-        self.metadata['total_embeddings'] = len(self.cache)
-        self.metadata['last_added'] = cid
+        self.store_embeddings_bulk([(cid, embedding, text_preview)])
+        logger.debug(f"Embedding für CID {cid} gespeichert")
+
+    def store_embeddings_bulk(self, items: Iterable[Tuple[str, bytes, str]]) -> int:
+        """
+        Speichert mehrere Embeddings mit einem einzigen Log-Schreibvorgang.
         
+        Args:
+            items: Iterable von (cid, embedding, text_preview) Tupeln
+
+        Returns:
+            Anzahl gespeicherter Embeddings
+        """
+        # Erst alles validieren, damit ein fehlerhaftes Element nichts halb schreibt
+        records = [
+            (cid, self._build_entry(embedding, text_preview))
+            for cid, embedding, text_preview in items
+        ]
+        if not records:
+            return 0
+
+        with self._lock:
+            for cid, entry in records:
+                self.cache[cid] = entry
+
+            # Aktualisiere Metadaten
+            self.metadata['total_embeddings'] = len(self.cache)
+            self.metadata['last_added'] = records[-1][0]
+
+            try:
+                self._append_to_log(records)
+            except Exception as e:
+                logger.error(f"Fehler beim Schreiben des Write-Ahead-Logs: {e}")
+
+        return len(records)
+
+    def flush(self):
+        """Erzwingt fsync aller gepufferten Log-Einträge."""
+        with self._lock:
+            try:
+                self._sync_log()
+            except Exception as e:
+                logger.error(f"Fehler beim Synchronisieren des Write-Ahead-Logs: {e}")
+
+    def compact(self):
+        """Schreibt sofort einen Snapshot und leert das Write-Ahead-Log."""
         self._save_cache()
-        logger.debug(f"Embedding für CID {cid} gespeichert")
+
+    def close(self):
+        """Synchronisiert ausstehende Einträge und schließt das Log."""
+        with self._lock:
+            try:
+                self._close_log()
+            except Exception as e:
+                logger.error(f"Fehler beim Schließen des Write-Ahead-Logs: {e}")
     
     def search_ASI_memory(self, query: str, num_results: int = 10) -> List[Dict]:
         """
@@ -183,7 +375,7 @@ class ASISemanticSearch:
         
         results = []
         
-        for cid, entry in self.cache.items():
+        for cid, entry in list(self.cache.items()):
             try:
                 # Konvertiere hex string zurück zu bytes
                 stored_embedding = bytes.fromhex(entry['embedding'])
@@ -247,6 +439,7 @@ class ASISemanticSearch:
             'total_embeddings': len(self.cache),
             'cache_size_bytes': total_size,
             'cache_file': str(self.cache_file),
+            'log_entries': self._log_entries,
             'last_updated': self.metadata.get('last_updated'),
             'generator_info': self.embedding_generator.get_embedding_info()
         }
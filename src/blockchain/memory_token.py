@@ -14,6 +14,9 @@ from eth_account import Account
 from flask import Blueprint, jsonify, request
 from web3 import Web3
 
+from asi_core.rpc_cache import ChainReadCache
+from asi_core.tx_queue import TransactionQueue
+
 # Token Reward Constants
 REWARDS = {
     "reflection_saved": 1.0,  # 1 $MEM per reflection
@@ -30,6 +33,8 @@ class MemoryTokenService:
         self.web3 = None
         self.contract = None
         self.account = None
+        self.tx_queue = None
+        self.read_cache = None
         self.initialize_blockchain()
 
     def initialize_blockchain(self):
@@ -38,6 +43,7 @@ class MemoryTokenService:
             # Polygon Mumbai RPC
             rpc_url = os.getenv("POLYGON_RPC_URL", "https://rpc-mumbai.maticvigil.com")
             self.web3 = Web3(Web3.HTTPProvider(rpc_url))
+            self.read_cache = ChainReadCache(self.web3)
 
             # Load contract ABI and address
             contract_address = os.getenv("MEMORY_TOKEN_ADDRESS")
@@ -59,6 +65,12 @@ class MemoryTokenService:
             # Setup account
             self.account = Account.from_key(private_key)
 
+            # Shared nonce manager + pipelined send queue: concurrent rewards
+            # and buybacks no longer race on get_transaction_count
+            self.tx_queue = TransactionQueue(
+                self.web3, private_key, chain_id=self.read_cache.chain_id
+            )
+
             print(f"✅ Memory Token service initialized")
             print(f"Contract: {contract_address}")
             print(f"Account: {self.account.address}")
@@ -69,20 +81,39 @@ class MemoryTokenService:
             print(f"❌ Memory Token initialization failed: {e}")
             return False
 
+    @property
+    def decimals(self) -> int:
+        """Token decimals (immutable, fetched once)"""
+
+        def load_decimals():
+            try:
+                return int(self.contract.functions.decimals().call())
+            except Exception:
+                return 18
+
+        return self.read_cache.immutable("decimals", load_decimals)
+
+    def _to_tokens(self, amount_wei: int) -> float:
+        """Convert a raw token amount to whole tokens"""
+        return float(Decimal(amount_wei) / (Decimal(10) ** self.decimals))
+
     def get_balance(self, user_address: str) -> Dict:
         """Get user's $MEM token balance"""
         try:
             if not self.contract:
                 return {"error": "Contract not initialized"}
 
-            balance_wei = self.contract.functions.balanceOf(
-                Web3.toChecksumAddress(user_address)
-            ).call()
-
-            balance = self.web3.fromWei(balance_wei, "ether")
+            checksum_address = Web3.toChecksumAddress(user_address)
+            balance_wei = self.read_cache.read(
+                {
+                    f"balance:{checksum_address}": self.contract.functions.balanceOf(
+                        checksum_address
+                    )
+                }
+            )[f"balance:{checksum_address}"]
 
             return {
-                "balance": float(balance),
+                "balance": self._to_tokens(balance_wei),
                 "balance_wei": str(balance_wei),
                 "address": user_address,
             }
@@ -90,7 +121,35 @@ class MemoryTokenService:
         except Exception as e:
             return {"error": str(e)}
 
-    def reward_user(self, user_address: str, amount: float, reason: str) -> Dict:
+    def _send_transaction(self, transaction: Dict, wait_for_receipt: bool) -> Dict:
+        """
+        Send a built transaction through the shared queue
+
+        Confirmed transactions report ``success: True``; without waiting the
+        result carries ``status: "pending"`` and ``success: False``. A
+        reverted transaction is reported as an error.
+        """
+        tx_hash = self.tx_queue.send(transaction)
+
+        if not wait_for_receipt:
+            return {"success": False, "tx_hash": tx_hash, "status": "pending"}
+
+        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        if receipt.status != 1:
+            return {
+                "error": "Transaction reverted",
+                "tx_hash": tx_hash,
+                "status": "failed",
+            }
+        return {"success": True, "tx_hash": tx_hash, "status": "success"}
+
+    def reward_user(
+        self,
+        user_address: str,
+        amount: float,
+        reason: str,
+        wait_for_receipt: bool = True,
+    ) -> Dict:
         """Reward user with $MEM tokens"""
         try:
             if not self.contract or not self.account:
@@ -99,31 +158,23 @@ class MemoryTokenService:
             # Convert amount to Wei (18 decimals)
             amount_wei = self.web3.toWei(amount, "ether")
 
-            # Build transaction
+            # Build transaction (nonce and chain id are assigned by the queue)
             transaction = self.contract.functions.rewardUser(
                 Web3.toChecksumAddress(user_address), amount_wei, reason
             ).buildTransaction(
                 {
                     "from": self.account.address,
-                    "nonce": self.web3.eth.get_transaction_count(self.account.address),
+                    "chainId": self.tx_queue.chain_id,
                     "gas": 200000,
                     "gasPrice": self.web3.toWei("20", "gwei"),
                 }
             )
 
-            # Sign and send transaction
-            signed_txn = self.web3.eth.account.sign_transaction(
-                transaction, self.account.privateKey
-            )
-
-            tx_hash = self.web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-
-            # Wait for confirmation
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            result = self._send_transaction(transaction, wait_for_receipt)
+            self.read_cache.invalidate()
 
             return {
-                "success": True,
-                "tx_hash": receipt.transactionHash.hex(),
+                **result,
                 "amount": amount,
                 "reason": reason,
                 "user": user_address,
@@ -132,7 +183,9 @@ class MemoryTokenService:
         except Exception as e:
             return {"error": str(e)}
 
-    def execute_buyback(self, usdc_amount: float) -> Dict:
+    def execute_buyback(
+        self, usdc_amount: float, wait_for_receipt: bool = True
+    ) -> Dict:
         """Execute buyback mechanism"""
         try:
             if not self.contract or not self.account:
@@ -147,23 +200,17 @@ class MemoryTokenService:
             ).buildTransaction(
                 {
                     "from": self.account.address,
-                    "nonce": self.web3.eth.get_transaction_count(self.account.address),
+                    "chainId": self.tx_queue.chain_id,
                     "gas": 300000,
                     "gasPrice": self.web3.toWei("20", "gwei"),
                 }
             )
 
-            # Sign and send transaction
-            signed_txn = self.web3.eth.account.sign_transaction(
-                transaction, self.account.privateKey
-            )
-
-            tx_hash = self.web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            result = self._send_transaction(transaction, wait_for_receipt)
+            self.read_cache.invalidate()
 
             return {
-                "success": True,
-                "tx_hash": receipt.transactionHash.hex(),
+                **result,
                 "usdc_amount": usdc_amount,
             }
 
@@ -176,24 +223,24 @@ class MemoryTokenService:
             if not self.contract:
                 return {"error": "Contract not initialized"}
 
-            total_supply = self.contract.functions.totalSupply().call()
-            total_burned = self.contract.functions.totalBurned().call()
-            user_minted = self.contract.functions.userTokensMinted().call()
-            dev_minted = self.contract.functions.devTokensMinted().call()
-            dao_minted = self.contract.functions.daoTokensMinted().call()
-
-            available = self.contract.functions.getAvailableTokens().call()
+            # One JSON-RPC batch per block instead of six sequential calls
+            functions = self.contract.functions
+            values = self.read_cache.read(
+                {
+                    "total_supply": functions.totalSupply(),
+                    "total_burned": functions.totalBurned(),
+                    "user_tokens_minted": functions.userTokensMinted(),
+                    "dev_tokens_minted": functions.devTokensMinted(),
+                    "dao_tokens_minted": functions.daoTokensMinted(),
+                    "available": functions.getAvailableTokens(),
+                }
+            )
+            available = values.pop("available")
 
             return {
-                "total_supply": float(self.web3.fromWei(total_supply, "ether")),
-                "total_burned": float(self.web3.fromWei(total_burned, "ether")),
-                "user_tokens_minted": float(self.web3.fromWei(user_minted, "ether")),
-                "dev_tokens_minted": float(self.web3.fromWei(dev_minted, "ether")),
-                "dao_tokens_minted": float(self.web3.fromWei(dao_minted, "ether")),
-                "user_tokens_available": float(
-                    self.web3.fromWei(available[0], "ether")
-                ),
-                "dev_tokens_available": float(self.web3.fromWei(available[1], "ether")),
+                **{name: self._to_tokens(value) for name, value in values.items()},
+                "user_tokens_available": self._to_tokens(available[0]),
+                "dev_tokens_available": self._to_tokens(available[1]),
                 "max_supply": 1000000000.0,
             }
 
@@ -208,6 +255,11 @@ memory_token_service = MemoryTokenService()
 token_bp = Blueprint("token", __name__)
 
 
+def _status_code(result: Dict) -> int:
+    """202 Accepted while a transaction is still pending, 200 once confirmed"""
+    return 202 if result.get("status") == "pending" else 200
+
+
 @token_bp.route("/api/token/balance/<address>")
 def get_token_balance(address):
     """Get user's token balance"""
@@ -237,7 +289,7 @@ def claim_tokens():
     if "error" in result:
         return jsonify(result), 500
 
-    return jsonify(result)
+    return jsonify(result), _status_code(result)
 
 
 @token_bp.route("/api/token/buyback", methods=["POST"])
@@ -255,7 +307,7 @@ def execute_buyback():
     if "error" in result:
         return jsonify(result), 500
 
-    return jsonify(result)
+    return jsonify(result), _status_code(result)
 
 
 @token_bp.route("/api/token/stats")
@@ -304,7 +356,8 @@ class CreditSystem:
                 return {"error": result["error"]}
 
             return {
-                "success": True,
+                "success": result.get("success", False),
+                "status": result.get("status"),
                 "credits_purchased": credits,
                 "mem_tokens_awarded": mem_tokens,
                 "usd_amount": amount_usd,
@@ -334,7 +387,7 @@ def purchase_credits():
     if "error" in result:
         return jsonify(result), 500
 
-    return jsonify(result)
+    return jsonify(result), _status_code(result)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@
 Hochperformante, sichere Datenspeicherung
 """
 
+import base64
 import sqlite3
 import json
 import logging
@@ -107,6 +108,9 @@ class StorageModule:
             "CREATE INDEX IF NOT EXISTS idx_reflections_state ON reflections(state)")
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_reflections_hash ON reflections(content_hash)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reflections_keyset "
+            "ON reflections(timestamp, id)")
 
         # State Statistics Tabelle
         cursor.execute("""
@@ -240,6 +244,51 @@ class StorageModule:
             logger.error(f"❌ Failed to get reflection {reflection_id}: {e}")
             return None
 
+    def list_reflections(
+        self, limit: int = 50, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Listet Reflexionen seitenweise (neueste zuerst)
+
+        Geblättert wird über (timestamp, id) statt OFFSET, damit tiefe
+        Seiten genauso schnell sind wie die erste.
+
+        Args:
+            limit: Maximale Anzahl pro Seite
+            cursor: Cursor der vorherigen Seite (None = erste Seite)
+
+        Returns:
+            Dict mit 'reflections' und 'next_cursor' (None = letzte Seite)
+
+        Raises:
+            StorageError: Bei ungültigem Cursor oder limit < 1
+        """
+        if limit < 1:
+            raise StorageError(f"Invalid limit: {limit}")
+
+        query = "SELECT * FROM reflections"
+        params: List[Any] = []
+        if cursor:
+            last_timestamp, last_id = self._decode_cursor(cursor)
+            query += " WHERE timestamp <= ? AND (timestamp < ? OR id < ?)"
+            params.extend([last_timestamp, last_timestamp, last_id])
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        db_cursor = self.db_connection.cursor()
+        db_cursor.execute(query, params)
+        rows = db_cursor.fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = self._encode_cursor(last['timestamp'], last['id'])
+
+        return {
+            'reflections': [self._row_to_dict(row) for row in rows[:limit]],
+            'next_cursor': next_cursor
+        }
+
     def text_search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Text-basierte Suche mit Caching
@@ -346,6 +395,22 @@ class StorageModule:
             'created_at': row['created_at']
         }
 
+    def _encode_cursor(self, timestamp: str, reflection_id: str) -> str:
+        """Kodiert die Position (timestamp, id) als undurchsichtigen Cursor"""
+        raw = json.dumps([timestamp, reflection_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _decode_cursor(self, cursor: str) -> tuple:
+        """Dekodiert einen Cursor aus _encode_cursor"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            timestamp, reflection_id = json.loads(raw)
+            if not isinstance(timestamp, str) or not isinstance(reflection_id, str):
+                raise ValueError(cursor)
+            return timestamp, reflection_id
+        except (TypeError, ValueError) as e:
+            raise StorageError(f"Invalid cursor: {cursor}") from e
+
     def _update_state_stats(self, state: int):
         """Aktualisiert State Statistics"""
         cursor = self.db_connection.cursor()
@@ -10,12 +10,24 @@ from typing import Dict, Optional, List
 from datetime import datetime
 import base64
 
+from .content_cache import ContentCache
+
 
 class ArweaveClient:
     """Client für Arweave-Operationen"""
 
-    def __init__(self, gateway_url: str = "https://arweave.net"):
+    def __init__(
+        self,
+        gateway_url: str = "https://arweave.net",
+        cache: Optional[ContentCache] = None,
+    ):
+        """
+        Args:
+            gateway_url: URL des Arweave-Gateways
+            cache: Lokaler Cache für Downloads (None = immer Netzwerk)
+        """
         self.gateway_url = gateway_url
+        self.cache = cache
         self.session = requests.Session()
         self.wallet_address = None
 
@@ -185,18 +197,38 @@ class ArweaveClient:
         """
         Lädt Daten von Arweave herunter
 
+        Transaktionen sind unveränderlich; mit konfiguriertem Cache wird
+        jede TX-ID nur einmal abgerufen.
+
         Args:
             tx_id: Transaktions-ID
 
         Returns:
             Optional[Dict]: Heruntergeladene Daten
         """
+        if self.cache is not None:
+            content = self.cache.get_or_fetch(
+                f"ar:{tx_id}", lambda: self._fetch_content(tx_id)
+            )
+        else:
+            content = self._fetch_content(tx_id)
+
+        if content is None:
+            return None
+        try:
+            return json.loads(content)
+        except ValueError as e:
+            print(f"Download Exception: {e}")
+            return None
+
+    def _fetch_content(self, tx_id: str) -> Optional[bytes]:
+        """Ruft die Rohdaten einer Transaktion vom Gateway ab"""
         try:
             url = f"{self.gateway_url}/{tx_id}"
             response = self.session.get(url, timeout=30)
 
             if response.status_code == 200:
-                return response.json()
+                return response.content
             else:
                 print(f"Download Fehler: {response.status_code}")
                 return None
@@ -287,17 +319,20 @@ class ArweaveClient:
         print(f"Suche nach Reflexionen für {wallet_address or self.wallet_address}")
         return ["sim_tx_1", "sim_tx_2"]  # Simulierte Ergebnisse
 
-    def get_storage_info(self) -> Dict:
+    def get_storage_info(self, timeout: float = 10) -> Dict:
         """
         Ruft Informationen über Arweave-Storage ab
 
+        Args:
+            timeout: Timeout der Anfrage in Sekunden
+
         Returns:
             Dict: Storage-Informationen
         """
         try:
             # Network-Info
             info_url = f"{self.gateway_url}/info"
-            response = self.session.get(info_url, timeout=10)
+            response = self.session.get(info_url, timeout=timeout)
 
             if response.status_code == 200:
                 network_info = response.json()
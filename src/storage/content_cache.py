@@ -0,0 +1,253 @@
+"""
+ASI Core - Content Cache
+Lokaler, inhaltsadressierter Lese-Cache für IPFS- und Arweave-Downloads
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+# Größe eines Kubo-Standardchunks; kleinere Dateien bestehen aus genau einem Block
+IPFS_CHUNK_SIZE = 262144
+
+_BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _varint(value: int) -> bytes:
+    """Protobuf-Varint-Kodierung"""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _base58(data: bytes) -> str:
+    """Base58btc-Kodierung (Bitcoin-Alphabet)"""
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = _BASE58_ALPHABET[remainder] + encoded
+    padding = len(data) - len(data.lstrip(b"\0"))
+    return "1" * padding + encoded
+
+
+def ipfs_cid_v0(data: bytes) -> Optional[str]:
+    """
+    Berechnet die CIDv0, die ``ipfs add`` mit Standardoptionen vergibt
+
+    Nur für Dateien aus einem einzelnen Chunk möglich, da größere Dateien
+    als Merkle-DAG über mehrere Blöcke gespeichert werden.
+
+    Args:
+        data: Dateiinhalt
+
+    Returns:
+        Optional[str]: CID oder None wenn nicht lokal berechenbar
+    """
+    if not data or len(data) > IPFS_CHUNK_SIZE:
+        return None
+
+    # UnixFS-Data {Type: File, Data, filesize} in einem dag-pb-Knoten ohne Links
+    unixfs = b"\x08\x02\x12" + _varint(len(data)) + data + b"\x18" + _varint(len(data))
+    node = b"\x0a" + _varint(len(unixfs)) + unixfs
+    return _base58(b"\x12\x20" + hashlib.sha256(node).digest())
+
+
+def verify_ipfs_content(cid: str, data: bytes) -> bool:
+    """
+    Prüft, ob heruntergeladene Daten zur CID passen
+
+    CIDs, die sich lokal nicht nachrechnen lassen (CIDv1, mehrere Chunks),
+    gelten als gültig.
+
+    Returns:
+        bool: False nur bei nachweislich falschem Inhalt
+    """
+    if not cid.startswith("Qm"):
+        return True
+    expected = ipfs_cid_v0(data)
+    return expected is None or expected == cid
+
+
+class ContentCache:
+    """
+    Größenbegrenzter Blob-Store für unveränderliche Inhalte.
+
+    Inhalte werden in SQLite unter ihrer Adresse (CID bzw. TX-ID) abgelegt.
+    Überschreitet der Cache ``max_bytes``, werden die am längsten nicht
+    gelesenen Einträge verdrängt (LRU). Gleichzeitige Anfragen nach
+    derselben Adresse lösen nur einen Netzwerkabruf aus.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/content_cache.db",
+        max_bytes: int = 256 * 1024 * 1024,
+        touch_interval: float = 60.0,
+    ):
+        """
+        Args:
+            db_path: Pfad der SQLite-Datei
+            max_bytes: Maximale Gesamtgröße der Inhalte in Bytes
+            touch_interval: Sekunden, innerhalb derer ein Treffer die
+                Zugriffszeit nicht erneut schreibt
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                key TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs(last_access)"
+        )
+        self._conn.commit()
+        self._total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Liest einen Eintrag aus dem Cache
+
+        Returns:
+            Optional[bytes]: Inhalt oder None bei Cache-Miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, last_access FROM blobs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            if now - row[1] >= self.touch_interval:
+                self._conn.execute(
+                    "UPDATE blobs SET last_access = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            return bytes(row[0])
+
+    def put(self, key: str, data: bytes):
+        """Legt einen Eintrag ab und verdrängt bei Bedarf alte Einträge"""
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM blobs WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (key, data, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(data), len(data), time.time()),
+            )
+            self._total += len(data) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Löscht die ältesten Einträge, bis max_bytes eingehalten wird"""
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM blobs ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total = 0
+                return
+            for key, size in rows:
+                if self._total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+                self._total -= size
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Optional[bytes]],
+        verify: Optional[Callable[[bytes], bool]] = None,
+    ) -> Optional[bytes]:
+        """
+        Liest aus dem Cache oder ruft den Inhalt genau einmal ab
+
+        Args:
+            key: Adresse des Inhalts
+            fetch: Netzwerkabruf; liefert None bei Fehler
+            verify: Prüfung des abgerufenen Inhalts vor dem Speichern
+
+        Returns:
+            Optional[bytes]: Inhalt oder None
+        """
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        data = None
+        try:
+            data = fetch()
+            if data is not None and verify is not None and not verify(data):
+                print(f"Inhalt für {key} stimmt nicht mit der Adresse überein")
+                data = None
+            if data is not None:
+                self.put(key, data)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            future.set_result(data)
+        return data
+
+    def stats(self) -> Dict:
+        """Liefert Größe und Trefferquote des Caches"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+            return {
+                "entries": entries,
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def close(self):
+        """Schließt die Datenbankverbindung"""
+        with self._lock:
+            self._conn.close()
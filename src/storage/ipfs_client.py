@@ -5,59 +5,253 @@ Upload zu IPFS für dezentrale Speicherung
 
 import hashlib
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from .content_cache import ContentCache, verify_ipfs_content
+
+
+class NodeHealth:
+    """
+    Circuit Breaker für die Erreichbarkeit des IPFS-Nodes
+
+    closed: Node gilt als erreichbar, Anfragen gehen direkt an die API.
+    open: Nach ``failure_threshold`` Fehlern in Folge werden Anfragen sofort
+        abgelehnt (Fallback), bis ``reset_timeout`` abgelaufen ist.
+    half_open: Danach wird genau eine Probe-Anfrage durchgelassen; Erfolg
+        schließt den Breaker, ein Fehler öffnet ihn erneut.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Aktueller Zustand (ohne Übergang nach half_open)"""
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Entscheidet, ob eine Anfrage an den Node gehen darf
+
+        Returns:
+            bool: False solange der Breaker offen ist
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        """Erfolgreiche Anfrage: Breaker schließen"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Fehlgeschlagene Anfrage: ggf. Breaker öffnen"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
 
 
 class IPFSClient:
     """Client für IPFS-Operationen"""
 
-    def __init__(self, api_url: str = "http://localhost:5001/api/v0"):
+    def __init__(
+        self,
+        api_url: str = "http://localhost:5001/api/v0",
+        probe_interval: float = 30.0,
+        probe_timeout: float = 2.0,
+        request_timeout: float = 30.0,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        max_parallel_uploads: int = 4,
+        cache: Optional[ContentCache] = None,
+    ):
+        """
+        Args:
+            api_url: URL der Kubo HTTP API
+            probe_interval: Sekunden zwischen zwei Hintergrund-Health-Checks
+            probe_timeout: Timeout eines Health-Checks in Sekunden
+            request_timeout: Timeout für Datenanfragen in Sekunden
+            failure_threshold: Fehler in Folge, nach denen der Node als down gilt
+            reset_timeout: Sekunden, nach denen ein down-Node erneut versucht wird
+            max_parallel_uploads: Gleichzeitige Batch-Uploads (und Verbindungen im Pool)
+            cache: Lokaler Cache für Downloads (None = immer Netzwerk)
+        """
         self.api_url = api_url
+        self.cache = cache
         self.session = requests.Session()
+        # Verbindungspool groß genug für parallele Batch-Uploads
+        self.max_parallel_uploads = max(1, max_parallel_uploads)
+        self.session.mount(
+            "http://", HTTPAdapter(pool_maxsize=self.max_parallel_uploads + 1)
+        )
+        self.session.mount(
+            "https://", HTTPAdapter(pool_maxsize=self.max_parallel_uploads + 1)
+        )
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.request_timeout = request_timeout
+        self.health = NodeHealth(failure_threshold, reset_timeout)
+        # Ergebnis des letzten direkten Kontakts (None = noch unbekannt)
+        self._reachable: Optional[bool] = None
+
+        self._prober: Optional[threading.Thread] = None
+        self._prober_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _ensure_prober(self):
+        """Startet den Hintergrund-Health-Check beim ersten Zugriff"""
+        if self._prober is not None or self.probe_interval <= 0:
+            return
+        with self._prober_lock:
+            if self._prober is None:
+                self._prober = threading.Thread(
+                    target=self._probe_loop, name="asi-ipfs-health", daemon=True
+                )
+                self._prober.start()
+
+    def _probe_loop(self):
+        # Erste Probe sofort, sonst bliebe der Zustand ein Intervall lang unbekannt
+        while True:
+            self.probe()
+            if self._stopped.wait(self.probe_interval):
+                return
+
+    def stop(self):
+        """Beendet den Hintergrund-Health-Check"""
+        self._stopped.set()
+
+    def probe(self) -> bool:
+        """
+        Fragt /version ab und aktualisiert den Health-Zustand
+
+        Returns:
+            bool: True wenn Node erreichbar
+        """
+        try:
+            # Kubo HTTP API erwartet POST für die meisten Endpunkte
+            response = self.session.post(
+                f"{self.api_url}/version", timeout=self.probe_timeout
+            )
+            healthy = response.status_code == 200
+        except requests.RequestException:
+            healthy = False
+
+        self._reachable = healthy
+        if healthy:
+            self.health.record_success()
+        else:
+            self.health.record_failure()
+        return healthy
 
     def is_node_running(self) -> bool:
         """
-        Prüft, ob ein IPFS-Node erreichbar ist
+        Prüft, ob ein IPFS-Node erreichbar ist (zwischengespeicherter Zustand)
+
+        Bis zur ersten Probe bzw. Antwort des Nodes ist der Zustand
+        unbekannt und gilt als nicht erreichbar.
 
         Returns:
             bool: True wenn Node erreichbar
         """
+        self._ensure_prober()
+        return bool(self._reachable) and self.health.state != NodeHealth.OPEN
+
+    def _request(self, endpoint: str, **kwargs) -> Optional[requests.Response]:
+        """
+        Sendet eine Anfrage direkt an die API und verbucht das Ergebnis
+
+        Returns:
+            Optional[requests.Response]: Antwort oder None wenn der Node als down gilt
+
+        Raises:
+            requests.RequestException: Bei Verbindungsfehlern (bereits verbucht)
+        """
+        self._ensure_prober()
+        if not self.health.allow_request():
+            return None
+
+        kwargs.setdefault("timeout", self.request_timeout)
         try:
-            # Kubo HTTP API erwartet POST für die meisten Endpunkte
-            response = self.session.post(f"{self.api_url}/version", timeout=5)
-            return response.status_code == 200
+            response = self.session.post(f"{self.api_url}/{endpoint}", **kwargs)
         except requests.RequestException:
-            return False
+            self.health.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            self.health.record_failure()
+        else:
+            self._reachable = True
+            self.health.record_success()
+        return response
 
-    def upload_json(self, data: Dict) -> Optional[str]:
+    def upload_json(self, data: Dict, simulate: bool = True) -> Optional[str]:
         """
         Lädt JSON-Daten zu IPFS hoch
 
         Args:
             data: Zu uploadende Daten
+            simulate: Bei nicht erreichbarem Node einen simulierten Hash
+                liefern; mit False gibt es stattdessen None
 
         Returns:
             Optional[str]: IPFS-Hash bei Erfolg
         """
-        if not self.is_node_running():
-            print("IPFS-Node nicht erreichbar. Verwende lokale Simulation.")
-            return self._simulate_upload(data)
-
         try:
             # JSON zu String konvertieren
             json_string = json.dumps(data, ensure_ascii=False)
 
             # Upload zu IPFS
             files = {"file": ("data.json", json_string, "application/json")}
-            response = self.session.post(
-                f"{self.api_url}/add",
+            response = self._request(
+                "add",
                 files=files,
                 params={"pin": "true"},  # Pin für Persistenz
             )
 
+            if response is None:
+                if not simulate:
+                    print("IPFS-Node nicht erreichbar.")
+                    return None
+                print("IPFS-Node nicht erreichbar. Verwende lokale Simulation.")
+                return self._simulate_upload(data)
+
             if response.status_code == 200:
                 result = response.json()
                 return result.get("Hash")
@@ -67,7 +261,7 @@ class IPFSClient:
 
         except (requests.RequestException, TypeError, ValueError) as e:
             print(f"IPFS Upload Fehler/Exception: {e}")
-            return self._simulate_upload(data)
+            return self._simulate_upload(data) if simulate else None
 
     def _simulate_upload(self, data: Dict) -> str:
         """
@@ -93,28 +287,47 @@ class IPFSClient:
         """
         Lädt JSON-Daten von IPFS herunter
 
+        Inhalte werden gegen die CID geprüft und, falls ein Cache
+        konfiguriert ist, lokal vorgehalten.
+
         Args:
             ipfs_hash: IPFS-Hash der Daten
 
         Returns:
             Optional[Dict]: Heruntergeladene Daten
         """
-        if not self.is_node_running():
-            print("IPFS-Node nicht erreichbar. Download nicht möglich.")
+        verify = partial(verify_ipfs_content, ipfs_hash)
+        if self.cache is not None:
+            content = self.cache.get_or_fetch(
+                f"ipfs:{ipfs_hash}", lambda: self._fetch_content(ipfs_hash), verify
+            )
+        else:
+            content = self._fetch_content(ipfs_hash)
+            if content is not None and not verify(content):
+                print(f"IPFS Download Fehler: Inhalt passt nicht zu {ipfs_hash}")
+                content = None
+
+        if content is None:
+            return None
+        try:
+            # Inhalt ist roher JSON-Text (wir haben zuvor JSON hochgeladen)
+            return json.loads(content)
+        except ValueError as e:
+            print(f"IPFS Download Fehler: {e}")
             return None
 
+    def _fetch_content(self, ipfs_hash: str) -> Optional[bytes]:
+        """Ruft den Rohinhalt einer CID über /cat ab"""
         try:
             # Kubo erwartet POST für /cat
-            response = self.session.post(
-                f"{self.api_url}/cat", params={"arg": ipfs_hash}
-            )
+            response = self._request("cat", params={"arg": ipfs_hash})
+
+            if response is None:
+                print("IPFS-Node nicht erreichbar. Download nicht möglich.")
+                return None
 
             if response.status_code == 200:
-                # Inhalt ist roher JSON-Text (wir haben zuvor JSON hochgeladen)
-                try:
-                    return response.json()
-                except ValueError:
-                    return json.loads(response.text)
+                return response.content
             else:
                 print(f"IPFS Download Fehler: {response.status_code}")
                 return None
@@ -133,14 +346,9 @@ class IPFSClient:
         Returns:
             bool: Erfolg des Pinning
         """
-        if not self.is_node_running():
-            return False
-
         try:
-            response = self.session.post(
-                f"{self.api_url}/pin/add", params={"arg": ipfs_hash}
-            )
-            return response.status_code == 200
+            response = self._request("pin/add", params={"arg": ipfs_hash})
+            return response is not None and response.status_code == 200
         except requests.RequestException as e:
             print(f"IPFS Pin Exception: {e}")
             return False
@@ -152,13 +360,10 @@ class IPFSClient:
         Returns:
             List[str]: Liste gepinnter Hashes
         """
-        if not self.is_node_running():
-            return []
-
         try:
             # Kubo erwartet POST für /pin/ls
-            response = self.session.post(f"{self.api_url}/pin/ls")
-            if response.status_code == 200:
+            response = self._request("pin/ls")
+            if response is not None and response.status_code == 200:
                 data = response.json()
                 return list(data.get("Keys", {}).keys())
             return []
@@ -173,19 +378,22 @@ class IPFSClient:
         Returns:
             Optional[Dict]: Node-Informationen
         """
-        if not self.is_node_running():
-            return None
-
         try:
             # Version
-            version_resp = self.session.post(f"{self.api_url}/version")
+            version_resp = self._request("version")
+            if version_resp is None:
+                return None
             version_data = (
                 version_resp.json() if version_resp.status_code == 200 else {}
             )
 
             # ID
-            id_resp = self.session.post(f"{self.api_url}/id")
-            id_data = id_resp.json() if id_resp.status_code == 200 else {}
+            id_resp = self._request("id")
+            id_data = (
+                id_resp.json()
+                if id_resp is not None and id_resp.status_code == 200
+                else {}
+            )
 
             return {
                 "version": version_data.get("Version", "unknown"),
@@ -197,32 +405,149 @@ class IPFSClient:
             print(f"IPFS Node Info Exception: {e}")
             return None
 
-    def upload_reflection(self, processed_reflection: Dict) -> Optional[str]:
+    def upload_json_batch(
+        self, items: List[Dict], names: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
-        Lädt eine verarbeitete Reflexion zu IPFS hoch
+        Lädt mehrere JSON-Dokumente in einer einzigen /add-Anfrage hoch
+
+        Die Dateien werden mit ``wrap-with-directory`` in ein gemeinsames
+        Verzeichnis gepackt; jede Datei behält ihre eigene CID.
 
         Args:
-            processed_reflection: Verarbeitete Reflexionsdaten
+            items: Zu uploadende Daten
+            names: Dateinamen im Verzeichnis (default: ``<index>.json``)
 
         Returns:
-            Optional[str]: IPFS-Hash bei Erfolg
+            Dict[str, Any]: ``hashes`` (CID pro Eintrag, None bei Fehler)
+            und ``root`` (CID des Verzeichnisses)
         """
-        # Metadaten hinzufügen
-        upload_data = {
+        names = names or [f"{index}.json" for index in range(len(items))]
+        files = [
+            ("file", (name, json.dumps(item, ensure_ascii=False), "application/json"))
+            for name, item in zip(names, items)
+        ]
+
+        try:
+            response = self._request(
+                "add",
+                files=files,
+                params={"pin": "true", "wrap-with-directory": "true"},
+            )
+            if response is None:
+                print("IPFS-Node nicht erreichbar. Verwende lokale Simulation.")
+                return self._simulate_batch(items)
+            if response.status_code != 200:
+                print(f"IPFS Batch-Upload Fehler: {response.status_code}")
+                return {"hashes": [None] * len(items), "root": None}
+
+            # Kubo antwortet mit einer JSON-Zeile je Datei plus Verzeichnis ("Name": "")
+            added = {}
+            for line in response.text.splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    added[entry.get("Name", "")] = entry.get("Hash")
+
+            return {
+                "hashes": [added.get(name) for name in names],
+                "root": added.get(""),
+            }
+
+        except (requests.RequestException, TypeError, ValueError) as e:
+            print(f"IPFS Batch-Upload Fehler/Exception: {e}")
+            return self._simulate_batch(items)
+
+    def _simulate_batch(self, items: List[Dict]) -> Dict[str, Any]:
+        """Simuliert einen Batch-Upload für Entwicklung/Testing"""
+        hashes = [self._simulate_upload(item) for item in items]
+        return {"hashes": hashes, "root": self._simulate_upload({"files": hashes})}
+
+    def _reflection_document(self, processed_reflection: Dict) -> Dict:
+        """Verpackt eine Reflexion mit Upload-Metadaten"""
+        return {
             "asi_version": "1.0",
             "upload_timestamp": datetime.now().isoformat(),
             "data_type": "reflection",
             "reflection": processed_reflection,
         }
 
-        return self.upload_json(upload_data)
+    def upload_reflection(
+        self, processed_reflection: Dict, simulate: bool = True
+    ) -> Optional[str]:
+        """
+        Lädt eine verarbeitete Reflexion zu IPFS hoch
+
+        Args:
+            processed_reflection: Verarbeitete Reflexionsdaten
+            simulate: Siehe ``upload_json``
+
+        Returns:
+            Optional[str]: IPFS-Hash bei Erfolg
+        """
+        return self.upload_json(
+            self._reflection_document(processed_reflection), simulate=simulate
+        )
+
+    def upload_reflections(
+        self,
+        reflections: List[Dict],
+        batch_size: int = 256,
+        with_manifest: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Lädt viele Reflexionen gebündelt hoch
+
+        Je ``batch_size`` Reflexionen werden in einer /add-Anfrage als
+        Verzeichnis hochgeladen; bis zu ``max_parallel_uploads`` Batches
+        laufen gleichzeitig über die gepoolte Session.
+
+        Args:
+            reflections: Verarbeitete Reflexionsdaten
+            batch_size: Reflexionen pro HTTP-Anfrage
+            with_manifest: Manifest über alle Verzeichnisse anlegen
+
+        Returns:
+            Dict[str, Any]: ``hashes`` (CID pro Reflexion, None bei Fehler),
+            ``roots`` (Verzeichnis-CID pro Batch) und ``manifest``
+        """
+        batch_size = max(1, batch_size)
+        batches = []
+        for start in range(0, len(reflections), batch_size):
+            end = start + batch_size
+            batches.append(
+                [self._reflection_document(item) for item in reflections[start:end]]
+            )
+
+        if len(batches) > 1 and self.max_parallel_uploads > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_parallel_uploads, len(batches)),
+                thread_name_prefix="asi-ipfs-upload",
+            ) as executor:
+                results = list(executor.map(self.upload_json_batch, batches))
+        else:
+            results = [self.upload_json_batch(batch) for batch in batches]
+
+        hashes = [cid for result in results for cid in result["hashes"]]
+        roots = [result["root"] for result in results]
+
+        manifest = None
+        if with_manifest and roots:
+            manifest = self.create_manifest(
+                [root for root in roots if root], entry_type="reflection_directories"
+            )
+
+        return {"hashes": hashes, "roots": roots, "manifest": manifest}
 
-    def create_manifest(self, reflection_hashes: List[str]) -> Optional[str]:
+    def create_manifest(
+        self, reflection_hashes: List[str], entry_type: str = "reflections"
+    ) -> Optional[str]:
         """
         Erstellt ein Manifest mit mehreren Reflexions-Hashes
 
         Args:
             reflection_hashes: Liste von IPFS-Hashes
+            entry_type: 'reflections' (einzelne Dateien) oder
+                'reflection_directories' (Verzeichnisse aus Batch-Uploads)
 
         Returns:
             Optional[str]: Hash des Manifests
@@ -232,7 +557,7 @@ class IPFSClient:
             "created": datetime.now().isoformat(),
             "type": "reflection_collection",
             "count": len(reflection_hashes),
-            "reflections": reflection_hashes,
+            entry_type: reflection_hashes,
         }
 
         return self.upload_json(manifest)
@@ -281,7 +606,7 @@ if __name__ == "__main__":
     print("=== IPFS Client Test ===")
 
     # Node-Status prüfen
-    if client.is_node_running():
+    if client.probe():
         print("✓ IPFS-Node läuft")
         info = client.get_node_info()
         if info:
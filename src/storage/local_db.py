@@ -3,10 +3,11 @@ ASI Core - Local Database
 SQLite für temporäre Daten und Metadaten
 """
 
+import base64
 import sqlite3
 import json
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
@@ -25,11 +26,38 @@ class ReflectionRecord:
     tags: List[str]
     themes: List[str]
     sentiment: Optional[str]
+    full_content: Optional[str] = None
+
+
+def encode_cursor(timestamp: str, reflection_hash: str) -> str:
+    """Kodiert eine Position (timestamp, hash) als undurchsichtigen Cursor"""
+    raw = json.dumps([timestamp, reflection_hash], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Dekodiert einen Cursor aus encode_cursor
+
+    Raises:
+        ValueError: Bei ungültigem Cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, reflection_hash = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Ungültiger Cursor: {cursor}") from e
+    if not isinstance(timestamp, str) or not isinstance(reflection_hash, str):
+        raise ValueError(f"Ungültiger Cursor: {cursor}")
+    return timestamp, reflection_hash
 
 
 class LocalDatabase:
     """SQLite-Datenbank für lokale ASI-Daten"""
 
+    # Tabellen, deren Änderungen den Datenstand (data_version) erhöhen
+    VERSIONED_TABLES = ("reflections", "upload_status", "insights")
+
     def __init__(self, db_path: str = "data/asi_local.db"):
         self.db_path = db_path
         self.ensure_db_directory()
@@ -41,6 +69,22 @@ class LocalDatabase:
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
 
+    @property
+    def data_version(self) -> str:
+        """
+        Kennung des aktuellen Datenstands
+
+        Der Zähler liegt in der Datenbank und wird per Trigger in derselben
+        Transaktion wie jede Änderung erhöht, sieht also auch Schreibzugriffe
+        anderer Prozesse. Die Datenbank-Kennung verhindert Kollisionen, wenn
+        die Datei neu angelegt wird.
+        """
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT instance, generation FROM data_generation WHERE id = 1"
+            ).fetchone()
+        return f"{row['instance']}-{row['generation']}"
+
     def get_connection(self) -> sqlite3.Connection:
         """
         Erstellt eine Datenbankverbindung
@@ -118,9 +162,78 @@ class LocalDatabase:
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_reflections_privacy ON reflections (privacy_level)"
             )
+            # Keyset-Pagination über (timestamp, hash)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reflections_keyset "
+                "ON reflections (timestamp, hash)"
+            )
+            # Ein Queue-Eintrag je Reflexion und Ziel; ältere Datenbanken
+            # können Duplikate enthalten, behalten wird der hochgeladene
+            # bzw. älteste Eintrag
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'index' AND name = 'idx_upload_status_target'"
+            ).fetchone():
+                conn.execute(
+                    """
+                    DELETE FROM upload_status WHERE id NOT IN (
+                        SELECT (
+                            SELECT keep.id FROM upload_status keep
+                            WHERE keep.reflection_hash = grouped.reflection_hash
+                              AND keep.storage_type = grouped.storage_type
+                            ORDER BY keep.status = 'uploaded' DESC, keep.id
+                            LIMIT 1
+                        )
+                        FROM upload_status grouped
+                        GROUP BY reflection_hash, storage_type
+                    )
+                """
+                )
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_upload_status_target "
+                "ON upload_status (reflection_hash, storage_type)"
+            )
+            conn.execute("DROP INDEX IF EXISTS idx_upload_status_reflection")
+
+            # Migration: Zeitpunkt des nächsten Versuchs für die Upload-Queue
+            columns = {
+                row["name"] for row in conn.execute("PRAGMA table_info(upload_status)")
+            }
+            if "next_attempt" not in columns:
+                conn.execute(
+                    "ALTER TABLE upload_status ADD COLUMN next_attempt REAL DEFAULT 0"
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_upload_status_queue "
+                "ON upload_status (status, next_attempt)"
+            )
+
+            # Datenstand für bedingte GET-Anfragen
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS data_generation (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    instance TEXT NOT NULL,
+                    generation INTEGER NOT NULL
+                )
+            """
+            )
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_upload_status_reflection ON upload_status (reflection_hash)"
+                "INSERT OR IGNORE INTO data_generation (id, instance, generation) "
+                "VALUES (1, lower(hex(randomblob(4))), 0)"
             )
+            for table in self.VERSIONED_TABLES:
+                for event in ("INSERT", "UPDATE", "DELETE"):
+                    conn.execute(
+                        f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                        AFTER {event} ON {table}
+                        BEGIN
+                            UPDATE data_generation SET generation = generation + 1
+                            WHERE id = 1;
+                        END
+                    """
+                    )
 
             conn.commit()
 
@@ -165,7 +278,7 @@ class LocalDatabase:
                 ),
             )
 
-            return cursor.lastrowid
+        return cursor.lastrowid
 
     def update_storage_reference(
         self, reflection_hash: str, storage_type: str, storage_hash: str
@@ -190,18 +303,140 @@ class LocalDatabase:
                     (storage_hash, reflection_hash),
                 )
 
-            # Upload-Status aktualisieren
+            # Upload-Status aktualisieren (vorhandenen Queue-Eintrag abschließen)
             conn.execute(
                 """
-                INSERT OR REPLACE INTO upload_status 
+                INSERT INTO upload_status
                 (reflection_hash, storage_type, storage_hash, status, last_attempt)
                 VALUES (?, ?, ?, 'uploaded', CURRENT_TIMESTAMP)
+                ON CONFLICT (reflection_hash, storage_type) DO UPDATE SET
+                    storage_hash = excluded.storage_hash, status = 'uploaded',
+                    last_attempt = excluded.last_attempt, error_message = NULL
             """,
                 (reflection_hash, storage_type, storage_hash),
             )
 
             conn.commit()
 
+    def enqueue_upload(self, reflection_hash: str, storage_type: str) -> bool:
+        """
+        Reiht einen Upload zur Hintergrundverarbeitung ein
+
+        Args:
+            reflection_hash: Hash der Reflexion
+            storage_type: 'ipfs' oder 'arweave'
+
+        Returns:
+            bool: False wenn bereits eingereiht oder hochgeladen
+        """
+        with self.get_connection() as conn:
+            # Der eindeutige Index macht Prüfen und Einfügen zu einem Schritt
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO upload_status
+                    (reflection_hash, storage_type, status, next_attempt)
+                VALUES (?, ?, 'pending', 0)
+            """,
+                (reflection_hash, storage_type),
+            )
+            conn.commit()
+        return cursor.rowcount > 0
+
+    def claim_pending_uploads(
+        self, storage_types: List[str], limit: int, now: float
+    ) -> List[Dict]:
+        """
+        Übernimmt fällige Uploads atomar (Status 'uploading')
+
+        Args:
+            storage_types: Zu bearbeitende Storage-Typen
+            limit: Maximale Anzahl
+            now: Aktueller Zeitpunkt (Epoch-Sekunden)
+
+        Returns:
+            List[Dict]: Übernommene Queue-Einträge
+        """
+        if not storage_types or limit <= 0:
+            return []
+
+        placeholders = ",".join("?" for _ in storage_types)
+        with self.get_connection() as conn:
+            # BEGIN IMMEDIATE sperrt gegen parallele Worker anderer Prozesse
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"""
+                SELECT id, reflection_hash, storage_type, attempt_count
+                FROM upload_status
+                WHERE status = 'pending' AND next_attempt <= ?
+                  AND storage_type IN ({placeholders})
+                ORDER BY next_attempt, id
+                LIMIT ?
+            """,
+                (now, *storage_types, limit),
+            ).fetchall()
+
+            conn.executemany(
+                """
+                UPDATE upload_status
+                SET status = 'uploading', attempt_count = attempt_count + 1,
+                    last_attempt = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """,
+                [(row["id"],) for row in rows],
+            )
+            conn.commit()
+
+        return [
+            {
+                "id": row["id"],
+                "reflection_hash": row["reflection_hash"],
+                "storage_type": row["storage_type"],
+                "attempt_count": row["attempt_count"] + 1,
+            }
+            for row in rows
+        ]
+
+    def record_upload_failure(
+        self, upload_id: int, error_message: str, next_attempt: Optional[float]
+    ):
+        """
+        Vermerkt einen fehlgeschlagenen Upload-Versuch
+
+        Args:
+            upload_id: ID des Queue-Eintrags
+            error_message: Fehlermeldung
+            next_attempt: Zeitpunkt des nächsten Versuchs (None = endgültig gescheitert)
+        """
+        with self.get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE upload_status
+                SET status = ?, error_message = ?, next_attempt = ?
+                WHERE id = ?
+            """,
+                (
+                    "pending" if next_attempt is not None else "failed",
+                    error_message,
+                    next_attempt if next_attempt is not None else 0,
+                    upload_id,
+                ),
+            )
+            conn.commit()
+
+    def release_stale_uploads(self) -> int:
+        """
+        Gibt nach einem Neustart hängengebliebene Uploads wieder frei
+
+        Returns:
+            int: Anzahl freigegebener Einträge
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                "UPDATE upload_status SET status = 'pending' WHERE status = 'uploading'"
+            )
+            conn.commit()
+        return cursor.rowcount
+
     def get_reflections(
         self, limit: int = 50, privacy_level: str = None, days_back: int = None
     ) -> List[ReflectionRecord]:
@@ -216,6 +451,42 @@ class LocalDatabase:
         Returns:
             List[ReflectionRecord]: Liste der Reflexionen
         """
+        records, _ = self.get_reflections_page(
+            limit=limit, privacy_level=privacy_level, days_back=days_back
+        )
+        return records
+
+    def get_reflections_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        privacy_level: str = None,
+        days_back: int = None,
+        include_content: bool = False,
+    ) -> Tuple[List[ReflectionRecord], Optional[str]]:
+        """
+        Ruft eine Seite von Reflexionen ab (neueste zuerst)
+
+        Geblättert wird über (timestamp, hash) statt OFFSET; jede Seite
+        kostet einen Index-Zugriff, unabhängig davon, wie tief sie liegt.
+
+        Args:
+            limit: Maximale Anzahl pro Seite
+            cursor: Cursor der vorherigen Seite (None = erste Seite)
+            privacy_level: Filter nach Privacy-Level
+            days_back: Nur Reflexionen der letzten X Tage
+            include_content: Vollständigen Inhalt mitladen
+
+        Returns:
+            Tuple[List[ReflectionRecord], Optional[str]]: Reflexionen und
+            Cursor der nächsten Seite (None = letzte Seite)
+
+        Raises:
+            ValueError: Bei ungültigem Cursor oder limit < 1
+        """
+        if limit < 1:
+            raise ValueError(f"limit muss mindestens 1 sein: {limit}")
+
         with self.get_connection() as conn:
             query = "SELECT * FROM reflections WHERE 1=1"
             params = []
@@ -229,14 +500,19 @@ class LocalDatabase:
                 query += " AND timestamp >= ?"
                 params.append(cutoff_date.isoformat())
 
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
+            if cursor:
+                last_timestamp, last_hash = decode_cursor(cursor)
+                query += " AND timestamp <= ? AND (timestamp < ? OR hash < ?)"
+                params.extend([last_timestamp, last_timestamp, last_hash])
 
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
+            # Eine Zeile mehr laden, um das Ende zu erkennen
+            query += " ORDER BY timestamp DESC, hash DESC LIMIT ?"
+            params.append(limit + 1)
+
+            rows = conn.execute(query, params).fetchall()
 
             records = []
-            for row in rows:
+            for row in rows[:limit]:
                 record = ReflectionRecord(
                     id=row["id"],
                     hash=row["hash"],
@@ -248,10 +524,49 @@ class LocalDatabase:
                     tags=json.loads(row["tags"]) if row["tags"] else [],
                     themes=json.loads(row["themes"]) if row["themes"] else [],
                     sentiment=row["sentiment"],
+                    full_content=row["full_content"] if include_content else None,
                 )
                 records.append(record)
 
-            return records
+            next_cursor = None
+            if len(rows) > limit:
+                last = rows[limit - 1]
+                next_cursor = encode_cursor(last["timestamp"], last["hash"])
+
+            return records, next_cursor
+
+    def iter_reflections(
+        self,
+        batch_size: int = 500,
+        privacy_level: str = None,
+        include_content: bool = True,
+    ) -> Iterator[ReflectionRecord]:
+        """
+        Durchläuft alle Reflexionen (neueste zuerst) in Batches
+
+        Jeder Batch ist eine eigene kurze Abfrage über den Keyset-Cursor;
+        ein langsamer Leser hält damit keine Lesesperre über den gesamten
+        Export und der Speicherbedarf bleibt bei einem Batch.
+
+        Args:
+            batch_size: Anzahl Zeilen pro Abfrage
+            privacy_level: Filter nach Privacy-Level
+            include_content: Vollständigen Inhalt mitladen
+
+        Yields:
+            ReflectionRecord: Reflexionen
+        """
+        cursor = None
+        while True:
+            records, cursor = self.get_reflections_page(
+                limit=batch_size,
+                cursor=cursor,
+                privacy_level=privacy_level,
+                include_content=include_content,
+            )
+            yield from records
+            if cursor is None:
+                return
 
     def get_reflection_by_hash(self, reflection_hash: str) -> Optional[Dict]:
         """
@@ -317,7 +632,7 @@ class LocalDatabase:
                 ),
             )
 
-            return cursor.lastrowid
+        return cursor.lastrowid
 
     def get_recent_insights(
         self, days_back: int = 7, only_actionable: bool = False
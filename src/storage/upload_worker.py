@@ -0,0 +1,172 @@
+"""
+ASI Core - Upload Worker
+Hintergrund-Uploads zu IPFS und Arweave über die upload_status-Queue
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .local_db import LocalDatabase
+
+
+class UploadWorker:
+    """
+    Arbeitet die Upload-Queue der lokalen Datenbank im Hintergrund ab.
+
+    Fällige Einträge werden atomar übernommen und mit begrenzter
+    Parallelität hochgeladen. Fehlgeschlagene Versuche werden mit
+    exponentiellem Backoff und Jitter neu eingeplant. Da die Queue in
+    SQLite liegt, überlebt sie Neustarts; beim Start werden unterbrochene
+    Uploads wieder freigegeben.
+    """
+
+    def __init__(
+        self,
+        local_db: LocalDatabase,
+        ipfs_client=None,
+        arweave_client=None,
+        max_parallel: int = 4,
+        poll_interval: float = 5.0,
+        base_delay: float = 10.0,
+        max_delay: float = 3600.0,
+        max_attempts: int = 8,
+    ):
+        """
+        Args:
+            local_db: Lokale Datenbank mit der Upload-Queue
+            ipfs_client: IPFS-Client (None = IPFS-Uploads werden nicht bearbeitet)
+            arweave_client: Arweave-Client (None = keine Arweave-Uploads bearbeiten)
+            max_parallel: Maximale Anzahl gleichzeitiger Uploads
+            poll_interval: Sekunden zwischen zwei Queue-Abfragen im Leerlauf
+            base_delay: Wartezeit nach dem ersten Fehlschlag in Sekunden
+            max_delay: Obergrenze der Wartezeit in Sekunden
+            max_attempts: Versuche, nach denen ein Upload als 'failed' gilt
+        """
+        self.local_db = local_db
+        self.clients = {
+            name: client
+            for name, client in (("ipfs", ipfs_client), ("arweave", arweave_client))
+            if client is not None
+        }
+        self.max_parallel = max(1, max_parallel)
+        self.poll_interval = poll_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_parallel, thread_name_prefix="asi-upload"
+        )
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, reflection_hash: str, storage_types: List[str]) -> int:
+        """
+        Reiht Uploads einer Reflexion ein und weckt den Worker
+
+        Args:
+            reflection_hash: Hash der Reflexion
+            storage_types: Ziele, z.B. ['ipfs', 'arweave']
+
+        Returns:
+            int: Anzahl neu eingereihter Uploads
+        """
+        added = sum(
+            self.local_db.enqueue_upload(reflection_hash, storage_type)
+            for storage_type in storage_types
+            if storage_type in self.clients
+        )
+        if added:
+            self._wakeup.set()
+        return added
+
+    def start(self):
+        """Startet den Hintergrund-Thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        released = self.local_db.release_stale_uploads()
+        if released:
+            print(f"🔁 {released} unterbrochene Uploads wieder eingereiht")
+
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="asi-upload-worker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Beendet den Worker; laufende Uploads werden zu Ende geführt"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self._executor.shutdown(wait=True)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                print(f"Upload-Worker Fehler: {e}")
+                processed = 0
+
+            # Bei voller Auslastung sofort weitermachen, sonst auf neue Arbeit warten
+            if processed < self.max_parallel:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self) -> int:
+        """
+        Übernimmt fällige Uploads und führt sie parallel aus
+
+        Returns:
+            int: Anzahl bearbeiteter Uploads
+        """
+        jobs = self.local_db.claim_pending_uploads(
+            list(self.clients), self.max_parallel, time.time()
+        )
+        for _ in self._executor.map(self._process, jobs):
+            pass
+        return len(jobs)
+
+    def _process(self, job: Dict):
+        """Führt einen einzelnen Upload aus und vermerkt das Ergebnis"""
+        try:
+            reflection = self.local_db.get_reflection_by_hash(job["reflection_hash"])
+            if reflection is None:
+                raise LookupError("Reflexion nicht gefunden")
+
+            reflection["privacy"] = reflection.get("privacy_level", "private")
+            client = self.clients[job["storage_type"]]
+
+            if job["storage_type"] == "arweave":
+                storage_hash = client.upload_reflection(
+                    reflection, ipfs_hash=reflection.get("ipfs_hash")
+                )
+            else:
+                # Ein simulierter Hash wäre kein Upload; ohne Node neu versuchen
+                storage_hash = client.upload_reflection(reflection, simulate=False)
+
+            if not storage_hash:
+                raise RuntimeError("Upload lieferte keinen Hash")
+
+            self.local_db.update_storage_reference(
+                job["reflection_hash"], job["storage_type"], storage_hash
+            )
+        except Exception as e:
+            self.local_db.record_upload_failure(
+                job["id"], str(e), self._next_attempt(job["attempt_count"])
+            )
+
+    def _next_attempt(self, attempt_count: int) -> Optional[float]:
+        """Exponentielles Backoff mit Jitter; None nach dem letzten Versuch"""
+        if attempt_count >= self.max_attempts:
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt_count - 1))
+        return time.time() + random.uniform(delay / 2, delay)
@@ -3,32 +3,259 @@ ASI Core - Admin API Endpoints
 Erweiterte API-Endpoints für das zentrale Admin-Dashboard
 """
 
+import logging
 import os
 import psutil
+import threading
 import time
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
 from flask import Blueprint, jsonify, request, send_file
 from pathlib import Path
 import sqlite3
 import json
 
+from asi_core.agent_store import AgentStore
+
+AGENTS_DIR = "data/agents"
+
 # Blueprint für Admin-APIs
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
+
+class SystemSampler:
+    """
+    Sammelt System-Metriken im Hintergrund in einem festen Takt.
+
+    Handler lesen nur den zuletzt erfassten Snapshot und blockieren damit
+    nie auf psutil. Die CPU-Auslastung wird nicht-blockierend als
+    Durchschnitt seit der vorherigen Messung bestimmt.
+    """
+
+    def __init__(self, interval=2.0, disk_path='/'):
+        self.interval = interval
+        self.disk_path = disk_path
+        self.boot_time = psutil.boot_time()
+        self.process = psutil.Process(os.getpid())
+        self._snapshot = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        # Erste Messung dient nur als Referenz für die folgenden Deltas
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent(interval=None)
+
+    def sample(self):
+        """Erfasst einen neuen Snapshot und gibt ihn zurück"""
+        if self.process.pid != os.getpid():
+            # Nach einem Fork (z.B. Worker-Prozesse) den eigenen Prozess messen
+            self.process = psutil.Process(os.getpid())
+            self.process.cpu_percent(interval=None)
+        memory = psutil.virtual_memory()
+        with self.process.oneshot():
+            process_stats = {
+                "pid": self.process.pid,
+                "cpu_percent": self.process.cpu_percent(interval=None),
+                "memory_rss": self.process.memory_info().rss,
+                "threads": self.process.num_threads(),
+            }
+        snapshot = {
+            "cpu_usage": psutil.cpu_percent(interval=None),
+            "memory_usage": memory.percent,
+            "memory_available": memory.available,
+            "disk_usage": psutil.disk_usage(self.disk_path).percent,
+            "process": process_stats,
+            "uptime": time.time() - self.boot_time,
+            "timestamp": datetime.now().isoformat()
+        }
+        # Atomarer Austausch: Leser sehen immer einen vollständigen Snapshot
+        self._snapshot = snapshot
+        return snapshot
+
+    def start(self):
+        """Startet den Hintergrund-Thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="asi-system-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Beendet den Hintergrund-Thread"""
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"System-Sampler Fehler: {e}")
+
+    def snapshot(self):
+        """Liefert den aktuellen Snapshot, ohne psutil aufzurufen"""
+        self.start()
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.sample()
+        return snapshot
+
+
+# Gemeinsamer Sampler für alle Admin-Endpunkte
+system_sampler = SystemSampler()
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Logging-Handler, der die letzten ``capacity`` Records im Speicher hält.
+
+    Jeder Record erhält eine fortlaufende Sequenznummer. Über ``since``
+    holen Dashboards nur die seitdem neu hinzugekommenen Records; die
+    Kosten einer Abfrage hängen von der Anzahl neuer Records ab, nicht
+    von der Puffergröße.
+    """
+
+    def __init__(self, capacity=1000, level=logging.NOTSET):
+        super().__init__(level)
+        self.capacity = capacity
+        self._records = deque(maxlen=capacity)
+        self._seq = 0
+
+    def emit(self, record):
+        try:
+            entry = {
+                "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+                "created": record.created,
+                "level": record.levelname,
+                "levelno": record.levelno,
+                "message": record.getMessage(),
+                "source": record.name,
+            }
+            if record.exc_info:
+                formatter = logging.Formatter()
+                entry["exception"] = formatter.formatException(record.exc_info)
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self.lock:
+            self._seq += 1
+            entry["seq"] = self._seq
+            self._records.append(entry)
+
+    @property
+    def cursor(self):
+        """Sequenznummer des neuesten Records"""
+        return self._seq
+
+    def get_records(
+        self, limit=50, since=None, min_level=logging.NOTSET, since_time=None
+    ):
+        """
+        Liefert Records, neueste zuerst, zusammen mit dem Cursor
+
+        Ohne ``since``/``since_time`` sind es die neuesten ``limit`` Records.
+        Bei inkrementellen Abrufen mit mehr als ``limit`` neuen Records
+        werden die ältesten davon geliefert; der Cursor zeigt dann auf den
+        letzten gelieferten Record, sodass der nächste Abruf lückenlos
+        anschließt.
+
+        Args:
+            limit: Maximale Anzahl Records
+            since: Nur Records mit größerer Sequenznummer
+            min_level: Mindest-Loglevel
+            since_time: Nur Records nach diesem Zeitpunkt (Epoch-Sekunden)
+
+        Returns:
+            tuple: (Records, Cursor für den nächsten Abruf)
+        """
+        incremental = since is not None or since_time is not None
+        result = []
+        with self.lock:
+            cursor = self._seq
+            if limit <= 0:
+                return result, since if since is not None else cursor
+            # Vom neuesten Ende aus lesen und abbrechen, sobald die Grenze erreicht ist
+            for entry in reversed(self._records):
+                if not incremental and len(result) >= limit:
+                    break
+                if since is not None and entry["seq"] <= since:
+                    break
+                if since_time is not None and entry["created"] <= since_time:
+                    break
+                if entry["levelno"] >= min_level:
+                    result.append(entry)
+
+        if incremental and len(result) > limit:
+            result = result[-limit:]
+            cursor = result[0]["seq"]
+        return result, cursor
+
+    def clear(self):
+        """Leert den Puffer; Sequenznummern laufen weiter"""
+        with self.lock:
+            self._records.clear()
+
+
+# Puffer für echte Anwendungs-Logs, wird beim Registrieren des Blueprints installiert
+log_buffer = RingBufferHandler(capacity=int(os.getenv("ASI_ADMIN_LOG_BUFFER", "1000")))
+
+
+def install_log_buffer(logger=None, level=None):
+    """
+    Hängt den Log-Puffer an den (Root-)Logger
+
+    Der Root-Logger steht standardmäßig auf WARNING, Info-Meldungen
+    erreichten den Puffer dann nie. Er wird daher auf ``level`` (Default:
+    ``ASI_ADMIN_LOG_LEVEL`` bzw. INFO) gesenkt; vorhandene Handler behalten
+    ihr bisheriges Level, damit sich die Konsolenausgabe nicht ändert.
+    """
+    logger = logger or logging.getLogger()
+    if log_buffer in logger.handlers:
+        return
+    level = logging.getLevelName(
+        level or os.getenv("ASI_ADMIN_LOG_LEVEL", "INFO").upper()
+    )
+    if not isinstance(level, int):
+        level = logging.INFO
+
+    previous = logger.getEffectiveLevel()
+    if logger is logging.getLogger() and not logger.handlers:
+        # Ohne eigene Handler würde sonst die Standardausgabe von Warnungen entfallen
+        fallback = logging.StreamHandler()
+        fallback.setLevel(logging.WARNING)
+        logger.addHandler(fallback)
+    if previous > level:
+        for handler in logger.handlers:
+            if handler.level == logging.NOTSET:
+                handler.setLevel(previous)
+        logger.setLevel(level)
+    logger.addHandler(log_buffer)
+
+
+admin_bp.record_once(lambda state: install_log_buffer())
+
 # Hilfsfunktionen
 def get_system_stats():
-    """Sammelt Systemstatistiken"""
+    """Liefert die zuletzt erfassten Systemstatistiken"""
     try:
-        return {
-            "cpu_usage": psutil.cpu_percent(interval=1),
-            "memory_usage": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage('/').percent,
-            "uptime": time.time() - psutil.boot_time(),
-            "timestamp": datetime.now().isoformat()
-        }
+        return dict(system_sampler.snapshot())
     except Exception as e:
         return {"error": str(e)}
 
+
+def agent_store():
+    """Lesender Zugriff auf die Agent-Persistenz"""
+    return AgentStore(AGENTS_DIR)
+
+
+def load_agents():
+    """Agent-Profile samt noch nicht nach agents.json übernommener Log-Ereignisse"""
+    return agent_store().read()
+
 def get_asi_core_stats():
     """Sammelt ASI-Core spezifische Statistiken"""
     try:
@@ -51,11 +278,7 @@ def get_asi_core_stats():
             conn.close()
         
         # Agenten zählen
-        agents_file = "data/agents/agents.json"
-        if os.path.exists(agents_file):
-            with open(agents_file, 'r') as f:
-                agents_data = json.load(f)
-                total_agents = len(agents_data)
+        total_agents = len(load_agents())
         
         return {
             "total_reflections": total_reflections,
@@ -97,9 +320,10 @@ def get_service_status():
 def get_system_alerts():
     """Generiert System-Alerts basierend auf aktuellen Bedingungen"""
     alerts = []
+    stats = system_sampler.snapshot()
     
     # CPU-Check
-    cpu_usage = psutil.cpu_percent()
+    cpu_usage = stats["cpu_usage"]
     if cpu_usage > 80:
         alerts.append({
             "level": "warning",
@@ -108,7 +332,7 @@ def get_system_alerts():
         })
     
     # Memory-Check
-    memory_usage = psutil.virtual_memory().percent
+    memory_usage = stats["memory_usage"]
     if memory_usage > 85:
         alerts.append({
             "level": "error",
@@ -117,7 +341,7 @@ def get_system_alerts():
         })
     
     # Disk-Check
-    disk_usage = psutil.disk_usage('/').percent
+    disk_usage = stats["disk_usage"]
     if disk_usage > 90:
         alerts.append({
             "level": "error",
@@ -127,32 +351,15 @@ def get_system_alerts():
     
     return alerts
 
-def get_recent_logs(limit=50):
-    """Sammelt aktuelle Log-Einträge"""
-    logs = []
-    
-    # Simulierte Logs (in Produktion würde man echte Log-Dateien lesen)
-    log_levels = ["INFO", "WARNING", "ERROR", "DEBUG"]
-    messages = [
-        "Agent system initialized successfully",
-        "New reflection processed",
-        "Blockchain connection established", 
-        "IPFS node connected",
-        "State transition recorded",
-        "Embedding cache updated",
-        "User session started",
-        "Database query executed"
-    ]
-    
-    for i in range(min(limit, 20)):  # Max 20 simulierte Logs
-        logs.append({
-            "timestamp": (datetime.now() - timedelta(minutes=i*5)).isoformat(),
-            "level": log_levels[i % len(log_levels)],
-            "message": messages[i % len(messages)],
-            "source": "asi-core"
-        })
-    
-    return logs
+
+def get_recent_logs(limit=50, since=None, level=None, since_time=None):
+    """Liefert aktuelle Log-Einträge aus dem Ring-Puffer und den Cursor"""
+    min_level = logging.getLevelName(level.upper()) if level else logging.NOTSET
+    if not isinstance(min_level, int):
+        raise ValueError(f"Unbekanntes Loglevel: {level}")
+    return log_buffer.get_records(
+        limit, since=since, min_level=min_level, since_time=since_time
+    )
 
 # Admin API Endpoints
 
@@ -193,11 +400,23 @@ def admin_alerts():
 
 @admin_bp.route('/logs')
 def admin_logs():
-    """Recent System Logs"""
+    """Aktuelle System-Logs, optional nur neue Einträge seit ``since``"""
     try:
         limit = request.args.get('limit', 50, type=int)
-        logs = get_recent_logs(limit)
-        return jsonify(logs)
+        since = request.args.get('since', type=int)
+        since_time = request.args.get('since_time')
+        if since_time:
+            since_time = datetime.fromisoformat(since_time).timestamp()
+        logs, cursor = get_recent_logs(
+            limit, since=since, level=request.args.get('level'), since_time=since_time
+        )
+
+        response = jsonify(logs)
+        # Cursor für den nächsten inkrementellen Abruf
+        response.headers['X-Log-Cursor'] = str(cursor)
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -205,7 +424,7 @@ def admin_logs():
 def clear_logs():
     """Löscht System-Logs"""
     try:
-        # In Produktion würde hier echte Log-Datei geleert werden
+        log_buffer.clear()
         return jsonify({"success": True, "message": "Logs cleared"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -243,10 +462,7 @@ def export_data(data_type):
             export_data = {"reflections": [], "count": 0}
         elif data_type == "agents":
             # Agent-Daten exportieren
-            agents_file = "data/agents/agents.json"
-            if os.path.exists(agents_file):
-                with open(agents_file, 'r') as f:
-                    export_data = json.load(f)
+            export_data = load_agents()
         
         # JSON-Response als Download
         filename = f"asi-export-{data_type}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
@@ -297,14 +513,15 @@ def update_config():
 def admin_health():
     """Erweiterte Health-Check für Admin"""
     try:
+        store = agent_store()
         health_data = {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "version": "1.0.0",
-            "uptime": time.time() - psutil.boot_time(),
+            "uptime": time.time() - system_sampler.boot_time,
             "components": {
                 "database": os.path.exists("data/asi_local.db"),
-                "agents": os.path.exists("data/agents/agents.json"),
+                "agents": store.snapshot_file.exists() or store.log_file.exists(),
                 "web_server": True,
                 "file_system": os.access("data/", os.W_OK)
             }
@@ -6,16 +6,31 @@ Flask-basierte Web-Anwendung für ASI Core
 import json
 import os
 import sys
+import threading
+import zlib
 from datetime import datetime
 from pathlib import Path
 
-from flask import Flask, flash, jsonify, redirect, render_template, request, url_for
+from flask import (
+    Flask,
+    Response,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
 
 # ASI Core Module importieren
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-# Admin API Blueprint importieren
-from admin_api import admin_bp
+# Admin API Blueprint importieren (als Paket oder direkt aus src/web gestartet)
+try:
+    from .admin_api import admin_bp
+except ImportError:
+    from admin_api import admin_bp
 
 from src.ai.embedding import ReflectionEmbedding
 from src.ai.search import SemanticSearchEngine
@@ -25,8 +40,13 @@ from src.core.input import InputHandler
 from src.core.output import OutputGenerator
 from src.core.processor import ReflectionProcessor
 from src.storage.arweave_client import ArweaveClient
+from src.storage.content_cache import ContentCache
 from src.storage.ipfs_client import IPFSClient
 from src.storage.local_db import LocalDatabase
+from src.storage.upload_worker import UploadWorker
+from src.web.backend_health import BackendProber
+from src.web.http_cache import HTTPCache, conditional
+from src.web.metrics import RequestMetrics
 
 # Flask App initialisieren
 app = Flask(__name__)
@@ -49,6 +69,14 @@ else:
     app.secret_key = secrets.token_hex(32)
     print("⚠️ WARNUNG: Temporärer Secret Key für Entwicklung generiert!")
 
+# Latenz-Histogramme und Zähler pro Route, abrufbar unter /metrics
+request_metrics = RequestMetrics()
+request_metrics.init_app(app)
+
+# ETags und Kompression; nach den Metriken registriert, damit diese 304 sehen
+http_cache = HTTPCache()
+http_cache.init_app(app)
+
 # Sichere Cookie-Defaults (wirken nur, wenn Sessions/Cookies verwendet werden)
 app.config.update(
     SESSION_COOKIE_HTTPONLY=True,
@@ -58,54 +86,171 @@ app.config.update(
 )
 
 
-# ASI Core System initialisieren
-def init_asi_system():
-    """Initialisiert das ASI Core System"""
-    try:
-        # Storage-Module
-        local_db = LocalDatabase("data/asi_local.db")
-        ipfs_client = IPFSClient()
-        arweave_client = ArweaveClient()
+# Nur diese Privacy-Level verlassen das Gerät (siehe EnhancedReflectionProcessor)
+UPLOADABLE_PRIVACY_LEVELS = ("anonymous", "public")
 
-        # AI-Module
-        embedding_system = ReflectionEmbedding()
-        search_engine = SemanticSearchEngine(embedding_system, local_db)
 
-        # Core-Module
-        input_handler = InputHandler()
-        processor = ReflectionProcessor(embedding_system, local_db)
-        output_generator = OutputGenerator()
+def _upload_targets():
+    """Aktivierte Upload-Ziele aus ASI_UPLOAD_TARGETS oder config/settings.json"""
+    targets = os.getenv("ASI_UPLOAD_TARGETS")
+    if targets is not None:
+        return [t.strip() for t in targets.split(",") if t.strip()]
 
-        # Blockchain-Module
-        smart_contract = ASISmartContract()
-        wallet = CryptoWallet()
+    try:
+        settings_path = Path(__file__).parent.parent.parent / "config" / "settings.json"
+        with open(settings_path, "r", encoding="utf-8") as f:
+            features = json.load(f).get("features", {})
+    except (OSError, ValueError):
+        return []
+    return [
+        target
+        for target in ("ipfs", "arweave")
+        if features.get(f"{target}_enabled", False)
+    ]
+
+
+class LazyASISystem:
+    """
+    Komponenten des ASI Core Systems, die erst beim ersten Zugriff entstehen.
+
+    ``asi_system["local_db"]`` baut die Komponente (samt Abhängigkeiten)
+    beim ersten Zugriff auf und hält sie danach vor. Damit kostet ein
+    Import der App oder ein Worker-Start nur Millisekunden; teure
+    Komponenten lassen sich mit ``warm_up`` im Hintergrund vorladen.
+    Jede Komponente hat ein eigenes Lock: ein langsamer Aufbau (z.B. des
+    Embedding-Modells) blockiert nur Zugriffe auf diese Komponente.
+    """
+
+    def __init__(self, factories):
+        self._factories = factories
+        self._components = {}
+        self._errors = {}
+        self._locks = {name: threading.RLock() for name in factories}
+
+    def __getitem__(self, name):
+        component = self._components.get(name)
+        if component is not None:
+            return component
+
+        with self._locks[name]:
+            if name not in self._components:
+                try:
+                    self._components[name] = self._factories[name](self)
+                    self._errors.pop(name, None)
+                except KeyError:
+                    raise
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    print(f"Fehler bei ASI-Initialisierung ({name}): {e}")
+                    raise
+            return self._components[name]
+
+    def __contains__(self, name):
+        return name in self._factories
+
+    def status(self, name):
+        """'ok' (geladen), 'lazy' (noch nicht geladen) oder 'error'"""
+        if name in self._components:
+            return "ok"
+        return "error" if name in self._errors else "lazy"
+
+    def warm_up(self, names=None, background=True):
+        """Initialisiert Komponenten vorab, standardmäßig im Hintergrund"""
+        names = list(names or self._factories)
+
+        def run():
+            for name in names:
+                try:
+                    self[name]
+                except Exception:
+                    pass  # bereits protokolliert, nächster Zugriff versucht es erneut
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="asi-warmup", daemon=True)
+        thread.start()
+        return thread
+
+
+def _create_upload_worker(system):
+    # Uploads laufen ausschließlich im Hintergrund über die upload_status-Queue
+    upload_targets = _upload_targets()
+    ipfs_client = system["ipfs_client"] if "ipfs" in upload_targets else None
+    arweave_client = system["arweave_client"] if "arweave" in upload_targets else None
+    upload_worker = UploadWorker(
+        system["local_db"], ipfs_client=ipfs_client, arweave_client=arweave_client
+    )
+    if upload_targets:
+        upload_worker.start()
+    return upload_worker
 
-        return {
-            "input_handler": input_handler,
-            "processor": processor,
-            "output_generator": output_generator,
-            "local_db": local_db,
-            "ipfs_client": ipfs_client,
-            "arweave_client": arweave_client,
-            "embedding_system": embedding_system,
-            "search_engine": search_engine,
-            "smart_contract": smart_contract,
-            "wallet": wallet,
+
+# ASI Core System initialisieren
+def init_asi_system():
+    """Registriert alle Komponenten des ASI Core Systems (lazy)"""
+    return LazyASISystem(
+        {
+            # Storage-Module
+            "local_db": lambda s: LocalDatabase("data/asi_local.db"),
+            # Unveränderliche Inhalte (CIDs, TX-IDs) werden lokal zwischengespeichert
+            "content_cache": lambda s: ContentCache("data/content_cache.db"),
+            "ipfs_client": lambda s: IPFSClient(cache=s["content_cache"]),
+            "arweave_client": lambda s: ArweaveClient(cache=s["content_cache"]),
+            "upload_worker": _create_upload_worker,
+            # AI-Module
+            "embedding_system": lambda s: ReflectionEmbedding(),
+            "search_engine": lambda s: SemanticSearchEngine(
+                s["embedding_system"], s["local_db"]
+            ),
+            # Core-Module
+            "input_handler": lambda s: InputHandler(),
+            "processor": lambda s: ReflectionProcessor(
+                s["embedding_system"], s["local_db"]
+            ),
+            "output_generator": lambda s: OutputGenerator(),
+            # Blockchain-Module
+            "smart_contract": lambda s: ASISmartContract(),
+            "wallet": lambda s: CryptoWallet(),
         }
-    except Exception as e:
-        print(f"Fehler bei ASI-Initialisierung: {e}")
-        return None
+    )
 
 
 # Globale ASI-Instanz
 asi_system = init_asi_system()
 
+# Optionales Vorladen beim Import, z.B. für WSGI-Worker (ASI_WARMUP=1)
+if os.getenv("ASI_WARMUP", "false").lower() in {"1", "true", "yes"}:
+    asi_system.warm_up()
+
+_upload_worker_lock = threading.Lock()
+_upload_worker_requested = False
+
+
+@app.before_request
+def start_upload_worker():
+    """
+    Startet den Upload-Worker mit der ersten Anfrage im Hintergrund
+
+    Sonst blieben eingereihte Uploads eines früheren Laufs liegen, bis
+    zufällig eine neue Reflexion gespeichert wird.
+    """
+    global _upload_worker_requested
+    if _upload_worker_requested:
+        return
+    with _upload_worker_lock:
+        if _upload_worker_requested:
+            return
+        _upload_worker_requested = True
+    if isinstance(asi_system, LazyASISystem) and _upload_targets():
+        asi_system.warm_up(["upload_worker"])
+
 
 @app.route("/")
 def index():
     """Startseite"""
     stats = None
-    if asi_system and asi_system["local_db"]:
+    if asi_system:
         try:
             stats = asi_system["local_db"].get_statistics()
         except Exception as e:
@@ -127,13 +272,19 @@ def api_health():
         }
 
         if asi_system:
+            # Nur den Zustand melden, ohne Komponenten dafür zu laden
             status["components"] = {
-                "input_handler": "ok",
-                "processor": "ok",
-                "output_generator": "ok",
-                "local_db": "ok",
-                "search_engine": "ok",
+                name: asi_system.status(name)
+                for name in (
+                    "input_handler",
+                    "processor",
+                    "output_generator",
+                    "local_db",
+                    "search_engine",
+                )
             }
+            # Letzter Stand der Backend-Probes, ohne neue auszulösen
+            status["backends"] = backend_prober.status()
 
         return jsonify(status)
     except Exception as e:
@@ -155,6 +306,66 @@ def reflect():
     return render_template("reflect.html")
 
 
+def create_reflection(data):
+    """
+    Verarbeitet und speichert eine neue Reflexion
+
+    Wird vom Flask-Handler und vom asynchronen Server genutzt; dezentrale
+    Uploads werden nur eingereiht.
+
+    Returns:
+        tuple: (Antwort-Dict, HTTP-Status)
+    """
+    content = data.get("content", "").strip()
+    tags = data.get("tags", [])
+    privacy_level = data.get("privacy_level", "private")
+
+    if not content:
+        return {"error": "Reflexionsinhalt ist erforderlich"}, 400
+
+    # Reflexion verarbeiten
+    input_handler = asi_system["input_handler"]
+    processor = asi_system["processor"]
+    local_db = asi_system["local_db"]
+    output_generator = asi_system["output_generator"]
+
+    # 1. Eingabe erfassen
+    reflection_entry = input_handler.capture_reflection(content, tags)
+    reflection_entry.privacy_level = privacy_level
+
+    # 2. Verarbeitung
+    reflection_data = {
+        "content": reflection_entry.content,
+        "timestamp": reflection_entry.timestamp.isoformat(),
+        "tags": reflection_entry.tags,
+        "privacy_level": reflection_entry.privacy_level,
+    }
+
+    processed_reflection = processor.process_reflection(reflection_data)
+    exported_data = processor.export_processed(processed_reflection)
+
+    # 3. Speicherung (dezentrale Uploads nur eingereiht, nicht im Request)
+    reflection_id = local_db.store_reflection(exported_data)
+    uploads_queued = 0
+    if privacy_level in UPLOADABLE_PRIVACY_LEVELS:
+        uploads_queued = asi_system["upload_worker"].enqueue(
+            exported_data["hash"], ["ipfs", "arweave"]
+        )
+
+    # 4. Lokale Ausgabe
+    output_generator.save_local_copy(exported_data)
+
+    return {
+        "success": True,
+        "reflection_id": reflection_id,
+        "hash": exported_data["hash"],
+        "themes": exported_data["themes"],
+        "sentiment": exported_data["sentiment"],
+        "uploads_queued": uploads_queued,
+        "message": "Reflexion erfolgreich gespeichert",
+    }, 200
+
+
 @app.route("/api/reflect", methods=["POST"])
 def api_reflect():
     """API-Endpoint für neue Reflexion"""
@@ -162,51 +373,8 @@ def api_reflect():
         return jsonify({"error": "ASI System nicht verfügbar"}), 500
 
     try:
-        data = request.get_json()
-        content = data.get("content", "").strip()
-        tags = data.get("tags", [])
-        privacy_level = data.get("privacy_level", "private")
-
-        if not content:
-            return jsonify({"error": "Reflexionsinhalt ist erforderlich"}), 400
-
-        # Reflexion verarbeiten
-        input_handler = asi_system["input_handler"]
-        processor = asi_system["processor"]
-        local_db = asi_system["local_db"]
-        output_generator = asi_system["output_generator"]
-
-        # 1. Eingabe erfassen
-        reflection_entry = input_handler.capture_reflection(content, tags)
-        reflection_entry.privacy_level = privacy_level
-
-        # 2. Verarbeitung
-        reflection_data = {
-            "content": reflection_entry.content,
-            "timestamp": reflection_entry.timestamp.isoformat(),
-            "tags": reflection_entry.tags,
-            "privacy_level": reflection_entry.privacy_level,
-        }
-
-        processed_reflection = processor.process_reflection(reflection_data)
-        exported_data = processor.export_processed(processed_reflection)
-
-        # 3. Speicherung
-        reflection_id = local_db.store_reflection(exported_data)
-
-        # 4. Lokale Ausgabe
-        local_file = output_generator.save_local_copy(exported_data)
-
-        return jsonify(
-            {
-                "success": True,
-                "reflection_id": reflection_id,
-                "hash": exported_data["hash"],
-                "themes": exported_data["themes"],
-                "sentiment": exported_data["sentiment"],
-                "message": "Reflexion erfolgreich gespeichert",
-            }
-        )
+        body, status = create_reflection(request.get_json())
+        return jsonify(body), status
 
     except Exception as e:
         return jsonify({"error": f"Fehler beim Verarbeiten: {str(e)}"}), 500
@@ -267,19 +435,17 @@ def search():
     return render_template("search.html")
 
 
-@app.route("/api/search", methods=["GET"])
-def api_search():
-    """API-Endpoint für Suche"""
-    if not asi_system:
-        return jsonify({"error": "ASI System nicht verfügbar"}), 500
-
-    try:
-        query = request.args.get("q", "").strip()
-        limit = int(request.args.get("limit", 10))
+def search_reflections(query, limit=10):
+    """
+    Semantische Suche mit einfacher Textsuche als Fallback
 
-        if not query:
-            return jsonify({"error": "Suchanfrage ist erforderlich"}), 400
+    Returns:
+        tuple: (Antwort-Dict, HTTP-Status)
+    """
+    if not query:
+        return {"error": "Suchanfrage ist erforderlich"}, 400
 
+    try:
         search_engine = asi_system["search_engine"]
         results = search_engine.search_by_text(query, limit=limit)
 
@@ -297,14 +463,12 @@ def api_search():
                 }
             )
 
-        return jsonify(
-            {
-                "success": True,
-                "query": query,
-                "results": search_results,
-                "count": len(search_results),
-            }
-        )
+        return {
+            "success": True,
+            "query": query,
+            "results": search_results,
+            "count": len(search_results),
+        }, 200
 
     except Exception as e:
         print(f"Suchfehler: {e}")
@@ -352,24 +516,53 @@ def api_search():
             search_results.sort(key=lambda x: x["similarity"], reverse=True)
             search_results = search_results[:limit]
 
-            return jsonify(
-                {
-                    "success": True,
-                    "query": query,
-                    "results": search_results,
-                    "count": len(search_results),
-                    "fallback": True,
-                }
-            )
+            return {
+                "success": True,
+                "query": query,
+                "results": search_results,
+                "count": len(search_results),
+                "fallback": True,
+            }, 200
 
         except Exception as fallback_error:
-            return (
-                jsonify({"error": f"Fehler bei der Suche: {str(fallback_error)}"}),
-                500,
-            )
+            return {"error": f"Fehler bei der Suche: {str(fallback_error)}"}, 500
+
+
+@app.route("/api/search", methods=["GET"])
+def api_search():
+    """API-Endpoint für Suche"""
+    if not asi_system:
+        return jsonify({"error": "ASI System nicht verfügbar"}), 500
+
+    try:
+        query = request.args.get("q", "").strip()
+        limit = int(request.args.get("limit", 10))
+    except ValueError as e:
+        return jsonify({"error": f"Ungültige Parameter: {e}"}), 400
+
+    body, status = search_reflections(query, limit)
+    return jsonify(body), status
+
+
+def data_etag():
+    """
+    ETag aus dem Datenstand der lokalen Datenbank und dem Query-String
+
+    Returns:
+        Optional[str]: None wenn kein Datenstand verfügbar ist oder eine
+        Flash-Nachricht die Seite verändert
+    """
+    if not asi_system or session.get("_flashes"):
+        return None
+    try:
+        data_version = asi_system["local_db"].data_version
+    except Exception:
+        return None
+    return f"{request.path}?{request.query_string.decode('latin-1')}@{data_version}"
 
 
 @app.route("/reflections")
+@conditional(data_etag)
 def reflections():
     """Reflexions-Übersicht"""
     if not asi_system:
@@ -378,9 +571,13 @@ def reflections():
 
     try:
         local_db = asi_system["local_db"]
-        reflections = local_db.get_reflections(limit=50)
+        reflections, next_cursor = local_db.get_reflections_page(
+            limit=50, cursor=request.args.get("cursor")
+        )
 
-        return render_template("reflections.html", reflections=reflections)
+        return render_template(
+            "reflections.html", reflections=reflections, next_cursor=next_cursor
+        )
 
     except Exception as e:
         flash(f"Fehler beim Laden der Reflexionen: {str(e)}", "error")
@@ -575,9 +772,43 @@ def hrm_analytics():
         return jsonify({"error": f"Analytics-Fehler: {str(e)}"}), 500
 
 
+# Timeout je Backend-Probe in Sekunden
+BACKEND_PROBE_TIMEOUT = float(os.getenv("ASI_BACKEND_PROBE_TIMEOUT", "3"))
+
+
+def _probe_ipfs():
+    return asi_system["ipfs_client"].is_node_running()
+
+
+def _probe_arweave():
+    arweave_client = asi_system["arweave_client"]
+    return arweave_client.get_storage_info(timeout=BACKEND_PROBE_TIMEOUT)["status"]
+
+
+def _probe_blockchain():
+    return asi_system["smart_contract"].get_contract_stats().get("connected", False)
+
+
+# Backend-Zustand für /api/stats; wird im Hintergrund aktualisiert
+backend_prober = BackendProber(
+    {
+        "ipfs_running": _probe_ipfs,
+        "arweave_status": _probe_arweave,
+        "blockchain_connected": _probe_blockchain,
+    },
+    defaults={
+        "ipfs_running": False,
+        "arweave_status": "simulated",
+        "blockchain_connected": False,
+    },
+    interval=float(os.getenv("ASI_BACKEND_PROBE_INTERVAL", "10")),
+    timeout=BACKEND_PROBE_TIMEOUT,
+)
+
+
 @app.route("/api/stats")
 def api_stats():
-    """API-Endpoint für Statistiken"""
+    """API-Endpoint für Statistiken (Backend-Zustand aus dem Cache)"""
     if not asi_system:
         return jsonify({"error": "ASI System nicht verfügbar"}), 500
 
@@ -585,23 +816,8 @@ def api_stats():
         local_db = asi_system["local_db"]
         stats = local_db.get_statistics()
 
-        # IPFS-Status
-        ipfs_status = asi_system["ipfs_client"].is_node_running()
-
-        # Arweave-Status
-        arweave_info = asi_system["arweave_client"].get_storage_info()
-
-        # Smart Contract-Status
-        contract_stats = asi_system["smart_contract"].get_contract_stats()
-
         return jsonify(
-            {
-                "success": True,
-                "database": stats,
-                "ipfs_running": ipfs_status,
-                "arweave_status": arweave_info["status"],
-                "blockchain_connected": contract_stats.get("connected", False),
-            }
+            {"success": True, "database": stats, **backend_prober.snapshot()}
         )
 
     except Exception as e:
@@ -614,40 +830,105 @@ def settings():
     return render_template("settings.html")
 
 
+# Maximale Seitengröße des Exports; weitere Seiten über next_cursor
+EXPORT_PAGE_SIZE = 1000
+
+# Zeilen pro Datenbankabfrage beim Streaming-Export
+EXPORT_STREAM_BATCH = 500
+
+
+def _export_record(reflection):
+    """Export-Darstellung einer Reflexion"""
+    return {
+        "hash": reflection.hash,
+        "content": reflection.full_content,
+        "timestamp": reflection.timestamp.isoformat(),
+        "themes": reflection.themes,
+        "tags": reflection.tags,
+        "privacy_level": reflection.privacy_level,
+        "sentiment": reflection.sentiment,
+    }
+
+
+def _ndjson_lines(local_db, privacy_level=None):
+    """Eine JSON-Zeile pro Reflexion, batchweise gebündelt"""
+    batch = []
+    for reflection in local_db.iter_reflections(
+        batch_size=EXPORT_STREAM_BATCH, privacy_level=privacy_level
+    ):
+        batch.append(json.dumps(_export_record(reflection), ensure_ascii=False))
+        if len(batch) >= EXPORT_STREAM_BATCH:
+            yield ("\n".join(batch) + "\n").encode("utf-8")
+            batch = []
+    if batch:
+        yield ("\n".join(batch) + "\n").encode("utf-8")
+
+
+def _gzip_stream(chunks):
+    """Komprimiert einen Byte-Stream fortlaufend; jeder Chunk wird sofort gesendet"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_ndjson(local_db, privacy_level=None, compress=False):
+    """
+    Streamt den gesamten Bestand als NDJSON
+
+    Der Speicherbedarf bleibt unabhängig von der Anzahl der Reflexionen bei
+    einem Batch; die erste Zeile wird nach der ersten Abfrage gesendet.
+    """
+    body = _ndjson_lines(local_db, privacy_level)
+    headers = {
+        "Content-Disposition": 'attachment; filename="asi-export.ndjson"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        body = _gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, mimetype="application/x-ndjson", headers=headers)
+
+
 @app.route("/api/export")
+@conditional(data_etag)
 def api_export():
-    """API-Endpoint für Daten-Export"""
+    """API-Endpoint für Daten-Export (JSON seitenweise oder NDJSON-Stream)"""
     if not asi_system:
         return jsonify({"error": "ASI System nicht verfügbar"}), 500
 
+    if request.args.get("format") == "ndjson":
+        try:
+            local_db = asi_system["local_db"]
+        except Exception as e:
+            return jsonify({"error": f"Export-Fehler: {str(e)}"}), 500
+        compress = (
+            request.accept_encodings["gzip"] > 0 or request.args.get("gzip") == "1"
+        )
+        return export_ndjson(local_db, request.args.get("privacy_level"), compress)
+
     try:
+        limit = min(int(request.args.get("limit", EXPORT_PAGE_SIZE)), EXPORT_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError("limit muss positiv sein")
         local_db = asi_system["local_db"]
-        reflections = local_db.get_reflections(limit=1000)
+        reflections, next_cursor = local_db.get_reflections_page(
+            limit=limit, cursor=request.args.get("cursor"), include_content=True
+        )
 
         # Export-Daten vorbereiten
         export_data = {
             "export_timestamp": datetime.now().isoformat(),
             "version": "1.0",
             "total_reflections": len(reflections),
-            "reflections": [],
+            "next_cursor": next_cursor,
+            "reflections": [_export_record(reflection) for reflection in reflections],
         }
 
-        for reflection in reflections:
-            full_reflection = local_db.get_reflection_by_hash(reflection.hash)
-            export_data["reflections"].append(
-                {
-                    "hash": reflection.hash,
-                    "content": full_reflection["content"],
-                    "timestamp": reflection.timestamp.isoformat(),
-                    "themes": reflection.themes,
-                    "tags": reflection.tags,
-                    "privacy_level": reflection.privacy_level,
-                    "sentiment": reflection.sentiment,
-                }
-            )
-
         return jsonify(export_data)
 
+    except ValueError as e:
+        return jsonify({"error": f"Ungültige Parameter: {e}"}), 400
     except Exception as e:
         return jsonify({"error": f"Export-Fehler: {str(e)}"}), 500
 
@@ -743,6 +1024,13 @@ def api_cognitive_insights():
 
 
 if __name__ == "__main__":
+    if os.getenv("ASI_SERVER_MODE", "sync").lower() == "async":
+        # Asynchroner Betrieb der Reflexions-API (aiohttp)
+        from src.web.async_app import main as run_async_server
+
+        run_async_server()
+        sys.exit(0)
+
     print("Starte ASI Core Web-Interface...")
 
     # Erstelle Template-Verzeichnis falls nicht vorhanden
@@ -752,6 +1040,10 @@ if __name__ == "__main__":
     static_dir = Path(__file__).parent / "static"
     static_dir.mkdir(exist_ok=True)
 
+    # Komponenten (inkl. Upload-Worker) im Hintergrund laden, Server startet sofort
+    asi_system.warm_up()
+    backend_prober.start()
+
     # Flask App starten (Debug/Host via ENV konfigurierbar)
     debug_enabled = os.getenv("ASI_DEBUG", "true").lower() in {"1", "true", "yes"}
     host = os.getenv("ASI_HOST", "127.0.0.1" if not debug_enabled else "0.0.0.0")
@@ -0,0 +1,153 @@
+"""
+ASI Core - Async Web Server
+Asynchroner Betriebsmodus (aiohttp) für die Reflexions-API
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from aiohttp import web
+
+from src.web.app import asi_system as default_system
+from src.web.app import backend_prober as default_prober
+from src.web.app import create_reflection, request_metrics, search_reflections
+from src.web.backend_health import BackendProber
+
+# Gemeinsame Ressourcen der Anwendung
+SYSTEM = web.AppKey("system", object)
+CPU_EXECUTOR = web.AppKey("cpu_executor", ThreadPoolExecutor)
+PROBER = web.AppKey("prober", BackendProber)
+
+HEALTH_COMPONENTS = (
+    "input_handler",
+    "processor",
+    "output_generator",
+    "local_db",
+    "search_engine",
+)
+
+
+async def run_cpu(request, fn, *args):
+    """Führt CPU-lastige Arbeit (Verarbeitung, Suche, SQLite) im Executor aus"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app[CPU_EXECUTOR], fn, *args)
+
+
+async def health(request):
+    """Health Check Endpoint"""
+    system = request.app[SYSTEM]
+    return web.json_response(
+        {
+            "status": "ok",
+            "server": "async",
+            "timestamp": datetime.now().isoformat(),
+            "asi_system_loaded": system is not None,
+            "components": {name: system.status(name) for name in HEALTH_COMPONENTS},
+        }
+    )
+
+
+async def reflect(request):
+    """Neue Reflexion; Verarbeitung im Executor, Uploads nur eingereiht"""
+    try:
+        data = await request.json()
+    except ValueError:
+        return web.json_response({"error": "Ungültiges JSON"}, status=400)
+
+    try:
+        body, status = await run_cpu(request, create_reflection, data)
+    except Exception as e:
+        return web.json_response(
+            {"error": f"Fehler beim Verarbeiten: {str(e)}"}, status=500
+        )
+    return web.json_response(body, status=status)
+
+
+async def search(request):
+    """Suche; Embedding-Berechnung im Executor"""
+    query = request.query.get("q", "").strip()
+    try:
+        limit = int(request.query.get("limit", 10))
+    except ValueError as e:
+        return web.json_response({"error": f"Ungültige Parameter: {e}"}, status=400)
+
+    body, status = await run_cpu(request, search_reflections, query, limit)
+    return web.json_response(body, status=status)
+
+
+async def stats(request):
+    """Statistiken; Backend-Zustand aus dem Cache des Probers"""
+    app = request.app
+    try:
+        database = await run_cpu(
+            request, lambda: app[SYSTEM]["local_db"].get_statistics()
+        )
+    except Exception as e:
+        return web.json_response({"error": f"Statistik-Fehler: {str(e)}"}, status=500)
+
+    return web.json_response(
+        {"success": True, "database": database, **app[PROBER].snapshot()}
+    )
+
+
+async def _start_prober(app):
+    app[PROBER].start()
+
+
+async def _close_resources(app):
+    app[PROBER].stop()
+    app[CPU_EXECUTOR].shutdown(wait=False)
+
+
+def create_async_app(system=None, cpu_workers=None, prober=None, metrics=None):
+    """
+    Erstellt die asynchrone Anwendung
+
+    CPU-lastige Arbeit und SQLite laufen in einem begrenzten Thread-Pool,
+    der Zustand von IPFS, Arweave und Blockchain kommt wie in der Flask-App
+    aus dem Hintergrund-Prober. Wartende Anfragen belegen damit keinen
+    Thread, auch wenn ein Backend langsam ist.
+
+    Die Admin-API (/api/admin) gibt es nur im synchronen Betrieb.
+
+    Args:
+        system: ASI-Komponenten (default: die gemeinsame Instanz der Flask-App)
+        cpu_workers: Threads für Verarbeitung und Suche (default: CPU-Anzahl)
+        prober: Backend-Prober (default: gemeinsam mit der Flask-App)
+        metrics: Request-Metriken (default: gemeinsam mit der Flask-App)
+    """
+    metrics = metrics if metrics is not None else request_metrics
+    app = web.Application(middlewares=[metrics.aiohttp_middleware()])
+    app[SYSTEM] = system if system is not None else default_system
+    app[CPU_EXECUTOR] = ThreadPoolExecutor(
+        max_workers=cpu_workers or os.cpu_count() or 4, thread_name_prefix="asi-cpu"
+    )
+    app[PROBER] = prober if prober is not None else default_prober
+
+    app.on_startup.append(_start_prober)
+    app.on_cleanup.append(_close_resources)
+
+    app.router.add_get("/api/health", health)
+    app.router.add_post("/api/reflect", reflect)
+    app.router.add_get("/api/search", search)
+    app.router.add_get("/api/stats", stats)
+    app.router.add_get("/metrics", metrics.aiohttp_handler())
+    return app
+
+
+def main():
+    """Startet den asynchronen Server (ASI_HOST, ASI_PORT)"""
+    debug_enabled = os.getenv("ASI_DEBUG", "true").lower() in {"1", "true", "yes"}
+    host = os.getenv("ASI_HOST", "127.0.0.1" if not debug_enabled else "0.0.0.0")
+    port = int(os.getenv("ASI_PORT", "8000"))
+
+    app = create_async_app()
+    app[SYSTEM].warm_up()
+    print("Starte ASI Core Web-Interface (async)...")
+    web.run_app(app, host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
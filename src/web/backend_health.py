@@ -0,0 +1,150 @@
+"""
+ASI Core - Backend Health
+Zwischengespeicherter Zustand externer Backends (IPFS, Arweave, Blockchain)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+
+class BackendProber:
+    """
+    Prüft externe Backends im Hintergrund und hält das Ergebnis vor.
+
+    Alle Probes einer Runde laufen gleichzeitig; jede hat ein eigenes
+    Timeout, ein hängendes Backend verzögert die anderen also nicht.
+    Endpunkte lesen nur den letzten Stand und antworten damit in konstanter
+    Zeit, unabhängig davon, wie langsam ein Backend gerade ist. Ergebnisse,
+    die älter als ``ttl`` sind, gelten als unbekannt und werden durch den
+    Default ersetzt.
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Callable[[], Any]],
+        defaults: Optional[Dict[str, Any]] = None,
+        interval: float = 10.0,
+        timeout: float = 3.0,
+        ttl: float = 30.0,
+    ):
+        """
+        Args:
+            probes: Name -> Funktion, die den Zustand des Backends liefert
+            defaults: Name -> Wert bei Fehler, Timeout oder veraltetem Stand
+            interval: Sekunden zwischen zwei Runden
+            timeout: Maximale Dauer einer Probe in Sekunden
+            ttl: Maximales Alter eines Ergebnisses in Sekunden
+        """
+        self.probes = dict(probes)
+        self.defaults = dict(defaults or {})
+        self.interval = interval
+        self.timeout = timeout
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.probes)), thread_name_prefix="asi-probe"
+        )
+        self._pending = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def probe(self) -> Dict[str, Any]:
+        """Führt eine Runde aus und gibt die aktuellen Werte zurück"""
+        futures = {}
+        for name, probe in self.probes.items():
+            pending = self._pending.get(name)
+            if pending is not None and not pending.done():
+                # Die vorige Probe hängt noch; keine weitere starten
+                continue
+            futures[name] = self._pending[name] = self._executor.submit(probe)
+
+        wait(futures.values(), timeout=self.timeout)
+        now = time.monotonic()
+        for name, future in futures.items():
+            if not future.done():
+                result = {
+                    "value": self.defaults.get(name),
+                    "ok": False,
+                    "error": "timeout",
+                }
+            elif future.exception() is not None:
+                result = {
+                    "value": self.defaults.get(name),
+                    "ok": False,
+                    "error": str(future.exception()),
+                }
+            else:
+                result = {"value": future.result(), "ok": True, "error": None}
+            result["checked_at"] = now
+            self._results[name] = result
+        return self.snapshot(start=False)
+
+    def start(self):
+        """Startet den Hintergrund-Thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="asi-backend-prober", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Beendet den Hintergrund-Thread"""
+        self._stopped.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.probe()
+            except Exception as e:
+                print(f"Backend-Prober Fehler: {e}")
+            if self._stopped.wait(self.interval):
+                return
+
+    def _fresh(self, name: str, now: float) -> Optional[Dict[str, Any]]:
+        result = self._results.get(name)
+        if result is None or now - result["checked_at"] > self.ttl:
+            return None
+        return result
+
+    def snapshot(self, start: bool = True) -> Dict[str, Any]:
+        """
+        Liefert den zuletzt ermittelten Wert je Backend, ohne zu blockieren
+
+        Vor der ersten Runde und bei veralteten Ergebnissen gilt der Default.
+        """
+        if start:
+            self.start()
+        now = time.monotonic()
+        values = {}
+        for name in self.probes:
+            result = self._fresh(name, now)
+            values[name] = (
+                result["value"] if result is not None else self.defaults.get(name)
+            )
+        return values
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Zustand je Backend mit Alter des Ergebnisses (startet keine Probes)"""
+        now = time.monotonic()
+        status = {}
+        for name in self.probes:
+            result = self._results.get(name)
+            if result is None:
+                status[name] = {"state": "pending", "age": None, "error": None}
+                continue
+            if self._fresh(name, now) is None:
+                state = "stale"
+            else:
+                state = "ok" if result["ok"] else "error"
+            status[name] = {
+                "state": state,
+                "age": round(now - result["checked_at"], 1),
+                "error": result["error"],
+            }
+        return status
@@ -0,0 +1,210 @@
+"""
+ASI Core - HTTP Caching
+Bedingte GET-Anfragen (ETag/Last-Modified) und ausgehandelte Kompression
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Kleinere Antworten passen ohnehin in ein TCP-Segment
+MIN_COMPRESS_SIZE = 1024
+
+# Größere Antworten (z.B. Downloads) werden nicht im Speicher komprimiert
+MAX_COMPRESS_SIZE = 8 * 1024 * 1024
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    """Textbasierte Formate lohnen die Kompression, Bilder und Archive nicht"""
+    if not mimetype:
+        return False
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """
+    Wählt die Kodierung anhand von Accept-Encoding
+
+    Args:
+        accept_encodings: Werkzeug-Accept-Objekt der Anfrage
+
+    Returns:
+        Optional[str]: 'br', 'gzip' oder None
+    """
+    candidates = [("gzip", accept_encodings["gzip"])]
+    if BROTLI_AVAILABLE:
+        # Bei gleicher Gewichtung gewinnt Brotli
+        candidates.insert(0, ("br", accept_encodings["br"]))
+    encoding, quality = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if quality > 0 else None
+
+
+def conditional(etag_func: Callable[[], Optional[str]]):
+    """
+    Decorator: beantwortet If-None-Match, bevor die View ausgeführt wird
+
+    ``etag_func`` bildet das ETag aus dem Datenstand (z.B.
+    ``LocalDatabase.data_version``), ohne die Antwort zu erzeugen. Passt es
+    zum ETag des Clients, entfallen Datenbankabfragen und Serialisierung.
+    Liefert ``etag_func`` None, läuft die View unverändert.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import make_response, request
+
+            etag = etag_func()
+            if etag is not None:
+                etag = hashlib.sha1(etag.encode("utf-8")).hexdigest()
+                if request.if_none_match.contains_weak(etag):
+                    response = make_response("", 304)
+                    response.set_etag(etag, weak=True)
+                    return response
+
+            response = make_response(view(*args, **kwargs))
+            if etag is not None and response.status_code == 200:
+                response.set_etag(etag, weak=True)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class HTTPCache:
+    """
+    ETags und Kompression für alle GET-Antworten einer Flask-App.
+
+    Antworten ohne eigenes ETag erhalten eines aus dem Inhalt; stimmt es
+    mit If-None-Match überein, wird 304 ohne Body gesendet. Textantworten
+    ab ``min_size`` Bytes werden mit Brotli (falls installiert) oder gzip
+    komprimiert. Komprimierte Bodies werden pro ETag zwischengespeichert,
+    sodass unveränderte Antworten (statische Dateien, gleichbleibende
+    Statistiken) nur einmal komprimiert werden.
+    """
+
+    def __init__(
+        self,
+        min_size: int = MIN_COMPRESS_SIZE,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_entries: int = 256,
+        exempt_paths: Tuple[str, ...] = (),
+    ):
+        """
+        Args:
+            min_size: Mindestgröße für Kompression in Bytes
+            gzip_level: gzip-Stufe (1-9)
+            brotli_quality: Brotli-Qualität (0-11)
+            cache_entries: Anzahl zwischengespeicherter komprimierter Bodies
+            exempt_paths: Pfad-Präfixe, die unverändert durchgereicht werden
+                (z.B. ein Proxy, dessen Upstream selbst komprimiert)
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        self.exempt_paths = tuple(exempt_paths)
+        self._compressed: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Registriert die Verarbeitung als after_request-Hook"""
+        app.after_request(self.process_response)
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """Komprimiert einen Body mit der gewählten Kodierung"""
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def _compressed_body(
+        self, etag: str, encoding: str, read: Callable[[], bytes]
+    ) -> bytes:
+        """Liefert den komprimierten Body aus dem Cache oder komprimiert ihn"""
+        key = (etag, encoding)
+        with self._lock:
+            body = self._compressed.get(key)
+            if body is not None:
+                self._compressed.move_to_end(key)
+                return body
+
+        body = self.compress(read(), encoding)
+        with self._lock:
+            self._compressed[key] = body
+            while len(self._compressed) > self.cache_entries:
+                self._compressed.popitem(last=False)
+        return body
+
+    def process_response(self, response):
+        """Setzt ETag, beantwortet bedingte Anfragen und komprimiert"""
+        from flask import request
+
+        if request.method not in ("GET", "HEAD") or response.status_code != 200:
+            return response
+        if request.path.startswith(self.exempt_paths):
+            return response
+        if "Content-Encoding" in response.headers:
+            return response
+        # Streams (z.B. NDJSON-Export) bleiben unberührt; Dateien aus
+        # send_from_directory haben bereits ETag und Last-Modified
+        if response.is_streamed and not response.direct_passthrough:
+            return response
+
+        compressible = is_compressible(response.mimetype)
+        if compressible:
+            response.vary.add("Accept-Encoding")
+
+        if not response.direct_passthrough:
+            if "ETag" not in response.headers:
+                response.add_etag(weak=True)
+            response.make_conditional(request)
+            if response.status_code != 200:
+                return response
+
+        length = response.content_length
+        if not compressible or length is None:
+            return response
+        if length < self.min_size or length > MAX_COMPRESS_SIZE:
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        etag, _ = response.get_etag()
+        response.direct_passthrough = False
+        if etag:
+            # Bei einem Treffer wird der ursprüngliche Body nicht gelesen
+            body = self._compressed_body(etag, encoding, response.get_data)
+        else:
+            body = self.compress(response.get_data(), encoding)
+        if len(body) >= length:
+            return response
+
+        response.close()
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            # Gleicher Inhalt, andere Bytes: nur noch schwach vergleichbar
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,213 @@
+"""
+ASI Core - Request Metrics
+Latenz-Histogramme, Zähler und In-Flight-Gauges pro Route im Prometheus-Textformat
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Tuple
+
+# Standard-Buckets von Prometheus-Clients (Sekunden)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _RouteStats:
+    """Messwerte einer Route (Methode + Routen-Muster)"""
+
+    __slots__ = ("bucket_counts", "sum", "count", "errors", "in_flight", "statuses")
+
+    def __init__(self, bucket_count: int):
+        # Ein Zähler pro Bucket plus +Inf; kumuliert wird erst beim Export
+        self.bucket_counts = [0] * (bucket_count + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.statuses: Dict[int, int] = {}
+
+
+class RequestMetrics:
+    """
+    Sammelt Request-Metriken im Speicher.
+
+    Routen werden über ihr Muster (z.B. ``/reflection/<hash_id>``)
+    gekennzeichnet, damit die Anzahl der Zeitreihen begrenzt bleibt. Pro
+    Request fallen nur ein Lock und einige Additionen an; Summen und
+    kumulierte Buckets werden erst beim Abruf von ``/metrics`` berechnet.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix: str = "asi_http"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, method: str, route: str) -> _RouteStats:
+        key = (method, route)
+        stats = self._routes.get(key)
+        if stats is None:
+            stats = self._routes.setdefault(key, _RouteStats(len(self.buckets)))
+        return stats
+
+    def start(self, method: str, route: str) -> float:
+        """Markiert den Beginn eines Requests und liefert den Startzeitpunkt"""
+        with self._lock:
+            self._stats(method, route).in_flight += 1
+        return time.perf_counter()
+
+    def finish(self, method: str, route: str, status: int, started: float):
+        """Verbucht Dauer und Status eines abgeschlossenen Requests"""
+        duration = time.perf_counter() - started
+        index = bisect_left(self.buckets, duration)
+        with self._lock:
+            stats = self._stats(method, route)
+            stats.in_flight -= 1
+            stats.bucket_counts[index] += 1
+            stats.sum += duration
+            stats.count += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if status >= 500:
+                stats.errors += 1
+
+    def render(self) -> str:
+        """Exportiert alle Metriken im Prometheus-Textformat"""
+        with self._lock:
+            snapshot = [
+                (
+                    method,
+                    route,
+                    list(s.bucket_counts),
+                    s.sum,
+                    s.count,
+                    s.errors,
+                    s.in_flight,
+                    dict(s.statuses),
+                )
+                for (method, route), s in sorted(self._routes.items())
+            ]
+
+        p = self.prefix
+        duration, requests, errors, in_flight = [], [], [], []
+        for (
+            method,
+            route,
+            bucket_counts,
+            total,
+            count,
+            error_count,
+            active,
+            statuses,
+        ) in snapshot:
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(
+                self.buckets + (float("inf"),), bucket_counts
+            ):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket = f'{labels},le="{le}"'
+                duration.append(
+                    f"{p}_request_duration_seconds_bucket{{{bucket}}} {cumulative}"
+                )
+            duration.append(f"{p}_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            duration.append(f"{p}_request_duration_seconds_count{{{labels}}} {count}")
+            for status, status_count in sorted(statuses.items()):
+                requests.append(
+                    f'{p}_requests_total{{{labels},status="{status}"}} {status_count}'
+                )
+            errors.append(f"{p}_request_errors_total{{{labels}}} {error_count}")
+            in_flight.append(f"{p}_requests_in_flight{{{labels}}} {active}")
+
+        lines = [
+            f"# HELP {p}_request_duration_seconds Dauer der Requests in Sekunden",
+            f"# TYPE {p}_request_duration_seconds histogram",
+            *duration,
+            f"# HELP {p}_requests_total Anzahl Requests nach Status",
+            f"# TYPE {p}_requests_total counter",
+            *requests,
+            f"# HELP {p}_request_errors_total Anzahl Requests mit Status >= 500",
+            f"# TYPE {p}_request_errors_total counter",
+            *errors,
+            f"# HELP {p}_requests_in_flight Aktuell laufende Requests",
+            f"# TYPE {p}_requests_in_flight gauge",
+            *in_flight,
+        ]
+        return "\n".join(lines) + "\n"
+
+    # ------------------------------------------------------------------
+    # Integration
+    # ------------------------------------------------------------------
+
+    def init_app(self, app, endpoint: str = "/metrics"):
+        """Registriert die Messung als Flask-Middleware und den Scrape-Endpunkt"""
+        from flask import Response, g, request
+
+        def route_of():
+            rule = request.url_rule
+            return rule.rule if rule is not None else "unmatched"
+
+        @app.before_request
+        def _metrics_start():
+            g._metrics = (request.method, route_of())
+            g._metrics_started = self.start(*g._metrics)
+            g._metrics_status = 500
+
+        @app.after_request
+        def _metrics_status(response):
+            g._metrics_status = response.status_code
+            return response
+
+        @app.teardown_request
+        def _metrics_finish(exc):
+            labels = g.pop("_metrics", None)
+            if labels is not None:
+                self.finish(
+                    *labels,
+                    500 if exc is not None else g._metrics_status,
+                    g._metrics_started,
+                )
+
+        @app.route(endpoint, endpoint="metrics")
+        def _metrics():
+            return Response(self.render(), content_type=CONTENT_TYPE)
+
+    def aiohttp_middleware(self):
+        """Middleware für den asynchronen Server (aiohttp)"""
+        from aiohttp import web
+
+        @web.middleware
+        async def middleware(request, handler):
+            resource = request.match_info.route.resource
+            route = resource.canonical if resource is not None else "unmatched"
+            started = self.start(request.method, route)
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status
+                return response
+            except web.HTTPException as e:
+                status = e.status
+                raise
+            finally:
+                self.finish(request.method, route, status, started)
+
+        return middleware
+
+    def aiohttp_handler(self):
+        """Scrape-Endpunkt für den asynchronen Server"""
+        from aiohttp import web
+
+        async def handler(request):
+            return web.Response(
+                text=self.render(), content_type="text/plain", charset="utf-8"
+            )
+
+        return handler
+
+
+def _escape(value: str) -> str:
+    """Escaping für Label-Werte"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -9,10 +9,12 @@ import sys
 import json
 import webbrowser
 from pathlib import Path
-from flask import Flask, render_template_string, send_from_directory, jsonify
+from flask import Flask, Response, render_template_string, request, send_from_directory, jsonify
 import threading
 import time
 
+from src.web.http_cache import HTTPCache
+
 # PWA Template
 PWA_TEMPLATE = """
 <!DOCTYPE html>
@@ -347,11 +349,96 @@ PWA_TEMPLATE = """
 </html>
 """
 
+# Hop-by-hop Header gelten nur für eine Verbindung und werden nicht weitergereicht
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'trailers', 'transfer-encoding', 'upgrade',
+}
+PROXY_METHODS = ['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
+PROXY_CHUNK_SIZE = 64 * 1024
+
+
+class _RequestBody:
+    """Request-Body mit bekannter Länge, damit requests ihn ohne Chunked-Encoding streamt"""
+
+    def __init__(self, stream, length):
+        self._stream = stream
+        self.len = length
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+
 class PWAServer:
-    def __init__(self, port=8000):
+    def __init__(self, port=8000, api_url=None, pool_size=32, proxy_timeout=30):
         self.app = Flask(__name__)
         self.port = port
+        self.api_url = (api_url or os.getenv('ASI_API_URL', 'http://localhost:5000')).rstrip('/')
+        self.proxy_timeout = proxy_timeout
+        self.session = self._create_session(pool_size)
+        # Statische Dateien mit ETag und Kompression; /api komprimiert der Upstream selbst
+        self.http_cache = HTTPCache(exempt_paths=('/api/',))
+        self.http_cache.init_app(self.app)
         self.setup_routes()
+
+    @staticmethod
+    def _create_session(pool_size):
+        """Keep-Alive-Session mit Verbindungspool für den API-Proxy"""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        # Umgebungs-Proxies gelten nicht für die lokale API
+        session.trust_env = False
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def proxy(self, path):
+        """Leitet eine Anfrage samt Methode, Headern und Body an die API weiter"""
+        import requests
+
+        headers = {
+            name: value for name, value in request.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() not in ('host', 'content-length')
+        }
+        try:
+            upstream = self.session.request(
+                request.method,
+                f'{self.api_url}/api/{path}',
+                params=request.args.to_dict(flat=False),
+                headers=headers,
+                # Request-Body wird gestreamt statt vollständig gepuffert
+                data=_RequestBody(request.stream, request.content_length) if request.content_length else None,
+                stream=True,
+                allow_redirects=False,
+                timeout=self.proxy_timeout,
+            )
+        except requests.RequestException:
+            return jsonify({"error": "API not available"}), 503
+
+        def body():
+            completed = False
+            try:
+                # Rohdaten (ggf. komprimiert) in Blöcken durchreichen
+                for chunk in upstream.raw.stream(PROXY_CHUNK_SIZE, decode_content=False):
+                    yield chunk
+                completed = True
+            finally:
+                if completed:
+                    # Vollständig gelesen: Verbindung zurück in den Pool geben
+                    upstream.raw.release_conn()
+                else:
+                    # Abgebrochen (z.B. Client getrennt): Verbindung verwerfen
+                    upstream.close()
+
+        response_headers = [
+            (name, value) for name, value in upstream.raw.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        return Response(body(), status=upstream.status_code, headers=response_headers,
+                        direct_passthrough=True)
     
     def setup_routes(self):
         @self.app.route('/')
@@ -410,14 +497,9 @@ self.addEventListener('activate', (event) => {
             return "<h1>Offline</h1><p>Sie sind offline.</p>"
         
         # Proxy routes to main ASI-Core API
-        @self.app.route('/api/<path:path>')
+        @self.app.route('/api/<path:path>', methods=PROXY_METHODS)
         def proxy_api(path):
-            import requests
-            try:
-                resp = requests.get(f'http://localhost:5000/api/{path}')
-                return resp.content, resp.status_code
-            except:
-                return jsonify({"error": "API not available"}), 503
+            return self.proxy(path)
         
         # Static file serving
         @self.app.route('/<path:filename>')
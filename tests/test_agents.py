@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Tests für die Agent-Verwaltung des ASI-Systems
+"""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from asi_core.agent_manager import AgentProfile, ASIAgentManager
+from asi_core.agent_store import AgentStore
+
+
+class TestAgentStore:
+    """Tests für die Append-only-Persistenz der Agent-Profile"""
+
+    def test_actions_append_deltas_instead_of_rewriting(self, tmp_path):
+        """Aktionen hängen nur ein Ereignis an, agents.json bleibt unverändert"""
+        manager = ASIAgentManager(data_dir=str(tmp_path))
+        agent_id = manager.register_agent("A", ["analysis"])
+        manager.save()
+        snapshot = (tmp_path / "agents.json").read_text()
+
+        for confidence in (0.5, 1.0):
+            manager.record_agent_action(agent_id, "analyze", {}, confidence=confidence)
+
+        assert (tmp_path / "agents.json").read_text() == snapshot
+        events = [
+            json.loads(line)
+            for line in (tmp_path / "agents.json.log").read_text().splitlines()
+        ]
+        assert [event["op"] for event in events] == ["action", "action"]
+
+        reloaded = ASIAgentManager(data_dir=str(tmp_path))
+        agent = reloaded.get_agent(agent_id)
+        assert agent.total_actions == 2
+        assert agent.avg_confidence == 0.75
+
+    def test_snapshot_compacts_log(self, tmp_path):
+        """Nach snapshot_interval Ereignissen wird ein Snapshot geschrieben"""
+        manager = ASIAgentManager(data_dir=str(tmp_path), snapshot_interval=3)
+        keep = manager.register_agent("A", ["analysis"])
+        drop = manager.register_agent("B", ["analysis"])
+        manager._set_last_active(manager.agents[drop], 946684800.0)  # 2000-01-01
+        assert manager.cleanup_inactive_agents() == 1
+
+        assert (tmp_path / "agents.json.log").read_text() == ""
+        assert list(json.loads((tmp_path / "agents.json").read_text())) == [keep]
+
+        manager.record_agent_action(keep, "analyze", {}, confidence=0.9)
+        with open(tmp_path / "agents.json.log", "a") as f:
+            f.write('{"op": "action", "agent_')  # abgeschnittene Zeile nach Absturz
+
+        reloaded = ASIAgentManager(data_dir=str(tmp_path))
+        assert list(reloaded.agents) == [keep]
+        assert reloaded.get_agent(keep).total_actions == 1
+
+        reloaded.record_agent_action(keep, "analyze", {}, confidence=0.9)
+        reloaded.close()
+        assert (
+            ASIAgentManager(data_dir=str(tmp_path)).get_agent(keep).total_actions == 2
+        )
+
+    def test_read_includes_events_since_snapshot(self, tmp_path):
+        """Leser außerhalb des Managers sehen auch noch nicht übernommene Ereignisse"""
+        manager = ASIAgentManager(data_dir=str(tmp_path))
+        first = manager.register_agent("A", ["analysis"])
+        manager.save()
+        second = manager.register_agent("B", ["analysis"])
+        manager.record_agent_action(first, "analyze", {}, confidence=0.5)
+
+        assert list(json.loads((tmp_path / "agents.json").read_text())) == [first]
+        agents = AgentStore(str(tmp_path)).read()
+        assert sorted(agents) == sorted([first, second])
+        assert agents[first]["total_actions"] == 1
+
+
+class TestAgentStatistics:
+    """Tests für kompakte Profile und laufende Statistiken"""
+
+    def test_profile_is_slotted_and_migrates_iso_timestamps(self):
+        """Ältere Profile mit ISO-Zeitstempeln werden in Epoch-Sekunden umgewandelt"""
+        profile = AgentProfile(
+            agent_id="a",
+            name="A",
+            version="1.0.0",
+            capabilities=[],
+            learning_goals=[],
+            collaboration_preferences={},
+            created_at="2000-01-01T00:00:00Z",
+            last_active="",
+        )
+        assert profile.created_at == 946684800.0
+        assert profile.last_active == profile.created_at
+        if hasattr(AgentProfile, "__slots__"):
+            with pytest.raises(AttributeError):
+                profile.unknown = 1
+
+    def test_running_aggregates_match_profiles(self, tmp_path):
+        """Statistiken sind inkrementell und überstehen Cleanup und Neustart"""
+        manager = ASIAgentManager(data_dir=str(tmp_path))
+        a = manager.register_agent("A", ["analysis", "reflection"])
+        b = manager.register_agent("B", ["analysis"])
+        old = manager.register_agent("C", ["legacy"])
+        manager.record_agent_action(a, "analyze", {}, confidence=0.5)
+        manager.record_agent_action(b, "analyze", {}, confidence=1.0)
+
+        manager._set_last_active(manager.agents[old], time.time() - 40 * 24 * 3600)
+
+        stats = manager.get_agent_statistics()
+        assert stats["total_agents"] == 3 and stats["active_agents"] == 2
+        assert stats["total_actions"] == 2 and stats["avg_confidence"] == 0.75
+        assert stats["most_common_capabilities"][0] == ("analysis", 2)
+
+        assert manager.cleanup_inactive_agents() == 1
+        stats = manager.get_agent_statistics()
+        assert stats["total_agents"] == 2
+        assert ("legacy", 1) not in stats["most_common_capabilities"]
+        manager.close()
+
+        reloaded = ASIAgentManager(data_dir=str(tmp_path)).get_agent_statistics()
+        assert {
+            k: reloaded[k] for k in ("total_agents", "active_agents", "total_actions")
+        } == {"total_agents": 2, "active_agents": 2, "total_actions": 2}
+
+
+class TestAgentListing:
+    """Tests für gefilterte, paginierte Agent-Listen"""
+
+    def test_filtered_pages_in_recency_order(self, tmp_path):
+        """Listen kommen aus Fähigkeits-Index und Aktivitätsreihenfolge"""
+        manager = ASIAgentManager(data_dir=str(tmp_path))
+        ids = [
+            manager.register_agent(
+                f"agent-{i}", ["analysis"] if i % 2 else ["reflection"]
+            )
+            for i in range(10)
+        ]
+        manager.record_agent_action(ids[0], "reflect", {}, confidence=0.9)
+
+        newest = manager.list_agents(limit=3)
+        assert [agent.agent_id for agent in newest] == [ids[0], ids[9], ids[8]]
+
+        reflection = [agent.agent_id for agent in manager.list_agents(["reflection"])]
+        assert reflection == [ids[0], ids[8], ids[6], ids[4], ids[2]]
+        page = manager.list_agents(["reflection"], limit=2, offset=1)
+        assert [agent.agent_id for agent in page] == reflection[1:3]
+        rare = manager.list_agents(["analysis", "unknown"], limit=1, offset=4)
+        assert [agent.agent_id for agent in rare] == [ids[1]]
+        assert manager.list_agents(["unknown"]) == []
+
+        manager._set_last_active(manager.agents[ids[5]], 946684800.0)
+        assert manager.list_agents()[-1].agent_id == ids[5]
+        assert manager.cleanup_inactive_agents() == 1
+        assert ids[5] not in {
+            agent.agent_id for agent in manager.list_agents(["analysis"])
+        }
+
+        reloaded = ASIAgentManager(data_dir=str(tmp_path))
+        assert [
+            agent.agent_id for agent in reloaded.list_agents(["reflection"])
+        ] == reflection
+
+
+class TestCollaborations:
+    """Tests für persistente, parallel ausgeführte Kollaborationen"""
+
+    def test_parallel_run_with_timeout_and_partial_results(self, tmp_path):
+        """Agenten arbeiten parallel; langsame Agenten fehlen im Teilergebnis"""
+        manager = ASIAgentManager(data_dir=str(tmp_path))
+        fast = [manager.register_agent(f"fast-{i}", ["analysis"]) for i in range(3)]
+        slow = manager.register_agent("slow", ["analysis"])
+        broken = manager.register_agent("broken", ["analysis"])
+        collab_id = manager.initiate_collaboration(
+            fast + [slow, broken], "review", ["goal"]
+        )
+        release = threading.Event()
+
+        def work(agent):
+            if agent.agent_id == slow:
+                release.wait(5)
+            elif agent.agent_id == broken:
+                raise RuntimeError("kaputt")
+            else:
+                time.sleep(0.2)
+            return agent.name
+
+        seen = []
+        started = time.monotonic()
+        result = manager.run_collaboration(
+            collab_id,
+            work,
+            timeout=0.6,
+            on_result=lambda agent_id, value: seen.append(agent_id),
+        )
+
+        assert time.monotonic() - started < 0.8
+        assert result["status"] == "partial"
+        assert sorted(result["results"]) == sorted(fast) and sorted(seen) == sorted(
+            fast
+        )
+        assert result["errors"] == {broken: "kaputt"}
+        assert result["missing"] == [slow]
+        assert collab_id not in manager.active_collaborations
+
+        release.set()
+        time.sleep(0.1)
+        manager.close()
+
+        reloaded = ASIAgentManager(data_dir=str(tmp_path))
+        collaboration = reloaded.collaborations.get(collab_id)
+        assert collaboration["status"] == "partial"
+        late = [action for action in collaboration["actions"] if action["data"]["late"]]
+        assert [action["agent_id"] for action in late] == [slow]
+        assert len(collaboration["actions"]) == 5
+        reloaded.close()
+
+    def test_chain_registration_does_not_block(self, tmp_path):
+        """Die On-Chain-Registrierung läuft im Hintergrund"""
+        client = MagicMock()
+        client.is_connected.return_value = True
+        registered = threading.Event()
+
+        def register_agent_collaboration(**kwargs):
+            registered.wait(5)
+            return "0xcollab"
+
+        manager = ASIAgentManager(data_dir=str(tmp_path), blockchain_client=client)
+        a = manager.register_agent("A", ["analysis"])
+        b = manager.register_agent("B", ["analysis"])
+        client.register_agent_collaboration.side_effect = register_agent_collaboration
+
+        collab_id = manager.initiate_collaboration([a, b], "review", ["goal"])
+        assert collab_id in manager.active_collaborations
+        assert "blockchain_tx" not in manager.collaborations.get(collab_id)
+
+        registered.set()
+        for _ in range(50):
+            if manager.collaborations.get(collab_id).get("blockchain_tx"):
+                break
+            time.sleep(0.02)
+        assert manager.collaborations.get(collab_id)["blockchain_tx"] == "0xcollab"
+        manager.close()
+
+    def test_hung_agents_do_not_starve_pool(self, tmp_path):
+        """Hängende Agenten blockieren weder Kollaborationen noch Registrierung"""
+        manager = ASIAgentManager(data_dir=str(tmp_path), collaboration_workers=2)
+        agents = [manager.register_agent(f"A{i}", ["analysis"]) for i in range(4)]
+        release = threading.Event()
+
+        hung_id = manager.initiate_collaboration(agents, "review", ["goal"])
+        result = manager.run_collaboration(
+            hung_id, lambda agent: release.wait(5), timeout=0.1
+        )
+        assert result["status"] == "failed" and len(result["missing"]) == 4
+
+        # Nie gestartete Arbeit wurde abgebrochen und protokolliert
+        actions = manager.collaborations.get(hung_id)["actions"]
+        assert sorted(action["type"] for action in actions) == [
+            "cancelled",
+            "cancelled",
+        ]
+
+        registered = manager.collaborations.submit(lambda: "0xcollab")
+        assert registered.result(timeout=1) == "0xcollab"
+
+        collab_id = manager.initiate_collaboration(agents[:2], "review", ["goal"])
+        result = manager.run_collaboration(
+            collab_id, lambda agent: agent.name, timeout=1
+        )
+        assert result["status"] == "completed"
+
+        release.set()
+        manager.close()
+
+
+class TestAgentConcurrency:
+    """Tests für gleichzeitige Zugriffe auf den Agent-Manager"""
+
+    def test_concurrent_actions_keep_aggregates_consistent(self, tmp_path):
+        """Parallele Aktionen, Registrierungen und Abfragen verlieren keine Updates"""
+        manager = ASIAgentManager(data_dir=str(tmp_path), snapshot_interval=50)
+        agents = [manager.register_agent(f"A{i}", ["analysis"]) for i in range(8)]
+        errors = []
+
+        def act(agent_id):
+            try:
+                for _ in range(100):
+                    manager.record_agent_action(agent_id, "analyze", {}, confidence=0.5)
+                    manager.list_agents(["analysis"], limit=3)
+                    manager.get_agent_statistics()
+                manager.register_agent("neu", ["analysis"])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=act, args=(agent_id,)) for agent_id in agents
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        stats = manager.get_agent_statistics()
+        assert stats["total_actions"] == 800 and stats["total_agents"] == 16
+        assert sum(agent.total_actions for agent in manager.list_agents()) == 800
+        manager.close()
+
+        reloaded = ASIAgentManager(data_dir=str(tmp_path))
+        assert reloaded.get_agent_statistics()["total_actions"] == 800
+        reloaded.close()
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Tests für die Blockchain-Integration des ASI-Systems
+"""
+
+import json
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from eth_abi import encode
+from web3 import Web3
+
+from asi_core.agent_manager import ASIAgentManager
+from asi_core.blockchain import ASIBlockchainClient
+from asi_core.chain_indexer import ChainEventIndexer
+from asi_core.merkle_batch import MerkleBatcher
+from asi_core.rpc_cache import ChainReadCache
+from asi_core.tx_queue import NonceManager, TransactionQueue
+from asi_core.tx_tracker import TransactionTracker
+
+CONTRACT_ADDRESS = "0x" + "11" * 20
+
+
+class TransactionNotFound(Exception):
+    """Nachbildung von web3.exceptions.TransactionNotFound"""
+
+
+def make_web3(receipts):
+    """Erstellt ein Web3-Double, das Receipts aus einem Dict liefert."""
+    web3 = MagicMock()
+
+    def get_receipt(tx_hash):
+        if tx_hash not in receipts:
+            raise TransactionNotFound(tx_hash)
+        return receipts[tx_hash]
+
+    web3.eth.get_transaction_receipt.side_effect = get_receipt
+    return web3
+
+
+class TestTransactionTracker:
+    """Tests für den Hintergrund-Tracker"""
+
+    def test_resolves_future_and_callback(self, tmp_path):
+        """Bestätigte Transaktionen lösen Future und Callback auf"""
+        receipts = {}
+        tracker = TransactionTracker(make_web3(receipts), poll_interval=60)
+        seen = []
+
+        future = tracker.track("0xabc", callback=seen.append)
+        tracker.poll_once()
+        assert not future.done()
+        assert tracker.get_status("0xabc") == "pending"
+
+        receipts["0xabc"] = {"status": 1, "blockNumber": 7, "gasUsed": 21000}
+        assert tracker.poll_once() == 1
+
+        record = future.result(timeout=1)
+        assert record["status"] == "success"
+        assert record["block_number"] == 7
+        assert seen[0]["tx_hash"] == "0xabc"
+        assert tracker.pending_count == 0
+        tracker.stop()
+
+    def test_failed_and_timeout(self):
+        """Fehlgeschlagene und abgelaufene Transaktionen werden markiert"""
+        receipts = {"0xbad": {"status": 0, "blockNumber": 3}}
+        tracker = TransactionTracker(make_web3(receipts), poll_interval=60, timeout=0)
+
+        failed = tracker.track("0xbad")
+        lost = tracker.track("0xlost")
+        tracker.poll_once()
+
+        assert failed.result(timeout=1)["status"] == "failed"
+        assert lost.result(timeout=1)["status"] == "timeout"
+        tracker.stop()
+
+    def test_persists_and_resumes_pending(self, tmp_path):
+        """Offene Transaktionen werden nach einem Neustart wieder aufgenommen"""
+        state_file = tmp_path / "transactions.jsonl"
+        receipts = {}
+
+        tracker = TransactionTracker(
+            make_web3(receipts), state_file=str(state_file), poll_interval=60
+        )
+        tracker.track("0x1")
+        tracker.stop()
+
+        lines = [json.loads(line) for line in state_file.read_text().splitlines()]
+        assert lines[-1]["status"] == "pending"
+
+        resumed = TransactionTracker(
+            make_web3(receipts), state_file=str(state_file), poll_interval=60
+        )
+        assert resumed.pending_count == 1
+        receipts["0x1"] = {"status": 1, "blockNumber": 9}
+        resumed.poll_once()
+        resumed.stop()
+
+        final = TransactionTracker(
+            make_web3({}), state_file=str(state_file), poll_interval=60
+        )
+        assert final.get_status("0x1") == "success"
+        assert final.pending_count == 0
+
+
+class TestAsyncSubmission:
+    """Tests für die nicht-blockierende Transaktionsübermittlung"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        client = ASIBlockchainClient(
+            "http://localhost:8545",
+            "0x" + "01" * 32,
+            CONTRACT_ADDRESS,
+            async_submission=True,
+            tx_state_file=str(tmp_path / "transactions.jsonl"),
+        )
+        client.web3 = make_web3({})
+        yield client
+        client.close()
+
+    def test_register_returns_without_waiting(self, client):
+        """Im asynchronen Modus wird nicht auf das Receipt gewartet"""
+        with patch.object(client, "_send_register_entry", return_value="0xfeed"):
+            tx_hash = client.register_entry_on_chain("QmTest", ["a"], b"\0" * 128, 1)
+
+        assert tx_hash == "0xfeed"
+        client.web3.eth.wait_for_transaction_receipt.assert_not_called()
+        assert client.tx_tracker.get_status("0xfeed") == "pending"
+
+    def test_submit_entry_returns_future(self, client):
+        """submit_entry liefert ein Future mit dem finalen Status"""
+        with patch.object(client, "_send_register_entry", return_value="0xbeef"):
+            future = client.submit_entry("QmTest", ["a"], b"\0" * 128, 1)
+
+        client.web3 = make_web3({"0xbeef": {"status": 1, "blockNumber": 1}})
+        client.tx_tracker.web3 = client.web3
+        client.tx_tracker.poll_once()
+
+        assert future.result(timeout=1)["status"] == "success"
+        assert client.get_transaction_status("0xbeef") == "success"
+
+    def test_pending_transactions_resume_on_start(self, tmp_path):
+        """Offene Transaktionen eines früheren Laufs werden beim Start verfolgt"""
+        state_file = tmp_path / "transactions.jsonl"
+        now = time.time()
+        records = [
+            {"tx_hash": "0x1", "status": "pending", "submitted_at": now},
+            {"tx_hash": "0x2", "status": "pending", "submitted_at": now},
+            {"tx_hash": "0x2", "status": "success", "submitted_at": now},
+        ]
+        state_file.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+        client = ASIBlockchainClient(
+            "http://localhost:8545",
+            "0x" + "01" * 32,
+            CONTRACT_ADDRESS,
+            tx_state_file=str(state_file),
+        )
+        try:
+            assert client._tx_tracker is not None
+            assert client._tx_tracker.pending_count == 1
+            with patch.object(client, "is_connected", return_value=False):
+                assert client.get_transaction_status("0x1") == "pending"
+                assert client.get_transaction_status("0x2") == "success"
+        finally:
+            client.close()
+
+        state_file.write_text(json.dumps(dict(records[1], status="success")) + "\n")
+        idle = ASIBlockchainClient(
+            "http://localhost:8545",
+            "0x" + "01" * 32,
+            CONTRACT_ADDRESS,
+            tx_state_file=str(state_file),
+        )
+        assert idle._tx_tracker is None
+
+
+def make_chain(chain_nonce=0):
+    """Erstellt ein Web3-Double mit Nonce-Zählern und Sendeprotokoll."""
+    web3 = MagicMock()
+    web3.eth.chain_id = 80001
+    web3.eth.gas_price = 100
+    web3.eth.account.from_key.return_value.address = "0x" + "22" * 20
+    web3.sent = []
+    web3.state = {"pending": chain_nonce, "latest": chain_nonce}
+
+    def sign(transaction, private_key):
+        signed = MagicMock()
+        signed.raw_transaction = dict(transaction)
+        return signed
+
+    def send(raw):
+        web3.sent.append(raw)
+        return f"0x{len(web3.sent):064x}"
+
+    web3.eth.get_transaction_count.side_effect = lambda address, block: web3.state[
+        block
+    ]
+    web3.eth.account.sign_transaction.side_effect = sign
+    web3.eth.send_raw_transaction.side_effect = send
+    web3.to_hex.side_effect = lambda value: value
+    return web3
+
+
+class TestTransactionQueue:
+    """Tests für Nonce-Manager und gepipelinete Sende-Queue"""
+
+    def test_nonce_manager_allocates_locally(self):
+        """Nonces werden einmal von der Chain gelesen und dann lokal vergeben"""
+        web3 = make_chain(chain_nonce=5)
+        manager = NonceManager(web3, "0xabc")
+
+        assert [manager.allocate() for _ in range(3)] == [5, 6, 7]
+        manager.release(6)
+        assert manager.allocate() == 6
+        assert web3.eth.get_transaction_count.call_count == 1
+
+    def test_concurrent_sends_get_unique_nonces(self):
+        """Viele parallele Sendungen erhalten lückenlose, eindeutige Nonces"""
+        web3 = make_chain(chain_nonce=3)
+        tx_queue = TransactionQueue(
+            web3, "key", nonce_manager=NonceManager(web3, "0xabc")
+        )
+
+        futures = [tx_queue.submit({"to": "0x1", "gas": 21000}) for _ in range(20)]
+        hashes = [future.result(timeout=5) for future in futures]
+        tx_queue.stop()
+
+        assert len(set(hashes)) == 20
+        assert sorted(tx["nonce"] for tx in web3.sent) == list(range(3, 23))
+        assert all(tx["chainId"] == 80001 and tx["gasPrice"] == 100 for tx in web3.sent)
+        assert tx_queue.in_flight_count == 20
+
+    def test_monitor_replaces_stuck_and_fills_gaps(self):
+        """Hängende Transaktionen werden ersetzt, Lücken gefüllt"""
+        web3 = make_chain(chain_nonce=0)
+        manager = NonceManager(web3, "0xabc")
+        tracker = TransactionTracker(make_web3({}), poll_interval=60)
+        tx_queue = TransactionQueue(
+            web3,
+            "key",
+            nonce_manager=manager,
+            stuck_timeout=0,
+            monitor_interval=60,
+            tracker=tracker,
+        )
+
+        first = tx_queue.send({"to": "0x1", "gas": 21000})
+        tracker.track(first)
+        tx_queue.send({"to": "0x1", "gas": 21000})
+        tx_queue.stop()
+
+        # Nonce 2 wurde vergeben, aber nie gesendet, Nonce 3 ist unterwegs
+        gap = manager.allocate()
+        tx_queue._in_flight[3] = tx_queue._in_flight[1].__class__(
+            3, {"gasPrice": 100}, "0xlater", 0.0
+        )
+        manager._next_nonce = 4
+        manager.release(gap)
+
+        tx_queue.monitor()
+
+        gap_fill, replacement = web3.sent[-2:]
+        assert replacement["nonce"] == 0 and replacement["gasPrice"] > 100
+        assert gap_fill["nonce"] == 2 and gap_fill["value"] == 0
+        assert tracker.get_status(first) == "replaced"
+
+        web3.state["latest"] = 2
+        tx_queue.monitor()
+        assert sorted(tx_queue._in_flight) == [2, 3]
+        tracker.stop()
+
+    def test_token_rewards_wait_for_receipt_by_default(self):
+        """Belohnungen melden Erfolg erst nach Bestätigung, sonst explizit 'pending'"""
+        from src.blockchain.memory_token import MemoryTokenService
+
+        service = MemoryTokenService.__new__(MemoryTokenService)
+        service.web3, service.contract = MagicMock(), MagicMock()
+        service.account, service.read_cache = MagicMock(), MagicMock()
+        service.tx_queue = MagicMock(chain_id=80001)
+        service.tx_queue.send.return_value = "0xreward"
+        service.web3.eth.wait_for_transaction_receipt.return_value = MagicMock(status=1)
+
+        # Der Service nutzt noch die camelCase-API älterer web3-Versionen
+        with patch("src.blockchain.memory_token.Web3"):
+            confirmed = service.reward_user("0x" + "33" * 20, 1.0, "test")
+            pending = service.reward_user(
+                "0x" + "33" * 20, 1.0, "test", wait_for_receipt=False
+            )
+            service.web3.eth.wait_for_transaction_receipt.return_value = MagicMock(
+                status=0
+            )
+            reverted = service.execute_buyback(5.0)
+
+        assert confirmed["success"] and confirmed["status"] == "success"
+        assert pending["status"] == "pending" and not pending["success"]
+        assert service.web3.eth.wait_for_transaction_receipt.call_count == 2
+        assert reverted["error"] == "Transaction reverted"
+
+
+class TestMerkleBatching:
+    """Tests für das Bündeln von Agent-Einträgen über Merkle-Wurzeln"""
+
+    def test_proofs_verify_for_every_batch_size(self, tmp_path):
+        """Jeder Eintrag ist über seinen Pfad in der Wurzel enthalten"""
+        for size in (1, 2, 3, 7, 16):
+            batcher = MerkleBatcher(
+                window_seconds=60, batch_dir=str(tmp_path / str(size))
+            )
+            entries = [{"kind": "test", "n": i} for i in range(size)]
+            ids = [batcher.add_entry(entry) for entry in entries]
+            assert batcher.get_proof(ids[0]) is None
+
+            summary = batcher.flush()
+            assert summary["size"] == size
+            for entry, entry_id in zip(entries, ids):
+                proof = batcher.get_proof(entry_id)
+                assert proof["merkle_root"] == summary["merkle_root"]
+                assert batcher.verify_reflection_proof(entry, proof)
+
+            tampered = dict(entries[0], n=999)
+            assert not batcher.verify_reflection_proof(
+                tampered, batcher.get_proof(ids[0])
+            )
+
+    def test_single_transaction_per_batch(self, tmp_path):
+        """Nur die Wurzel wird registriert, Beweise überleben einen Neustart"""
+        client = MagicMock()
+        client.is_connected.return_value = True
+        client.register_entry_on_chain.return_value = "0xroot"
+
+        manager = ASIAgentManager(
+            data_dir=str(tmp_path), blockchain_client=client, batch_window=60
+        )
+        agent_a = manager.register_agent("A", ["analysis"])
+        agent_b = manager.register_agent("B", ["reflection"])
+        client.reset_mock()
+
+        action_id = manager.record_agent_action(agent_a, "analyze", {}, confidence=0.9)
+        learning_id = manager.record_agent_learning(agent_b, "focus", 0.5, {})
+        manager.initiate_collaboration([agent_a, agent_b], "review", ["goal"])
+        summary = manager.flush_batch()
+
+        assert summary["size"] == 3 and summary["tx_hash"] == "0xroot"
+        client.register_entry_on_chain.assert_called_once()
+        client.register_agent_action.assert_not_called()
+        assert manager.get_entry_proof(action_id)["tx_hash"] == "0xroot"
+
+        reloaded = ASIAgentManager(data_dir=str(tmp_path), batch_window=60)
+        assert (
+            reloaded.get_entry_proof(learning_id)["merkle_root"]
+            == summary["merkle_root"]
+        )
+
+    def test_pending_entries_survive_restart(self, tmp_path):
+        """Offene Einträge stehen im Journal, bevor ihre ID zurückgegeben wird"""
+        batcher = MerkleBatcher(window_seconds=60, batch_dir=str(tmp_path))
+        first = batcher.add_entry({"kind": "test", "n": 1})
+        second = batcher.add_entry({"kind": "test", "n": 2})
+        batcher._timer.cancel()  # Prozess endet ohne flush()
+
+        with open(tmp_path / "pending.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"entry_id": "abgebro')
+
+        restarted = MerkleBatcher(window_seconds=60, batch_dir=str(tmp_path))
+        assert restarted.pending_count == 2
+        summary = restarted.flush()
+        assert summary["size"] == 2
+        assert restarted.get_proof(first) and restarted.get_proof(second)
+        assert (tmp_path / "pending.jsonl").read_text() == ""
+
+        again = MerkleBatcher(window_seconds=60, batch_dir=str(tmp_path))
+        assert again.pending_count == 0 and again.get_proof(first)
+
+
+class FakeBatch:
+    """Nachbildung von web3.batch_requests()"""
+
+    def __init__(self, web3):
+        self.web3 = web3
+        self.requests = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, request):
+        self.requests.append(request)
+
+    def execute(self):
+        self.web3.batches += 1
+        return [request.call() for request in self.requests]
+
+
+def make_reader(block=10, batching=True):
+    """Erstellt ein Web3-Double mit zählbaren Contract-Aufrufen."""
+    web3 = MagicMock(spec=["eth", "batch_requests"] if batching else ["eth"])
+    web3.eth = MagicMock()
+    web3.eth.chain_id = 137
+    web3.eth.block_number = block
+    web3.eth.get_block_number.return_value.call.side_effect = (
+        lambda: web3.eth.block_number
+    )
+    web3.batches = 0
+    if batching:
+        web3.batch_requests.side_effect = lambda: FakeBatch(web3)
+    return web3
+
+
+def contract_call(value):
+    function = MagicMock()
+    function.call.return_value = value
+    return function
+
+
+class TestChainReadCache:
+    """Tests für gebündelte und zwischengespeicherte Lesezugriffe"""
+
+    def test_batches_reads_and_caches_per_block(self):
+        """Fehlende Werte kommen in einem Batch, danach aus dem Cache"""
+        web3 = make_reader(block=10)
+        cache = ChainReadCache(web3, block_ttl=60)
+        calls = {"supply": contract_call(100), "burned": contract_call(5)}
+
+        assert cache.read(calls) == {"supply": 100, "burned": 5}
+        assert cache.read(calls) == {"supply": 100, "burned": 5}
+        assert web3.batches == 1
+        assert calls["supply"].call.call_count == 1
+
+        cache.invalidate("supply")
+        calls["supply"].call.return_value = 90
+        assert cache.read(calls)["supply"] == 90
+        assert calls["burned"].call.call_count == 1
+
+    def test_new_block_refreshes_values(self):
+        """Nach Ablauf der Block-TTL wird für den neuen Block neu gelesen"""
+        web3 = make_reader(block=10)
+        cache = ChainReadCache(web3, block_ttl=0)
+        balance = contract_call(1)
+
+        cache.read({"balance": balance})
+        web3.eth.block_number = 11
+        balance.call.return_value = 2
+        assert cache.read({"balance": balance}) == {"balance": 2}
+        assert cache.block_number() == 11
+
+    def test_sequential_fallback_and_immutables(self):
+        """Ohne Batch-Unterstützung wird sequenziell gelesen; Konstanten nur einmal"""
+        web3 = make_reader(batching=False)
+        cache = ChainReadCache(web3, block_ttl=60)
+        loader = MagicMock(return_value=18)
+
+        assert cache.read({"supply": contract_call(7)}) == {"supply": 7}
+        assert cache.immutable("decimals", loader) == 18
+        assert cache.immutable("decimals", loader) == 18
+        assert loader.call_count == 1
+        assert cache.chain_id == 137
+
+    def test_connection_check_is_cached(self, tmp_path):
+        """is_connected fragt den Knoten höchstens einmal pro TTL"""
+        client = ASIBlockchainClient(
+            "http://localhost:8545",
+            "0x" + "01" * 32,
+            CONTRACT_ADDRESS,
+            tx_state_file=str(tmp_path / "transactions.jsonl"),
+        )
+        client.web3 = MagicMock()
+        client.web3.is_connected.return_value = True
+        client._connection_checked_at = float("-inf")
+
+        assert client.is_connected() and client.is_connected()
+        assert client.web3.is_connected.call_count == 1
+        client.close()
+
+
+class LocalChain:
+    """Lokale Stand-in-Chain mit EntryRegistered-Logs und Reorgs."""
+
+    def __init__(self):
+        abi_path = os.path.join(
+            os.path.dirname(__file__), "..", "contracts", "ASI.json"
+        )
+        with open(abi_path) as f:
+            abi = json.load(f)["abi"]
+        self.contract = Web3().eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+        self.topic = self.contract.events.EntryRegistered().topic
+        self.blocks = [{"hash": self._hash(0, "genesis"), "txs": []}]
+        self.transactions = {}
+        self.eth = self
+        self.log_requests = []
+
+    @staticmethod
+    def _hash(*parts):
+        return Web3.keccak(text=":".join(map(str, parts)))
+
+    @property
+    def block_number(self):
+        return len(self.blocks) - 1
+
+    def mine(self, entries=(), fork="main"):
+        """Erzeugt einen Block mit (cid, tags, state, timestamp)-Einträgen."""
+        number = len(self.blocks)
+        txs = []
+        for cid, tags, state, timestamp in entries:
+            tx_hash = self._hash(fork, number, cid)
+            self.transactions[tx_hash] = {
+                "input": self.contract.encode_abi(
+                    "registerEntry", args=[cid, tags, b"\0" * 128, timestamp]
+                )
+            }
+            txs.append((tx_hash, cid, state))
+        self.blocks.append({"hash": self._hash(fork, number), "txs": txs})
+
+    def reorg(self, depth):
+        del self.blocks[-depth:]
+
+    def get_block(self, number):
+        return {"hash": self.blocks[number]["hash"], "number": number}
+
+    def get_transaction(self, tx_hash):
+        return self.transactions[bytes.fromhex(tx_hash[2:])]
+
+    def get_logs(self, params):
+        self.log_requests.append((params["fromBlock"], params["toBlock"]))
+        assert params["topics"] == [self.topic]
+        logs = []
+        for number in range(params["fromBlock"], params["toBlock"] + 1):
+            block = self.blocks[number]
+            for index, (tx_hash, cid, state) in enumerate(block["txs"]):
+                logs.append(
+                    {
+                        "address": CONTRACT_ADDRESS,
+                        "topics": [
+                            self.topic,
+                            self._hash("entry", cid),
+                            b"\0" * 12 + b"\x22" * 20,
+                        ],
+                        "data": encode(["string", "uint8"], [cid, state]),
+                        "logIndex": index,
+                        "transactionIndex": index,
+                        "transactionHash": tx_hash,
+                        "blockHash": block["hash"],
+                        "blockNumber": number,
+                    }
+                )
+        return logs
+
+
+class TestChainEventIndexer:
+    """Tests für den lokalen Event-Index"""
+
+    @pytest.fixture
+    def chain(self):
+        chain = LocalChain()
+        chain.mine([("QmA", ["agent:a", "action:analyze", "confidence:0.80"], 1, 1000)])
+        chain.mine()
+        chain.mine(
+            [
+                ("QmB", ["agent:b", "action:reflect", "confidence:0.60"], 2, 2000),
+                ("QmC", ["collaboration:review", "agent:a", "agent:b"], 1, 3000),
+            ]
+        )
+        return chain
+
+    def test_indexes_in_pages_and_serves_queries(self, chain, tmp_path):
+        """Logs werden seitenweise gelesen und lokal abgefragt"""
+        indexer = ChainEventIndexer(
+            chain, chain.contract, db_path=str(tmp_path / "index.db"), page_size=2
+        )
+
+        assert indexer.sync() == 3
+        assert chain.log_requests == [(0, 1), (2, 3)]
+        assert indexer.sync() == 0
+
+        assert [e["cid"] for e in indexer.get_entries_by_state(1)] == ["QmA", "QmC"]
+        actions = indexer.get_agent_actions("a")
+        assert [e["cid"] for e in actions] == ["QmA", "QmC"]
+        assert actions[0]["tags"] == ["agent:a", "action:analyze", "confidence:0.80"]
+        assert actions[0]["timestamp"] == 1000
+
+        stats = indexer.get_state_statistics()
+        assert stats["total_entries"] == 3 and stats["unique_states"] == 2
+        network = indexer.get_agent_network_stats(now=2500)
+        assert network["total_agents"] == 2 and network["total_actions"] == 2
+        assert network["average_confidence"] == 0.7
+        indexer.stop()
+
+        reopened = ChainEventIndexer(
+            chain, chain.contract, db_path=str(tmp_path / "index.db")
+        )
+        assert reopened.last_block == 3
+        reopened.stop()
+
+    def test_reorg_replaces_orphaned_entries(self, chain, tmp_path):
+        """Verwaiste Blöcke werden anhand des Block-Hashes verworfen"""
+        indexer = ChainEventIndexer(
+            chain, chain.contract, db_path=str(tmp_path / "index.db")
+        )
+        indexer.sync()
+
+        chain.reorg(2)
+        chain.mine([("QmD", ["agent:c"], 2, 4000)], fork="side")
+        chain.mine(fork="side")
+        indexer.sync()
+
+        cids = [
+            e["cid"]
+            for e in indexer.get_entries_by_state(1) + indexer.get_entries_by_state(2)
+        ]
+        assert sorted(cids) == ["QmA", "QmD"]
+        assert indexer.get_agent_actions("b") == []
+        indexer.stop()
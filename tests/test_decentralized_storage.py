@@ -3,9 +3,15 @@
 Tests für die dezentrale Speicherfunktionalität des ASI-Systems
 """
 
+import importlib.util
+import json
+import threading
+import time
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 
 from asi_core.processing import process_reflection
 from asi_core.storage import (
@@ -13,6 +19,12 @@ from asi_core.storage import (
     persist_metadata_on_arweave,
     upload_to_ipfs,
 )
+from src.storage.arweave_client import ArweaveClient
+from src.storage.content_cache import ContentCache, ipfs_cid_v0, verify_ipfs_content
+from src.storage.ipfs_client import IPFSClient, NodeHealth
+from src.main.modules.storage_module import StorageError, StorageModule
+from src.storage.local_db import LocalDatabase
+from src.storage.upload_worker import UploadWorker
 
 
 class TestProcessing:
@@ -170,3 +182,494 @@ class TestIntegration:
 if __name__ == "__main__":
     # Tests ausführen
     pytest.main([__file__, "-v"])
+
+
+class TestUploadWorker:
+    """Tests für die Hintergrund-Upload-Queue"""
+
+    @pytest.fixture
+    def local_db(self, tmp_path):
+        db = LocalDatabase(str(tmp_path / "asi_local.db"))
+        for i in range(3):
+            db.store_reflection(
+                {"hash": f"h{i}", "content": f"Reflexion {i}", "privacy": "anonymous"}
+            )
+        return db
+
+    def test_uploads_in_parallel_and_records_outcome(self, local_db):
+        """Eingereihte Uploads werden parallel ausgeführt und vermerkt"""
+        ipfs = MagicMock()
+        ipfs.upload_reflection.side_effect = (
+            lambda reflection, **kwargs: f"Qm{reflection['hash']}"
+        )
+        arweave = MagicMock()
+        arweave.upload_reflection.return_value = "ar-tx"
+        worker = UploadWorker(
+            local_db, ipfs_client=ipfs, arweave_client=arweave, max_parallel=8
+        )
+
+        for i in range(3):
+            assert worker.enqueue(f"h{i}", ["ipfs", "arweave"]) == 2
+        assert worker.enqueue("h0", ["ipfs"]) == 0
+
+        assert worker.run_once() == 6
+        assert worker.run_once() == 0
+        worker.stop()
+
+        assert local_db.get_reflection_by_hash("h1")["ipfs_hash"] == "Qmh1"
+        assert local_db.get_reflection_by_hash("h1")["arweave_tx"] == "ar-tx"
+        assert local_db.get_statistics()["upload_status"] == {
+            "ipfs": {"uploaded": 3},
+            "arweave": {"uploaded": 3},
+        }
+
+    def test_backoff_retry_and_restart(self, local_db, tmp_path):
+        """Fehlschläge mit Backoff wiederholen, Uploads überleben Neustarts"""
+        ipfs = MagicMock()
+        ipfs.upload_reflection.side_effect = [RuntimeError("Node weg"), "QmRetry"]
+        worker = UploadWorker(
+            local_db, ipfs_client=ipfs, base_delay=100, max_attempts=2
+        )
+        worker.enqueue("h0", ["ipfs"])
+
+        with patch("src.storage.upload_worker.time.time", return_value=1000.0):
+            assert worker.run_once() == 1
+            assert worker.run_once() == 0  # Backoff noch nicht abgelaufen
+
+        with local_db.get_connection() as conn:
+            row = conn.execute("SELECT * FROM upload_status").fetchone()
+        assert row["status"] == "pending" and row["error_message"] == "Node weg"
+        assert 1050.0 <= row["next_attempt"] <= 1100.0
+
+        # Absturz während eines Uploads simulieren
+        local_db.claim_pending_uploads(["ipfs"], 10, now=2000.0)
+        restarted = UploadWorker(
+            LocalDatabase(str(tmp_path / "asi_local.db")), ipfs_client=ipfs
+        )
+        restarted.start()
+        for _ in range(50):
+            if local_db.get_reflection_by_hash("h0")["ipfs_hash"]:
+                break
+            time.sleep(0.02)
+        restarted.stop()
+        worker.stop()
+        assert local_db.get_reflection_by_hash("h0")["ipfs_hash"] == "QmRetry"
+
+    def test_unreachable_node_is_not_recorded_as_upload(self, local_db):
+        """Ein simulierter Hash gilt nicht als Upload, der Eintrag wird neu versucht"""
+        ipfs = IPFSClient(probe_interval=0)
+        ipfs.session = MagicMock()
+        ipfs.session.post.side_effect = requests.ConnectionError("down")
+        worker = UploadWorker(local_db, ipfs_client=ipfs)
+        worker.enqueue("h0", ["ipfs"])
+
+        assert worker.run_once() == 1
+        worker.stop()
+
+        assert local_db.get_reflection_by_hash("h0")["ipfs_hash"] is None
+        with local_db.get_connection() as conn:
+            row = conn.execute("SELECT * FROM upload_status").fetchone()
+        assert row["status"] == "pending" and row["attempt_count"] == 1
+
+    def test_legacy_duplicates_are_merged_into_unique_index(self, tmp_path):
+        """Doppelte Queue-Einträge älterer Datenbanken werden beim Start bereinigt"""
+        db_path = str(tmp_path / "legacy.db")
+        db = LocalDatabase(db_path)
+        with db.get_connection() as conn:
+            conn.execute("DROP INDEX idx_upload_status_target")
+            conn.executemany(
+                "INSERT INTO upload_status (reflection_hash, storage_type, status) "
+                "VALUES (?, ?, ?)",
+                [
+                    ("h0", "ipfs", "pending"),
+                    ("h0", "ipfs", "uploaded"),
+                    ("h0", "arweave", "pending"),
+                ],
+            )
+
+        db = LocalDatabase(db_path)
+        with db.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT storage_type, status FROM upload_status ORDER BY id"
+            ).fetchall()
+        assert [tuple(row) for row in rows] == [
+            ("ipfs", "uploaded"),
+            ("arweave", "pending"),
+        ]
+        assert db.enqueue_upload("h0", "ipfs") is False
+        assert db.enqueue_upload("h1", "ipfs") is True
+
+
+class TestIPFSNodeHealth:
+    """Tests für den Circuit Breaker des IPFS-Clients"""
+
+    def make_client(self, **kwargs):
+        client = IPFSClient(probe_interval=0, **kwargs)
+        client.session = MagicMock()
+        return client
+
+    def test_data_calls_skip_version_probe(self):
+        """Uploads gehen direkt an /add, ohne vorherigen /version-Aufruf"""
+        client = self.make_client()
+        client.session.post.return_value = MagicMock(
+            status_code=200, json=lambda: {"Hash": "QmReal"}
+        )
+
+        assert client.upload_json({"a": 1}) == "QmReal"
+        assert [
+            c.args[0].rsplit("/", 1)[-1] for c in client.session.post.call_args_list
+        ] == ["add"]
+
+    def test_breaker_opens_and_half_opens(self):
+        """Nach Fehlern sofort simulieren, nach reset_timeout genau ein neuer Versuch"""
+        client = self.make_client(failure_threshold=2, reset_timeout=60)
+        client.session.post.side_effect = requests.ConnectionError("down")
+
+        client.upload_json({"a": 1})
+        assert client.health.state == NodeHealth.CLOSED
+        client.upload_json({"a": 2})
+        assert client.health.state == NodeHealth.OPEN
+        assert not client.is_node_running()
+
+        client.upload_json({"a": 3})
+        assert client.download_json("QmX") is None
+        assert client.session.post.call_count == 2
+
+        client.health._opened_at -= 61
+        client.session.post.side_effect = None
+        client.session.post.return_value = MagicMock(
+            status_code=200, json=lambda: {"Hash": "QmBack"}
+        )
+        assert client.health.allow_request()
+        assert not client.health.allow_request()  # nur eine Probe gleichzeitig
+        assert client.probe()
+        assert client.health.state == NodeHealth.CLOSED
+        assert client.upload_json({"a": 4}) == "QmBack"
+        assert client.is_node_running()
+
+    def test_first_probe_runs_immediately(self):
+        """Ein fehlender Node gilt nicht als erreichbar, bevor ein Ergebnis vorliegt"""
+        client = IPFSClient(probe_interval=60)
+        client.session = MagicMock()
+        probed = threading.Event()
+
+        def post(url, **kwargs):
+            probed.set()
+            raise requests.ConnectionError("down")
+
+        client.session.post.side_effect = post
+        assert not client.is_node_running()  # unbekannt
+        assert probed.wait(2)  # nicht erst nach probe_interval
+        client.stop()
+        assert not client.is_node_running()
+
+
+class TestIPFSBatchUpload:
+    """Tests für gebündelte Uploads mit wrap-with-directory"""
+
+    def test_batches_run_concurrently_with_directory_roots(self):
+        """Viele Reflexionen brauchen nur eine Anfrage pro Batch plus Manifest"""
+        client = IPFSClient(probe_interval=0, max_parallel_uploads=3)
+        client.session = MagicMock()
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def post(url, files=None, params=None, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            if params.get("wrap-with-directory"):
+                first = json.loads(files[0][1][1])["reflection"]["id"]
+                lines = [
+                    json.dumps(
+                        {
+                            "Name": name,
+                            "Hash": f"Qm{json.loads(body)['reflection']['id']}",
+                        }
+                    )
+                    for _, (name, body, _) in files
+                ]
+                lines.append(json.dumps({"Name": "", "Hash": f"QmDir{first}"}))
+                return MagicMock(status_code=200, text="\n".join(lines))
+            return MagicMock(status_code=200, json=lambda: {"Hash": "QmManifest"})
+
+        client.session.post.side_effect = post
+        result = client.upload_reflections([{"id": i} for i in range(10)], batch_size=3)
+
+        assert result["hashes"] == [f"Qm{i}" for i in range(10)]
+        assert result["roots"] == ["QmDir0", "QmDir3", "QmDir6", "QmDir9"]
+        assert result["manifest"] == "QmManifest"
+        assert client.session.post.call_count == 5
+        assert peak[0] > 1
+
+    def test_batch_falls_back_to_simulation(self):
+        """Ohne erreichbaren Node werden deterministische Hashes simuliert"""
+        client = IPFSClient(probe_interval=0)
+        client.session = MagicMock()
+        client.session.post.side_effect = requests.ConnectionError("down")
+
+        result = client.upload_json_batch([{"a": 1}, {"b": 2}])
+        assert result["hashes"] == [
+            client._simulate_upload({"a": 1}),
+            client._simulate_upload({"b": 2}),
+        ]
+        assert result["root"].startswith("Qm")
+
+
+class TestContentCache:
+    """Tests für den inhaltsadressierten Download-Cache"""
+
+    def test_cid_verification(self):
+        """CIDv0 kleiner Dateien wird lokal nachgerechnet"""
+        assert (
+            ipfs_cid_v0(b"hello world\n")
+            == "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+        )
+        assert verify_ipfs_content(
+            "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o", b"hello world\n"
+        )
+        assert not verify_ipfs_content(
+            "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o", b"tampered\n"
+        )
+        assert verify_ipfs_content("bafy-cidv1", b"nicht pruefbar")
+
+    def test_repeated_and_concurrent_reads_hit_network_once(self, tmp_path):
+        """Gleichzeitige Downloads werden gebündelt, spätere kommen von der Platte"""
+        cache = ContentCache(str(tmp_path / "cache.db"))
+        client = IPFSClient(probe_interval=0, cache=cache)
+        client.session = MagicMock()
+        body = json.dumps({"reflection": "x"}).encode()
+        cid = ipfs_cid_v0(body)
+
+        def post(url, **kwargs):
+            time.sleep(0.1)
+            return MagicMock(status_code=200, content=body)
+
+        client.session.post.side_effect = post
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.download_json(cid)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [{"reflection": "x"}] * 5
+        assert client.download_json(cid) == {"reflection": "x"}
+        assert client.session.post.call_count == 1
+
+        # Manipulierte Inhalte werden verworfen und nicht gespeichert
+        client.session.post.side_effect = None
+        client.session.post.return_value = MagicMock(
+            status_code=200, content=b'{"evil": 1}'
+        )
+        assert (
+            client.download_json("QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o")
+            is None
+        )
+        assert cache.get("ipfs:QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o") is None
+
+    def test_lru_eviction_and_arweave(self, tmp_path):
+        """Der Cache bleibt unter max_bytes und verdrängt die ältesten Einträge"""
+        cache = ContentCache(
+            str(tmp_path / "cache.db"), max_bytes=100, touch_interval=0
+        )
+        cache.put("a", b"x" * 40)
+        time.sleep(0.01)
+        cache.put("b", b"y" * 40)
+        time.sleep(0.01)
+        assert cache.get("a") is not None  # a ist jetzt jünger als b
+        cache.put("c", b"z" * 40)
+        assert cache.get("b") is None and cache.get("a") and cache.get("c")
+        assert cache.stats()["bytes"] == 80
+
+        arweave = ArweaveClient(cache=cache)
+        arweave.session = MagicMock()
+        arweave.session.get.return_value = MagicMock(
+            status_code=200, content=b'{"tx": 1}'
+        )
+        assert arweave.download_data("tx1") == {"tx": 1}
+        assert arweave.download_data("tx1") == {"tx": 1}
+        assert arweave.session.get.call_count == 1
+        cache.close()
+
+
+class TestKeysetPagination:
+    """Tests für das seitenweise Listen über (timestamp, hash)"""
+
+    @pytest.fixture
+    def local_db(self, tmp_path):
+        db = LocalDatabase(str(tmp_path / "asi_local.db"))
+        # Gleiche Zeitstempel erzwingen Tie-Breaks über den Hash
+        for i in range(25):
+            db.store_reflection(
+                {
+                    "hash": f"h{i:02d}",
+                    "content": f"Reflexion {i}",
+                    "privacy": "private" if i % 2 else "anonymous",
+                    "timestamp": f"2024-01-{1 + i // 3:02d}T12:00:00",
+                }
+            )
+        return db
+
+    def test_walks_all_pages_without_duplicates(self, local_db):
+        """Alle Seiten zusammen ergeben genau die Reihenfolge der Gesamtliste"""
+        seen, cursor = [], None
+        while True:
+            page, cursor = local_db.get_reflections_page(limit=4, cursor=cursor)
+            seen.extend(r.hash for r in page)
+            if cursor is None:
+                break
+
+        expected = [r.hash for r in local_db.get_reflections(limit=100)]
+        assert seen == expected
+        assert len(set(seen)) == 25
+        assert expected[:3] == ["h24", "h23", "h22"]
+
+    def test_filters_content_and_invalid_cursor(self, local_db):
+        """Filter gelten über Seitengrenzen, Inhalte nur auf Anfrage"""
+        page, cursor = local_db.get_reflections_page(limit=5, privacy_level="private")
+        rest, end = local_db.get_reflections_page(
+            limit=50, cursor=cursor, privacy_level="private"
+        )
+        assert len(page) + len(rest) == 12 and end is None
+        assert all(r.privacy_level == "private" for r in page + rest)
+        assert page[0].full_content is None
+
+        page, _ = local_db.get_reflections_page(limit=1, include_content=True)
+        assert page[0].full_content == "Reflexion 24"
+
+        with pytest.raises(ValueError):
+            local_db.get_reflections_page(cursor="kein-cursor")
+        for limit in (0, -1):
+            with pytest.raises(ValueError):
+                local_db.get_reflections_page(limit=limit)
+
+    def test_storage_module_pages(self, tmp_path):
+        """StorageModule blättert über (timestamp, id)"""
+        storage = StorageModule(
+            {"storage": {"database_path": str(tmp_path / "module.db")}}
+        )
+        storage.initialize()
+        for i in range(7):
+            storage.store_reflection(
+                {
+                    "id": f"r{i}",
+                    "content": f"Inhalt {i}",
+                    "timestamp": "2024-01-01T00:00:00",
+                }
+            )
+
+        ids, cursor = [], None
+        while True:
+            page = storage.list_reflections(limit=3, cursor=cursor)
+            ids.extend(r["id"] for r in page["reflections"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert ids == [f"r{i}" for i in reversed(range(7))]
+
+        with pytest.raises(StorageError):
+            storage.list_reflections(cursor="%%%")
+        for limit in (0, -1):
+            with pytest.raises(StorageError):
+                storage.list_reflections(limit=limit)
+        storage.shutdown()
+
+
+class TestIPFSTipPublisher:
+    """Tests für den inkrementellen Log-Publisher (services/ipfs_tip)"""
+
+    @pytest.fixture
+    def tip(self, tmp_path, monkeypatch):
+        spec = importlib.util.spec_from_file_location(
+            "ipfs_tip_main",
+            Path(__file__).parent.parent / "services" / "ipfs_tip" / "main.py",
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        module.KEY = bytes(range(16))
+        module.EVENT_LOG = tmp_path / "events.jsonl"
+        module.STATE_FILE = tmp_path / "events.jsonl.ipfs_tip.json"
+        module.added, module.published = [], []
+
+        def add(payload):
+            module.added.append(payload)
+            return f"Qm{len(module.added)}"
+
+        monkeypatch.setattr(module, "ipfs_add_bytes", add)
+        monkeypatch.setattr(module, "ipns_publish", module.published.append)
+        return module
+
+    @staticmethod
+    def decrypt(tip, payload):
+        from Crypto.Cipher import AES
+
+        assert payload[:2] == b"v1"
+        iv, tag, ct = payload[2:14], payload[14:30], payload[30:]
+        return AES.new(tip.KEY, AES.MODE_GCM, nonce=iv).decrypt_and_verify(ct, tag)
+
+    def test_publishes_only_complete_lines(self, tip):
+        """Eine halbe letzte Zeile wird erst mit ihrem Zeilenende veröffentlicht"""
+        state = tip.load_state()
+        tip.EVENT_LOG.write_bytes(b'{"a":1}\n{"b":')
+        assert tip.publish_new_data(state)
+        assert self.decrypt(tip, tip.added[0]) == b'{"a":1}\n'
+        assert state["offset"] == 8
+
+        assert not tip.publish_new_data(state)  # nur die unvollständige Zeile
+        with open(tip.EVENT_LOG, "ab") as f:
+            f.write(b"2}\n")
+        assert tip.publish_new_data(state)
+        assert self.decrypt(tip, tip.added[2]) == b'{"b":2}\n'
+        assert state["chunks"][-1] == {"cid": "Qm3", "offset": 8, "length": 8}
+        assert tip.load_state() == state
+        assert tip.published == ["Qm2", "Qm4"]
+
+    def test_shrunk_log_starts_new_chain(self, tip):
+        """Nach Rotation/Kürzung beginnt eine neue Chunk-Kette bei Offset 0"""
+        state = {
+            "offset": 100,
+            "chunks": [{"cid": "QmOld", "offset": 0, "length": 100}],
+            "prev": "QmPrev",
+        }
+        tip.EVENT_LOG.write_bytes(b'{"neu":1}\n')
+
+        assert tip.publish_new_data(state)
+        assert state["offset"] == 10 and state["prev"] is None
+        assert state["chunks"] == [{"cid": "Qm1", "offset": 0, "length": 10}]
+        index = json.loads(self.decrypt(tip, tip.added[1]))
+        assert index == {"v": 1, "prev": None, "chunks": state["chunks"], "size": 10}
+
+    def test_index_rolls_over_into_prev(self, tip, monkeypatch):
+        """Volle Indizes wandern als verkettete Vorgänger nach 'prev'"""
+        monkeypatch.setattr(tip, "MAX_INDEX_CHUNKS", 1)
+        state = tip.load_state()
+        for line in (b'{"a":1}\n', b'{"b":2}\n'):
+            with open(tip.EVENT_LOG, "ab") as f:
+                f.write(line)
+            assert tip.publish_new_data(state)
+
+        # Qm1 Chunk, Qm2 Index, Qm3 Chunk, Qm4 voller Index, Qm5 neuer Index
+        rolled = json.loads(self.decrypt(tip, tip.added[3]))
+        assert [chunk["cid"] for chunk in rolled["chunks"]] == ["Qm1", "Qm3"]
+        assert state["prev"] == "Qm4" and state["chunks"] == []
+        assert json.loads(self.decrypt(tip, tip.added[4]))["prev"] == "Qm4"
+
+    def test_failed_upload_keeps_state_for_retry(self, tip, monkeypatch):
+        """Bei einer unerwarteten API-Antwort bleibt der Zustand unverändert"""
+        tip.EVENT_LOG.write_bytes(b'{"a":1}\n')
+        state = tip.load_state()
+        monkeypatch.setattr(
+            tip, "ipfs_add_bytes", MagicMock(side_effect=KeyError("Hash"))
+        )
+
+        with pytest.raises(KeyError):
+            tip.publish_new_data(state)
+        assert state == {"offset": 0, "chunks": [], "prev": None}
+        assert not tip.STATE_FILE.exists()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests für die Persistenz des Embedding-Caches (Snapshot plus Write-Ahead-Log)
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+# src/asi_core.py verdeckt das Paket src/asi_core/, daher über den Dateipfad laden
+_spec = importlib.util.spec_from_file_location(
+    "asi_core_search",
+    Path(__file__).parent.parent / "src" / "asi_core" / "search" / "__init__.py",
+)
+search = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(search)
+
+
+def embedding(text):
+    return search.ASIEmbeddingGenerator().generate_embedding(text)
+
+
+class TestEmbeddingWAL:
+    """Tests für das Write-Ahead-Log des Embedding-Caches"""
+
+    @pytest.fixture
+    def cache_file(self, tmp_path):
+        return tmp_path / "embedding_cache.json"
+
+    def open_search(self, cache_file, **kwargs):
+        return search.ASISemanticSearch(cache_file=str(cache_file), **kwargs)
+
+    def test_append_then_reload(self, cache_file):
+        """Neue Embeddings landen nur im Log und sind nach einem Neustart wieder da"""
+        engine = self.open_search(cache_file)
+        engine.store_embedding("cid-1", embedding("erste"), "erste Reflexion")
+        assert (
+            engine.store_embeddings_bulk(
+                [
+                    ("cid-2", embedding("zweite"), "zweite"),
+                    ("cid-3", embedding("dritte"), "dritte"),
+                ]
+            )
+            == 2
+        )
+        engine.close()
+
+        assert not cache_file.exists()
+        lines = [
+            json.loads(line)
+            for line in (cache_file.parent / "embedding_cache.json.log")
+            .read_text()
+            .splitlines()
+        ]
+        assert [line["cid"] for line in lines] == ["cid-1", "cid-2", "cid-3"]
+
+        reloaded = self.open_search(cache_file)
+        assert set(reloaded.cache) == {"cid-1", "cid-2", "cid-3"}
+        assert bytes.fromhex(reloaded.cache["cid-2"]["embedding"]) == embedding(
+            "zweite"
+        )
+        assert reloaded.metadata["last_added"] == "cid-3"
+        assert reloaded.get_cache_stats()["log_entries"] == 3
+        assert {result["cid"] for result in reloaded.search_ASI_memory("erste")} == {
+            "cid-1",
+            "cid-2",
+            "cid-3",
+        }
+
+    def test_invalid_item_writes_nothing(self, cache_file):
+        """Ein ungültiges Embedding im Bulk verhindert das gesamte Schreiben"""
+        engine = self.open_search(cache_file)
+        with pytest.raises(ValueError):
+            engine.store_embeddings_bulk(
+                [("ok", embedding("ok"), "ok"), ("kaputt", b"\0" * 3, "kaputt")]
+            )
+        engine.close()
+
+        assert engine.cache == {}
+        assert not (cache_file.parent / "embedding_cache.json.log").exists()
+
+    def test_compaction_after_snapshot_interval(self, cache_file):
+        """Nach snapshot_interval Einträgen folgt ein Snapshot, das Log wird geleert"""
+        log_file = cache_file.parent / "embedding_cache.json.log"
+        engine = self.open_search(cache_file, snapshot_interval=3)
+        for i in range(2):
+            engine.store_embedding(f"cid-{i}", embedding(f"text {i}"), f"text {i}")
+        assert not cache_file.exists()
+
+        engine.store_embedding("cid-2", embedding("text 2"), "text 2")
+        assert log_file.read_text() == ""
+        snapshot = json.loads(cache_file.read_text())
+        assert set(snapshot["embeddings"]) == {"cid-0", "cid-1", "cid-2"}
+        assert engine.get_cache_stats()["log_entries"] == 0
+
+        engine.store_embedding("cid-3", embedding("text 3"), "text 3")
+        engine.compact()
+        engine.close()
+        assert log_file.read_text() == ""
+        assert len(json.loads(cache_file.read_text())["embeddings"]) == 4
+
+        reloaded = self.open_search(cache_file)
+        assert (
+            len(reloaded.cache) == 4 and reloaded.get_cache_stats()["log_entries"] == 0
+        )
+
+    def test_recovers_from_torn_last_line(self, cache_file):
+        """Eine abgeschnittene letzte Log-Zeile wird ignoriert, neue bleiben lesbar"""
+        engine = self.open_search(cache_file)
+        engine.store_embedding("cid-1", embedding("ganz"), "ganz")
+        engine.close()
+        with open(
+            cache_file.parent / "embedding_cache.json.log", "a", encoding="utf-8"
+        ) as f:
+            f.write(
+                '{"cid": "cid-halb", "entry": {"embe'
+            )  # Absturz mitten im Schreiben
+
+        recovered = self.open_search(cache_file)
+        assert set(recovered.cache) == {"cid-1"}
+        recovered.store_embedding("cid-2", embedding("danach"), "danach")
+        recovered.close()
+
+        reloaded = self.open_search(cache_file)
+        assert set(reloaded.cache) == {"cid-1", "cid-2"}
+
+    def test_flush_and_close_make_entries_durable(self, cache_file):
+        """flush und close schreiben gepufferte Einträge per fsync auf die Festplatte"""
+        log_file = cache_file.parent / "embedding_cache.json.log"
+        engine = self.open_search(cache_file, fsync_batch_size=100, fsync_interval=3600)
+        engine.store_embedding("cid-1", embedding("eins"), "eins")
+        assert engine._unsynced_entries == 1
+
+        engine.flush()
+        assert engine._unsynced_entries == 0
+        assert json.loads(log_file.read_text())["cid"] == "cid-1"
+
+        engine.store_embedding("cid-2", embedding("zwei"), "zwei")
+        engine.close()
+        assert engine._log_handle is None and engine._unsynced_entries == 0
+        assert set(self.open_search(cache_file).cache) == {"cid-1", "cid-2"}
+
+        # Nach close öffnet ein weiterer Eintrag das Log erneut
+        engine.store_embedding("cid-3", embedding("drei"), "drei")
+        engine.close()
+        assert set(self.open_search(cache_file).cache) == {"cid-1", "cid-2", "cid-3"}
@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+"""
+Tests für die Web- und Admin-Schnittstellen des ASI-Systems
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from src.web import admin_api
+from src.web.admin_api import RingBufferHandler, SystemSampler
+from src.web.backend_health import BackendProber
+from src.web.http_cache import HTTPCache, conditional
+from src.web.metrics import RequestMetrics
+
+
+@pytest.fixture
+def admin_client():
+    app = Flask(__name__)
+    app.register_blueprint(admin_api.admin_bp)
+    return app.test_client()
+
+
+class TestSystemSampler:
+    """Tests für den Hintergrund-Sampler der Admin-API"""
+
+    def test_handlers_read_snapshot_without_blocking(self, admin_client):
+        """Stats und Alerts lesen nur den Snapshot, psutil blockiert nicht"""
+        admin_api.system_sampler.snapshot()
+
+        with patch.object(
+            admin_api.psutil, "cpu_percent", side_effect=AssertionError("blockiert")
+        ):
+            started = time.monotonic()
+            stats = admin_client.get("/api/admin/stats").get_json()
+            alerts = admin_client.get("/api/admin/alerts")
+            assert time.monotonic() - started < 0.5
+
+        assert stats["success"] and 0 <= stats["cpu_usage"] <= 100
+        assert stats["process"]["threads"] >= 1
+        assert alerts.status_code == 200
+
+    def test_background_refresh(self):
+        """Der Snapshot wird im festen Takt erneuert"""
+        sampler = SystemSampler(interval=0.05)
+        first = sampler.snapshot()
+        for _ in range(40):
+            if sampler.snapshot() is not first:
+                break
+            time.sleep(0.025)
+        sampler.stop()
+        assert sampler.snapshot() is not first
+
+
+class TestAdminLogs:
+    """Tests für den Log-Ring-Puffer der Admin-API"""
+
+    def test_incremental_fetch_with_filters(self, admin_client):
+        """Dashboards holen per Cursor nur neue Records, gefiltert nach Level"""
+        admin_client.delete("/api/admin/logs")
+        logger = logging.getLogger("asi.test.admin")
+        logger.setLevel(logging.DEBUG)
+
+        logger.info("erste Meldung")
+        logger.warning("zweite Meldung")
+        response = admin_client.get("/api/admin/logs?limit=10")
+        logs = response.get_json()
+        assert [entry["message"] for entry in logs] == [
+            "zweite Meldung",
+            "erste Meldung",
+        ]
+        cursor = int(response.headers["X-Log-Cursor"])
+
+        logger.error("dritte Meldung")
+        logger.debug("vierte Meldung")
+        new = admin_client.get(f"/api/admin/logs?since={cursor}").get_json()
+        assert [entry["message"] for entry in new] == [
+            "vierte Meldung",
+            "dritte Meldung",
+        ]
+        errors = admin_client.get(
+            f"/api/admin/logs?since={cursor}&level=error"
+        ).get_json()
+        assert [entry["message"] for entry in errors] == ["dritte Meldung"]
+        assert admin_client.get("/api/admin/logs?level=laut").status_code == 400
+
+    def test_buffer_is_bounded(self):
+        """Der Puffer hält nur die letzten ``capacity`` Records"""
+        handler = RingBufferHandler(capacity=3)
+        logger = logging.getLogger("asi.test.ring")
+        logger.addHandler(handler)
+        logger.propagate = False
+        for i in range(10):
+            logger.warning("meldung %d", i)
+        records, cursor = handler.get_records(10)
+        assert [entry["message"] for entry in records] == [
+            "meldung 9",
+            "meldung 8",
+            "meldung 7",
+        ]
+        assert cursor == handler.cursor == 10
+
+    def test_incremental_pages_continue_without_gaps(self):
+        """Mehr neue Records als ``limit``: die ältesten zuerst, Cursor lückenlos"""
+        handler = RingBufferHandler(capacity=100)
+        logger = logging.getLogger("asi.test.paging")
+        logger.addHandler(handler)
+        logger.propagate = False
+        for i in range(7):
+            logger.warning("meldung %d", i)
+
+        seen, cursor = [], 0
+        for _ in range(3):
+            records, cursor = handler.get_records(3, since=cursor)
+            seen.extend(entry["message"] for entry in reversed(records))
+        assert seen == [f"meldung {i}" for i in range(7)]
+        assert cursor == 7
+        assert handler.get_records(3, since=cursor) == ([], 7)
+
+    def test_install_lowers_root_level_for_info(self):
+        """Info-Meldungen landen im Puffer, andere Handler behalten ihr Level"""
+        root = logging.getLogger()
+        old_level, old_handlers = root.level, list(root.handlers)
+        console = logging.StreamHandler()
+        try:
+            root.handlers = [console]
+            root.setLevel(logging.WARNING)
+            admin_api.install_log_buffer(level="INFO")
+            assert root.level == logging.INFO
+            assert console.level == logging.WARNING
+
+            logging.getLogger("asi.test.install").info("sichtbar")
+            records, _ = admin_api.log_buffer.get_records(1)
+            assert records[0]["message"] == "sichtbar"
+        finally:
+            root.handlers = old_handlers
+            root.setLevel(old_level)
+
+
+class TestLazyStartup:
+    """Tests für die verzögerte Initialisierung der Web-App"""
+
+    @pytest.fixture
+    def web_app(self, monkeypatch):
+        # app.py importiert den Admin-Blueprint relativ zu src/web
+        monkeypatch.syspath_prepend(str(Path(__file__).parent.parent / "src" / "web"))
+        from src.web import app as web_app
+
+        return web_app
+
+    def test_health_without_loading_components(self, web_app):
+        """Der Health-Check antwortet, ohne Komponenten zu laden"""
+        response = web_app.app.test_client().get("/api/health")
+        assert response.status_code == 200
+        assert set(response.get_json()["components"].values()) <= {"lazy", "ok"}
+
+    def test_components_built_once_with_dependencies(self):
+        """Komponenten entstehen beim ersten Zugriff, Fehler werden erneut versucht"""
+        from src.web.app import LazyASISystem
+
+        built = []
+        attempts = []
+
+        def flaky(system):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("noch nicht bereit")
+            return "flaky"
+
+        system = LazyASISystem(
+            {
+                "db": lambda s: built.append("db") or "db",
+                "search": lambda s: built.append("search") or f"search({s['db']})",
+                "flaky": flaky,
+            }
+        )
+        assert system.status("search") == "lazy"
+        assert system["search"] == "search(db)"
+        assert system["search"] == "search(db)" and built == ["search", "db"]
+
+        system.warm_up(["flaky"], background=False)
+        assert system.status("flaky") == "error"
+        assert system["flaky"] == "flaky" and system.status("flaky") == "ok"
+
+    def test_slow_component_blocks_only_itself(self):
+        """Während eine Komponente aufgebaut wird, bleiben andere erreichbar"""
+        from src.web.app import LazyASISystem
+
+        started, release = threading.Event(), threading.Event()
+        built = []
+
+        def slow(system):
+            built.append("slow")
+            started.set()
+            release.wait(5)
+            return "slow"
+
+        system = LazyASISystem({"slow": slow, "fast": lambda s: "fast"})
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(system["slow"]))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        assert started.wait(5)
+
+        started_at = time.monotonic()
+        assert system["fast"] == "fast"
+        assert time.monotonic() - started_at < 0.5
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert results == ["slow", "slow"] and built == ["slow"]
+
+    def test_first_request_starts_upload_worker(self, web_app, monkeypatch):
+        """Der Upload-Worker startet mit der ersten Anfrage, nicht beim Upload"""
+        system = web_app.LazyASISystem({"upload_worker": MagicMock()})
+        warm_up = MagicMock()
+        monkeypatch.setattr(system, "warm_up", warm_up)
+        monkeypatch.setattr(web_app, "asi_system", system)
+        monkeypatch.setattr(web_app, "_upload_worker_requested", False)
+        monkeypatch.setenv("ASI_UPLOAD_TARGETS", "ipfs")
+
+        client = web_app.app.test_client()
+        client.get("/api/health")
+        client.get("/api/health")
+        warm_up.assert_called_once_with(["upload_worker"])
+
+
+class TestExportPagination:
+    """Tests für den seitenweisen Export"""
+
+    def test_export_follows_cursor(self, monkeypatch, tmp_path):
+        """Der Export liefert Inhalte ohne Einzelabfragen und blättert per Cursor"""
+        monkeypatch.syspath_prepend(str(Path(__file__).parent.parent / "src" / "web"))
+        from src.storage.local_db import LocalDatabase
+        from src.web import app as web_app
+
+        db = LocalDatabase(str(tmp_path / "asi_local.db"))
+        for i in range(5):
+            db.store_reflection(
+                {"hash": f"h{i}", "content": f"Reflexion {i}", "privacy": "private"}
+            )
+        monkeypatch.setattr(web_app, "asi_system", {"local_db": db})
+        monkeypatch.setattr(
+            db, "get_reflection_by_hash", MagicMock(side_effect=AssertionError)
+        )
+        client = web_app.app.test_client()
+
+        hashes, cursor = [], None
+        while True:
+            query = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            body = client.get("/api/export", query_string=query).get_json()
+            hashes.extend(r["hash"] for r in body["reflections"])
+            assert all(
+                r["content"].startswith("Reflexion") for r in body["reflections"]
+            )
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert sorted(hashes) == [f"h{i}" for i in range(5)]
+
+        assert client.get("/api/export?cursor=kaputt").status_code == 400
+        assert client.get("/api/export?limit=0").status_code == 400
+
+    def test_ndjson_stream_with_gzip(self, monkeypatch, tmp_path):
+        """Der NDJSON-Export streamt batchweise, optional gzip-komprimiert"""
+        import gzip
+
+        monkeypatch.syspath_prepend(str(Path(__file__).parent.parent / "src" / "web"))
+        from src.storage.local_db import LocalDatabase
+        from src.web import app as web_app
+
+        db = LocalDatabase(str(tmp_path / "asi_local.db"))
+        for i in range(7):
+            db.store_reflection(
+                {"hash": f"h{i}", "content": f"Reflexion {i}", "privacy": "private"}
+            )
+        monkeypatch.setattr(web_app, "asi_system", {"local_db": db})
+        monkeypatch.setattr(web_app, "EXPORT_STREAM_BATCH", 3)
+        client = web_app.app.test_client()
+
+        response = client.get("/api/export?format=ndjson", buffered=False)
+        assert response.is_streamed and response.mimetype == "application/x-ndjson"
+        chunks = list(response.response)
+        assert len(chunks) == 3
+        lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        assert sorted(r["hash"] for r in lines) == [f"h{i}" for i in range(7)]
+        assert lines[0]["content"].startswith("Reflexion")
+
+        response = client.get(
+            "/api/export?format=ndjson",
+            headers={"Accept-Encoding": "gzip"},
+            buffered=False,
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        raw = b"".join(response.response)
+        assert len(gzip.decompress(raw).splitlines()) == 7
+
+
+class TestAsyncServer:
+    """Tests für den asynchronen Betriebsmodus"""
+
+    def test_slow_backends_do_not_block_concurrent_requests(self, monkeypatch):
+        """/api/stats liest den Prober-Cache und wartet nie auf ein Backend"""
+        monkeypatch.syspath_prepend(str(Path(__file__).parent.parent / "src" / "web"))
+        from aiohttp.test_utils import TestClient, TestServer
+
+        from src.web import async_app
+        from src.web.app import LazyASISystem
+
+        release = threading.Event()
+        ipfs_calls = []
+
+        def ipfs():
+            ipfs_calls.append(1)
+            return True
+
+        def arweave():
+            raise ConnectionError("Gateway nicht erreichbar")
+
+        def chain():
+            release.wait(5)
+            return True
+
+        prober = BackendProber(
+            {
+                "ipfs_running": ipfs,
+                "arweave_status": arweave,
+                "blockchain_connected": chain,
+            },
+            defaults={"arweave_status": "simulated", "blockchain_connected": False},
+            interval=3600,
+            timeout=0.2,
+        )
+        prober.probe()
+
+        def no_backend_client(system):
+            raise AssertionError("Backend-Client im Request-Pfad aufgebaut")
+
+        local_db = MagicMock()
+        local_db.get_statistics.return_value = {"total_reflections": 3}
+        system = LazyASISystem(
+            {
+                "local_db": lambda s: local_db,
+                "ipfs_client": no_backend_client,
+                "arweave_client": no_backend_client,
+                "smart_contract": no_backend_client,
+            }
+        )
+
+        async def scenario():
+            app = async_app.create_async_app(
+                system, cpu_workers=2, prober=prober, metrics=RequestMetrics()
+            )
+            async with TestClient(TestServer(app)) as client:
+                started = time.monotonic()
+                requests = (client.get("/api/stats") for _ in range(50))
+                responses = await asyncio.gather(*requests)
+                elapsed = time.monotonic() - started
+                bodies = [await response.json() for response in responses]
+                health = await (await client.get("/api/health")).json()
+                metrics = await (await client.get("/metrics")).text()
+            return elapsed, bodies, health, metrics
+
+        try:
+            elapsed, bodies, health, metrics = asyncio.run(scenario())
+        finally:
+            release.set()
+        counter = 'route="/api/stats",status="200"} 50'
+        assert f'asi_http_requests_total{{method="GET",{counter}' in metrics
+        assert elapsed < 2.0
+        assert len(ipfs_calls) <= 2
+        assert bodies[0] == {
+            "success": True,
+            "database": {"total_reflections": 3},
+            "ipfs_running": True,
+            "arweave_status": "simulated",
+            "blockchain_connected": False,
+        }
+        assert health["server"] == "async"
+        assert health["components"]["local_db"] == "ok"
+
+
+class TestPWAProxy:
+    """Tests für den API-Proxy des PWA-Servers"""
+
+    @pytest.fixture
+    def upstream(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlsplit
+
+        peers = set()
+
+        class EchoHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-Alive
+
+            def handle_request(self):
+                peers.add(self.client_address[1])
+                url = urlsplit(self.path)
+                if url.path == "/api/export":
+                    body, status = b"x" * (256 * 1024), 200
+                else:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = json.dumps(
+                        {
+                            "method": self.command,
+                            "path": url.path,
+                            "args": parse_qs(url.query),
+                            "body": self.rfile.read(length).decode(),
+                            "token": self.headers.get("X-Token"),
+                        }
+                    ).encode()
+                    status = 201
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("X-Upstream", "ja")
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_DELETE = handle_request
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}", peers
+        server.shutdown()
+
+    def load_server(self, api_url):
+        spec = importlib.util.spec_from_file_location(
+            "start_pwa", Path(__file__).parent.parent / "start-pwa.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.PWAServer(api_url=api_url)
+
+    def test_forwards_methods_headers_and_streams(self, upstream):
+        """Methoden, Header und Query laufen über eine Keep-Alive-Verbindung"""
+        api_url, peers = upstream
+        client = self.load_server(api_url).app.test_client()
+
+        response = client.post(
+            "/api/reflect?a=1&a=2",
+            data='{"content": "x"}',
+            headers={"X-Token": "geheim", "Content-Type": "application/json"},
+        )
+        assert response.status_code == 201
+        assert response.headers["X-Upstream"] == "ja"
+        assert response.get_json() == {
+            "method": "POST",
+            "path": "/api/reflect",
+            "args": {"a": ["1", "2"]},
+            "body": '{"content": "x"}',
+            "token": "geheim",
+        }
+        assert client.delete("/api/logs").get_json()["method"] == "DELETE"
+
+        export = client.get("/api/export")
+        assert export.is_streamed
+        assert len(export.get_data()) == 256 * 1024
+        assert len(peers) == 1
+
+    def test_unavailable_api(self):
+        """Ohne erreichbare API antwortet der Proxy mit 503"""
+        client = self.load_server("http://127.0.0.1:9").app.test_client()
+        assert client.get("/api/health").status_code == 503
+
+
+class TestRequestMetrics:
+    """Tests für Latenz-Histogramme und den Prometheus-Endpunkt"""
+
+    def test_flask_routes_are_measured(self):
+        """Requests werden pro Routen-Muster mit Status und Histogramm verbucht"""
+        app = Flask(__name__)
+        metrics = RequestMetrics()
+        metrics.init_app(app)
+
+        @app.route("/reflection/<hash_id>")
+        def reflection(hash_id):
+            if hash_id == "kaputt":
+                raise RuntimeError("kaputt")
+            return {"hash": hash_id}
+
+        client = app.test_client()
+        client.get("/reflection/a")
+        client.get("/reflection/b")
+        client.get("/reflection/kaputt")
+        client.get("/gibt-es-nicht")
+
+        response = client.get("/metrics")
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        text = response.get_data(as_text=True)
+        labels = 'method="GET",route="/reflection/<hash_id>"'
+        assert (
+            f'asi_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+        )
+        assert f"asi_http_request_duration_seconds_count{{{labels}}} 3" in text
+        assert f'asi_http_requests_total{{{labels},status="200"}} 2' in text
+        assert f'asi_http_requests_total{{{labels},status="500"}} 1' in text
+        assert f"asi_http_request_errors_total{{{labels}}} 1" in text
+        assert f"asi_http_requests_in_flight{{{labels}}} 0" in text
+        assert 'route="unmatched",status="404"' in text
+        assert 'asi_http_requests_in_flight{method="GET",route="/metrics"} 1' in text
+
+    def test_counts_many_requests(self):
+        """Viele Messungen in Folge landen vollständig im Zähler"""
+        metrics = RequestMetrics()
+        for _ in range(20000):
+            metrics.finish(
+                "GET", "/api/search", 200, metrics.start("GET", "/api/search")
+            )
+        assert 'status="200"} 20000' in metrics.render()
+
+
+class TestHTTPCache:
+    """Tests für ETags, 304-Antworten und Kompression"""
+
+    def test_dynamic_json_etag_and_gzip(self):
+        """Große JSON-Antworten werden komprimiert, unveränderte mit 304 beantwortet"""
+        import gzip
+
+        app = Flask(__name__)
+        cache = HTTPCache()
+        cache.init_app(app)
+        payload = {"items": [{"id": i, "status": "ok"} for i in range(200)]}
+
+        @app.route("/api/stats")
+        def stats():
+            return payload
+
+        @app.route("/small")
+        def small():
+            return {"ok": True}
+
+        client = app.test_client()
+        response = client.get("/api/stats", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert json.loads(gzip.decompress(response.data)) == payload
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        response = client.get("/api/stats", headers={"If-None-Match": etag})
+        assert response.status_code == 304 and response.data == b""
+
+        payload["items"].append({"id": 200, "status": "neu"})
+        response = client.get("/api/stats", headers={"If-None-Match": etag})
+        assert response.status_code == 200 and response.headers["ETag"] != etag
+        assert "Content-Encoding" not in response.headers
+
+        assert (
+            "Content-Encoding"
+            not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        )
+
+    def test_static_files_compressed_once(self, tmp_path):
+        """Statische Dateien werden pro Version nur einmal komprimiert"""
+        from flask import send_from_directory
+
+        (tmp_path / "app.js").write_text("console.log('asi');\n" * 200)
+        app = Flask(__name__)
+        cache = HTTPCache()
+        cache.init_app(app)
+
+        @app.route("/<path:filename>")
+        def static_files(filename):
+            return send_from_directory(tmp_path, filename)
+
+        client = app.test_client()
+        with patch.object(cache, "compress", wraps=cache.compress) as compress:
+            for _ in range(3):
+                response = client.get("/app.js", headers={"Accept-Encoding": "gzip"})
+                assert response.headers["Content-Encoding"] == "gzip"
+                assert len(response.data) < 4000
+            assert compress.call_count == 1
+
+        response = client.get(
+            "/app.js", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        assert response.status_code == 304
+
+    def test_conditional_skips_view_until_data_changes(self, tmp_path):
+        """Mit Datenstand-ETag läuft die View bei 304 gar nicht erst"""
+        from src.storage.local_db import LocalDatabase
+
+        db = LocalDatabase(str(tmp_path / "asi_local.db"))
+        app = Flask(__name__)
+        calls = []
+
+        @app.route("/reflections")
+        @conditional(lambda: db.data_version)
+        def reflections():
+            calls.append(1)
+            return {"count": len(db.get_reflections())}
+
+        client = app.test_client()
+        etag = client.get("/reflections").headers["ETag"]
+        assert (
+            client.get("/reflections", headers={"If-None-Match": etag}).status_code
+            == 304
+        )
+        assert len(calls) == 1
+
+        db.store_reflection({"hash": "h1", "content": "Neu", "privacy": "private"})
+        response = client.get("/reflections", headers={"If-None-Match": etag})
+        assert response.status_code == 200 and response.get_json() == {"count": 1}
+        assert len(calls) == 2
+
+    def test_data_version_sees_writes_of_other_connections(self, tmp_path):
+        """Der Datenstand liegt in der Datenbank, nicht in der Instanz"""
+        from src.storage.local_db import LocalDatabase
+
+        db_path = str(tmp_path / "asi_local.db")
+        reader, writer = LocalDatabase(db_path), LocalDatabase(db_path)
+        before = reader.data_version
+        assert writer.data_version == before
+
+        writer.store_reflection({"hash": "h1", "content": "Neu", "privacy": "private"})
+        assert reader.data_version != before
+
+        # Leere Abfragen und doppelte Einreihungen ändern nichts
+        after = reader.data_version
+        assert writer.claim_pending_uploads(["ipfs"], 10, now=0) == []
+        assert writer.enqueue_upload("h1", "ipfs") is True
+        changed = reader.data_version
+        assert changed != after
+        assert writer.enqueue_upload("h1", "ipfs") is False
+        assert reader.data_version == changed
+
+
+class TestBackendProber:
+    """Tests für die zwischengespeicherten Backend-Probes"""
+
+    def test_probes_run_concurrently_with_timeouts(self):
+        """Ein hängendes Backend verzögert weder die anderen noch die nächste Runde"""
+        release = threading.Event()
+        slow_calls = []
+
+        def slow():
+            slow_calls.append(1)
+            release.wait(5)
+            return True
+
+        def broken():
+            raise ConnectionError("down")
+
+        prober = BackendProber(
+            {"slow": slow, "fast": lambda: "connected", "broken": broken},
+            defaults={"slow": False, "fast": "simulated", "broken": False},
+            timeout=0.2,
+        )
+        started = time.monotonic()
+        assert prober.probe() == {"slow": False, "fast": "connected", "broken": False}
+        prober.probe()
+        assert time.monotonic() - started < 1.0
+        assert len(slow_calls) == 1  # hängende Probe wird nicht erneut gestartet
+
+        status = prober.status()
+        assert status["slow"]["error"] == "timeout" and status["fast"]["state"] == "ok"
+        assert (
+            status["broken"]["state"] == "error" and status["broken"]["error"] == "down"
+        )
+
+        release.set()
+        time.sleep(0.05)
+        assert prober.probe()["slow"] is True
+
+        prober.ttl = 0
+        time.sleep(0.01)
+        assert prober.snapshot(start=False)["fast"] == "simulated"
+        assert prober.status()["fast"]["state"] == "stale"
+
+    def test_stats_answer_from_cache(self, monkeypatch):
+        """/api/stats wartet nicht auf langsame Backends"""
+        monkeypatch.syspath_prepend(str(Path(__file__).parent.parent / "src" / "web"))
+        from src.web import app as web_app
+
+        release = threading.Event()
+        local_db = MagicMock()
+        local_db.get_statistics.return_value = {"total_reflections": 2}
+        prober = BackendProber(
+            {
+                "ipfs_running": lambda: release.wait(5),
+                "arweave_status": lambda: "connected",
+            },
+            defaults={"ipfs_running": False, "arweave_status": "simulated"},
+            interval=60,
+            timeout=5,
+        )
+        monkeypatch.setattr(web_app, "asi_system", {"local_db": local_db})
+        monkeypatch.setattr(web_app, "backend_prober", prober)
+        client = web_app.app.test_client()
+
+        started = time.monotonic()
+        body = client.get("/api/stats").get_json()
+        assert time.monotonic() - started < 0.5
+        assert body == {
+            "success": True,
+            "database": {"total_reflections": 2},
+            "ipfs_running": False,
+            "arweave_status": "simulated",
+        }
+
+        release.set()
+        for _ in range(50):
+            if prober.status()["ipfs_running"]["state"] == "ok":
+                break
+            time.sleep(0.02)
+        assert client.get("/api/stats").get_json()["ipfs_running"] is True
+        prober.stop()